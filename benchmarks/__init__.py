@@ -0,0 +1 @@
+# 헤드리스 벤치마크 (python -m benchmarks.run)
@@ -0,0 +1,176 @@
+# -------------------------------
+# 벤치마크용 합성 데이터 생성기
+# -------------------------------
+# 실제 파일과 같은 컬럼 구성 / 값 형식으로 10^3 ~ 10^6 행(노드) 규모의 데이터를 만든다.
+# 모든 생성기는 seed 가 같으면 같은 결과를 반환한다.
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from emergency.regions import SIDO_NAMES, SIDO_SHORT_NAMES
+from emergency.road_snapshot import SNAPSHOT_FORMAT_VERSION, RoadSnapshot, _ARRAY_NAMES
+from emergency.sos_data import MONTH_PERIODS
+from emergency.triage import TRIAGE_QUESTIONS
+
+TRANSPORT_COLUMNS = [
+    "번호", "개방서비스명", "개방서비스아이디", "개방자치단체코드", "관리번호", "인허가일자", "인허가취소일자",
+    "영업상태구분코드", "영업상태명", "상세영업상태코드", "상세영업상태명", "폐업일자", "휴업시작일자", "휴업종료일자",
+    "재개업일자", "소재지전화", "소재지면적", "소재지우편번호", "소재지전체주소", "도로명전체주소", "도로명우편번호",
+    "사업장명", "최종수정시점", "데이터갱신구분", "데이터갱신일자", "업태구분명", "좌표정보x(epsg5174)",
+    "좌표정보y(epsg5174)", "의료기관종별명", "의료인수", "입원실수", "병상수", "총면적", "진료과목내용",
+    "진료과목내용명", "지정취소일자", "완화의료지정형태", "완화의료담당부서명", "구급차특수", "구급차일반", "총인원",
+    "구조사수", "허가병상수", "최초지정일자",
+]
+
+_SIGUNGU = ["중구", "동구", "남구", "북구", "수원시 장안구", "용인시 처인구", "청주시 흥덕구", "김천시", "보성군", "원주시"]
+_TIME_LABELS = ["00-03시이전", "03-06시이전", "06-09시이전", "09-12시이전",
+                "12-15시이전", "15-18시이전", "18-21시이전", "21-24시이전"]
+
+# 용인시 부근 (경도, 위도) / EPSG:5174 (x, y) 범위
+_ROAD_CENTER = (127.18, 37.24)
+_EPSG5174_X_RANGE = (150000.0, 350000.0)
+_EPSG5174_Y_RANGE = (250000.0, 550000.0)
+
+
+def transport_registry(num_rows, seed=0):
+    """응급환자이송업 인허가 자료와 같은 컬럼의 데이터프레임 (모든 값은 문자열 또는 빈 값)."""
+    rng = np.random.default_rng(seed)
+    sido = np.asarray(SIDO_NAMES, dtype=object)[rng.integers(len(SIDO_NAMES), size=num_rows)]
+    sigungu = np.asarray(_SIGUNGU, dtype=object)[rng.integers(len(_SIGUNGU), size=num_rows)]
+    dong = rng.integers(1, 999, size=num_rows).astype(str)
+    addresses = sido + " " + sigungu + " 가상동 " + dong + "번지"
+    # 약 5% 는 좌표가 비어 있는 행 (지오코딩 폴백 대상)
+    has_coords = rng.random(num_rows) > 0.05
+    x = np.where(has_coords, rng.uniform(*_EPSG5174_X_RANGE, size=num_rows).round(4).astype(str), "")
+    y = np.where(has_coords, rng.uniform(*_EPSG5174_Y_RANGE, size=num_rows).round(4).astype(str), "")
+    days = rng.integers(0, 9000, size=num_rows)
+    dates = (np.datetime64("2000-01-01") + days).astype(str)
+
+    df = pd.DataFrame({col: "" for col in TRANSPORT_COLUMNS}, index=range(num_rows))
+    df["번호"] = np.arange(1, num_rows + 1).astype(str)
+    df["개방서비스명"] = "응급환자이송업"
+    df["개방서비스아이디"] = "01_01_07_P"
+    df["개방자치단체코드"] = rng.integers(3000000, 6600000, size=num_rows).astype(str)
+    df["관리번호"] = rng.integers(10 ** 17, 10 ** 18, size=num_rows, dtype=np.int64).astype(str)
+    df["인허가일자"] = dates
+    df["영업상태명"] = np.where(rng.random(num_rows) < 0.8, "영업/정상", "폐업")
+    df["소재지전체주소"] = addresses
+    df["도로명전체주소"] = addresses
+    df["사업장명"] = np.char.add("가상이송단", np.arange(num_rows).astype(str)).astype(object)
+    df["최종수정시점"] = dates
+    df["데이터갱신일자"] = dates
+    df["좌표정보x(epsg5174)"] = x
+    df["좌표정보y(epsg5174)"] = y
+    df["구급차특수"] = rng.integers(0, 10, size=num_rows).astype(str)
+    df["구급차일반"] = rng.integers(0, 5, size=num_rows).astype(str)
+    return df
+
+
+def write_transport_csv(path, num_rows, seed=0, encoding="cp949"):
+    """합성 이송업 자료를 실제 파일과 같은 형식(CP949 CSV)으로 저장한다."""
+    transport_registry(num_rows, seed).to_csv(path, index=False, encoding=encoding)
+    return path
+
+
+def sos_records(num_rows, years=(2023, 2022, 2021, 2020, 2019), monthly=False, seed=0):
+    """정보_SOS_02/03.json 과 같은 형식의 레코드 목록. num_rows 는 본문(지역) 행 수."""
+    rng = np.random.default_rng(seed)
+    periods = MONTH_PERIODS if monthly else _TIME_LABELS
+    header_years = {"col1": "No", "col2": "분류", "col3": "분류"}
+    header_periods = {"col1": "No", "col2": "분류", "col3": "분류"}
+    col = 4
+    for year in years:
+        for period in periods:
+            header_years[f"col{col}"] = f"{year}년"
+            header_periods[f"col{col}"] = period
+            col += 1
+    records = [header_years, header_periods]
+
+    regions = list(SIDO_SHORT_NAMES.values())
+    counts = rng.integers(1000, 200000, size=(num_rows, col - 4))
+    for i in range(num_rows):
+        # 지역 수를 넘는 행은 하위 지역('서울-17' 처럼)으로 만들어 규모를 늘림
+        region = regions[i % len(regions)] if i < len(regions) else f"{regions[i % len(regions)]}-{i}"
+        record = {"col1": str(i + 1), "col2": "시도", "col3": region}
+        record.update({f"col{c + 4}": f"{v:,}" for c, v in enumerate(counts[i].tolist())})
+        records.append(record)
+    return records
+
+
+def write_sos_json(path, num_rows, **kwargs):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sos_records(num_rows, **kwargs), f, ensure_ascii=False)
+    return path
+
+
+def assessments(num_rows, seed=0):
+    """간이 진단서 응답 데이터프레임."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: np.asarray(list(options), dtype=object)[rng.integers(len(options), size=num_rows)]
+                       for col, (_, options) in TRIAGE_QUESTIONS.items()})
+    df.insert(0, "이름", [f"환자 {i + 1}" for i in range(num_rows)])
+    return df
+
+
+def road_snapshot(num_nodes, seed=0, spacing_deg=0.001):
+    """격자형 합성 도로망 RoadSnapshot (양방향 간선, 좌표에 약간의 흔들림 포함)."""
+    rng = np.random.default_rng(seed)
+    side = max(2, int(np.ceil(np.sqrt(num_nodes))))
+    n = side * side
+    rows, cols = np.divmod(np.arange(n), side)
+    node_x = _ROAD_CENTER[0] + (cols - side / 2) * spacing_deg + rng.normal(0, spacing_deg * 0.1, n)
+    node_y = _ROAD_CENTER[1] + (rows - side / 2) * spacing_deg + rng.normal(0, spacing_deg * 0.1, n)
+
+    right = np.flatnonzero(cols < side - 1)
+    down = np.flatnonzero(rows < side - 1)
+    src = np.concatenate([right, right + 1, down, down + side])
+    dst = np.concatenate([right + 1, right, down + side, down])
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+
+    length = np.hypot((node_x[src] - node_x[dst]) * 88000.0, (node_y[src] - node_y[dst]) * 111000.0)
+    highway = rng.choice(4, size=len(src), p=[0.05, 0.15, 0.3, 0.5]).astype(np.uint8)
+    speed_kph = np.array([60.0, 50.0, 40.0, 30.0])[highway]
+    arrays = {
+        "node_ids": np.arange(10 ** 9, 10 ** 9 + n, dtype=np.int64),
+        "node_x": node_x,
+        "node_y": node_y,
+        "indptr": np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))]).astype(np.int64),
+        "indices": dst.astype(np.int32),
+        "edge_key": np.zeros(len(src), dtype=np.int16),
+        "edge_length": length.astype(np.float32),
+        "edge_travel_time": (length / (speed_kph / 3.6)).astype(np.float32),
+        "edge_highway": highway,
+    }
+    digest = hashlib.sha1()
+    for name in _ARRAY_NAMES:
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "place_name": f"synthetic-grid-{n}",
+        "crs": "epsg:4326",
+        "highway_classes": ["primary", "secondary", "tertiary", "residential"],
+        "num_nodes": n,
+        "num_edges": int(len(src)),
+        "fingerprint": digest.hexdigest(),
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return RoadSnapshot(arrays, meta)
+
+
+def providers_on_snapshot(snapshot, num_providers, seed=0):
+    """도로망 안에 흩어진 영업 중 이송업체 데이터프레임 (위도/경도 컬럼 포함)."""
+    rng = np.random.default_rng(seed)
+    nodes = rng.integers(snapshot.num_nodes, size=num_providers)
+    return pd.DataFrame({
+        "사업장명": [f"가상이송단{i}" for i in range(num_providers)],
+        "소재지전체주소": [f"경기도 용인시 처인구 가상동 {i}번지" for i in range(num_providers)],
+        "영업상태명": "영업/정상",
+        "구급차특수": rng.integers(1, 10, size=num_providers),
+        "구급차일반": rng.integers(0, 5, size=num_providers),
+        "출발_위도": np.asarray(snapshot.node_y)[nodes],
+        "출발_경도": np.asarray(snapshot.node_x)[nodes],
+    })
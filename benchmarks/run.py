@@ -0,0 +1,162 @@
+# -------------------------------
+# 헤드리스 벤치마크 실행기
+# -------------------------------
+# Streamlit 화면(main.py)을 실행하지 않고 emergency 패키지의 핫 패스를 합성 데이터로 측정한다.
+# 단계 x 규모별 실행 시간(최솟값)과 최대 메모리(tracemalloc)를 JSON 기록 파일에 누적하고,
+# 직전 실행보다 느려진 항목을 표시한다.
+#
+# 사용 예:
+#   python -m benchmarks.run                               # 기본 규모(10^3, 10^4, 10^5), 전체 단계
+#   python -m benchmarks.run --sizes 1000 1000000 --stages region_resolve triage_score
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.stages import STAGES
+
+DEFAULT_HISTORY_PATH = os.path.join(".cache", "benchmarks", "history.json")
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+# 직전 실행 대비 이 비율 이상 느려지면 회귀로 표시 (아주 짧은 단계의 측정 잡음은 무시)
+REGRESSION_RATIO = 1.3
+MIN_REGRESSION_SECONDS = 0.01
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(stage, size, workdir, repeat=3, memory=True):
+    """단계 하나를 측정한다. 준비 시간은 제외하며, 시간은 repeat 회 중 최솟값."""
+    state = stage.setup(size, workdir)
+    timings = []
+    for _ in range(min(repeat, stage.max_repeat or repeat)):
+        gc.collect()
+        started = time.perf_counter()
+        stage.run(state)
+        timings.append(time.perf_counter() - started)
+
+    peak_mb = None
+    if memory and stage.trace_memory:
+        # tracemalloc 은 실행을 느리게 하므로 시간 측정과 분리하여 한 번 더 실행
+        gc.collect()
+        tracemalloc.start()
+        try:
+            stage.run(state)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return {"stage": stage.name, "size": size, "unit": stage.unit, "seconds": min(timings),
+            "peak_mb": peak_mb}
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def previous_results(history):
+    """(단계, 규모) -> 가장 최근 성공 결과."""
+    latest = {}
+    for run in history:
+        for result in run["results"]:
+            if result.get("seconds") is not None:
+                latest[(result["stage"], result["size"])] = result
+    return latest
+
+
+def compare(result, previous):
+    """직전 결과 대비 시간 비율과 회귀 여부."""
+    if previous is None or result.get("seconds") is None:
+        return None, False
+    ratio = result["seconds"] / max(previous["seconds"], 1e-9)
+    return ratio, ratio >= REGRESSION_RATIO and result["seconds"] >= MIN_REGRESSION_SECONDS
+
+
+def run_benchmarks(stage_names=None, sizes=DEFAULT_SIZES, repeat=3, memory=True, workdir=None, report=print):
+    """선택한 단계 x 규모를 측정하여 결과 목록을 반환한다. 실패한 단계는 error 항목으로 기록된다."""
+    stages = [STAGES[name] for name in (stage_names or STAGES)]
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for stage in stages:
+            for size in sizes:
+                if size > stage.max_size:
+                    continue
+                try:
+                    result = measure(stage, size, tmp, repeat=repeat, memory=memory)
+                except Exception as e:
+                    result = {"stage": stage.name, "size": size, "unit": stage.unit, "seconds": None,
+                              "peak_mb": None, "error": f"{type(e).__name__}: {e}"}
+                results.append(result)
+                report(result)
+    return results
+
+
+def _format(result, ratio=None, regressed=False):
+    if result.get("seconds") is None:
+        return f"{result['stage']:<22} {result['size']:>9,} {result['unit']:<8} 실패: {result['error']}"
+    peak = f"{result['peak_mb']:9.1f} MB" if result.get("peak_mb") is not None else " " * 12
+    change = f"  x{ratio:.2f}" if ratio is not None else ""
+    flag = "  <-- 회귀" if regressed else ""
+    return f"{result['stage']:<22} {result['size']:>9,} {result['unit']:<8} {result['seconds']:10.4f} s {peak}{change}{flag}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="emergency 패키지 헤드리스 벤치마크")
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES), help="실행할 단계 (기본: 전체)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="데이터 규모 (행/노드 수)")
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--no-memory", action="store_true", help="최대 메모리 측정 생략")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH, help="결과 기록 JSON 파일")
+    parser.add_argument("--no-save", action="store_true", help="기록 파일에 저장하지 않음")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    previous = previous_results(history)
+    regressions = []
+
+    def report(result):
+        ratio, regressed = compare(result, previous.get((result["stage"], result["size"])))
+        if regressed:
+            regressions.append(result)
+        print(_format(result, ratio, regressed), flush=True)
+
+    results = run_benchmarks(args.stages, args.sizes, repeat=args.repeat, memory=not args.no_memory, report=report)
+    if not args.no_save:
+        history.append({
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        })
+        save_history(args.history, history)
+    if regressions:
+        print(f"직전 실행보다 {REGRESSION_RATIO}배 이상 느려진 항목: {len(regressions)}개")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+# -------------------------------
+# 벤치마크 단계 정의
+# -------------------------------
+# 단계마다 준비(setup: 합성 데이터 생성, 측정에서 제외)와 실행(run: 측정 대상)을 나눈다.
+# max_size 를 넘는 규모는 건너뛰고, 한 번에 수십 초가 걸리는 단계는 max_repeat / trace_memory 로 반복을 줄인다.
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import generators
+
+
+@dataclass
+class Stage:
+    name: str
+    setup: object  # (size, workdir) -> state
+    run: object  # state -> None
+    max_size: int = 10 ** 6
+    unit: str = "rows"
+    max_repeat: int = None
+    trace_memory: bool = True
+
+
+# --- 로더 ---
+def _setup_transport_csv(size, workdir):
+    path = os.path.join(workdir, f"transport_{size}.csv")
+    if not os.path.exists(path):
+        generators.write_transport_csv(path, size)
+    return path
+
+
+def _run_transport_csv_cold(path):
+    from emergency.transport_io import load_transport_csv
+
+    load_transport_csv(path, cache_dir=None)
+
+
+def _setup_transport_csv_cached(size, workdir):
+    from emergency.transport_io import load_transport_csv
+
+    path = _setup_transport_csv(size, workdir)
+    cache_dir = os.path.join(workdir, "transport_cache")
+    _, info = load_transport_csv(path, cache_dir=cache_dir)
+    return path, cache_dir
+
+
+def _run_transport_csv_cached(state):
+    from emergency.transport_io import load_transport_csv
+
+    path, cache_dir = state
+    _, info = load_transport_csv(path, cache_dir=cache_dir)
+    if info["source"] != "cache":
+        raise RuntimeError("컬럼형 캐시를 사용하지 못했습니다. (pyarrow 설치 여부 확인)")
+
+
+def _setup_sos_records(size, workdir):
+    return generators.sos_records(size)
+
+
+def _run_sos_parse(records):
+    from emergency.sos_data import parse_sos_records
+
+    parse_sos_records(records)
+
+
+# --- 전처리 ---
+def _setup_registry(size, workdir):
+    df = generators.transport_registry(size)
+    for col in ("좌표정보x(epsg5174)", "좌표정보y(epsg5174)"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def _run_epsg5174(df):
+    from emergency.coords import epsg5174_coordinates
+
+    epsg5174_coordinates(df)
+
+
+def _run_region_resolve(df):
+    from emergency.regions import resolve_regions
+
+    resolve_regions(df["소재지전체주소"])
+
+
+# --- 응급 대기열 / 분류 ---
+def _setup_assessments(size, workdir):
+    return generators.assessments(size)
+
+
+def _run_triage_score(df):
+    from emergency.triage import score_assessments
+
+    score_assessments(df)
+
+
+def _setup_triage_enqueue(size, workdir):
+    return generators.assessments(size), workdir
+
+
+def _run_triage_enqueue(state):
+    # 채점 + 빈 SQLite 대기열 파일에 일괄 추가 (대시보드 일괄 업로드 경로 전체)
+    import tempfile
+
+    from emergency.queue_store import SQLiteQueueStore
+    from emergency.triage import enqueue_scored, score_assessments
+
+    df, workdir = state
+    with tempfile.TemporaryDirectory(dir=workdir) as queue_dir:
+        enqueue_scored(SQLiteQueueStore(os.path.join(queue_dir, "queue.sqlite")), score_assessments(df))
+
+
+def _setup_queue_ops(size, workdir):
+    rng = np.random.default_rng(0)
+    return rng.choice([1, 3, 5, 10, 20], size=size).tolist(), rng.integers(size, size=size // 10).tolist()
+
+
+def _run_queue_ops(state):
+    from emergency.triage_queue import IndexedPriorityQueue
+
+    scores, touched = state
+    queue = IndexedPriorityQueue(aging_rate=0.1, clock=iter(range(10 ** 9)).__next__)
+    ids = [queue.insert({"이름": ""}, score) for score in scores]
+    # 10% 재분류, 10% 이탈, 나머지는 진료 순서대로 꺼냄
+    for i in touched:
+        if ids[i] in queue:
+            queue.update_priority(ids[i], 20)
+    for i in touched[::-1]:
+        if ids[i] in queue:
+            queue.remove(ids[i])
+    queue.get_all_patients_sorted()
+    while not queue.is_empty():
+        queue.get_highest_priority_patient()
+
+
+def _setup_ed_simulation(size, workdir):
+    rng = np.random.default_rng(0)
+    arrivals = np.sort(rng.uniform(0, size * 6.0, size))  # 평균 6분 간격 도착
+    return arrivals, rng.choice([1, 3, 5, 10, 20], size=size).astype(np.float64), rng.exponential(50.0, size)
+
+
+def _run_ed_simulation(state):
+    from emergency.ed_simulation import simulate_queue
+
+    arrivals, priority, service = state
+    simulate_queue(arrivals, priority, service, num_bays=10)
+
+
+# --- 도로망 ---
+def _setup_road(size, workdir):
+    return generators.road_snapshot(size)
+
+
+def _fresh_snapshot(snapshot):
+    # CSR 캐시가 비어 있는 새 객체 (같은 배열 공유)
+    from emergency.road_snapshot import RoadSnapshot, _ARRAY_NAMES
+
+    return RoadSnapshot({name: getattr(snapshot, name) for name in _ARRAY_NAMES}, snapshot.meta)
+
+
+def _run_road_csr(snapshot):
+    _fresh_snapshot(snapshot).csr("travel_time")
+
+
+def _setup_road_with_providers(size, workdir):
+    snapshot = generators.road_snapshot(size)
+    snapshot.csr("travel_time")
+    return snapshot, generators.providers_on_snapshot(snapshot, max(10, size // 1000)), workdir
+
+
+def _run_nearest_provider(state):
+    from emergency.routing import build_nearest_provider_index
+
+    snapshot, providers, _ = state
+    build_nearest_provider_index(snapshot, providers, cache_dir=None)
+
+
+def _setup_snap_queries(size, workdir):
+    from emergency.routing import NodeSnapper
+
+    snapshot = generators.road_snapshot(size)
+    rng = np.random.default_rng(0)
+    nodes = rng.integers(snapshot.num_nodes, size=100_000)
+    return NodeSnapper(snapshot), np.asarray(snapshot.node_y)[nodes] + 1e-5, np.asarray(snapshot.node_x)[nodes]
+
+
+def _run_snap_queries(state):
+    snapper, lat, lon = state
+    snapper.snap(lat, lon)
+
+
+def _run_coverage(state):
+    import tempfile
+
+    from emergency.coverage import CoverageAnalyzer
+
+    snapshot, providers, workdir = state
+    # 매번 빈 캐시 디렉터리에서 전체 계산
+    with tempfile.TemporaryDirectory(dir=workdir) as cache_dir:
+        analyzer = CoverageAnalyzer(snapshot, cache_dir=cache_dir)
+        analyzer.update(providers)
+        analyzer.coverage_summary()
+
+
+def _setup_dispatch(size, workdir):
+    from emergency.dispatch import build_travel_time_matrix, simulate_surge
+    from emergency.triage import SEVERITY_SCORES
+
+    snapshot = generators.road_snapshot(size)
+    matrix = build_travel_time_matrix(snapshot, generators.providers_on_snapshot(snapshot, 100), cache_dir=None)
+    return matrix, simulate_surge(snapshot, 500, SEVERITY_SCORES)
+
+
+def _run_dispatch(state):
+    from emergency.dispatch import dispatch_batch
+
+    matrix, incidents = state
+    dispatch_batch(matrix, incidents)
+
+
+def _run_ch_build(snapshot):
+    from emergency.eta_index import CHIndex
+
+    CHIndex.build(snapshot)
+
+
+def _setup_ch_queries(size, workdir):
+    from emergency.eta_index import CHIndex, random_node_pairs
+
+    index = CHIndex.build(generators.road_snapshot(size))
+    return index, random_node_pairs(index.snapshot, 1000, seed=1)
+
+
+def _run_ch_queries(state):
+    index, (sources, targets) = state
+    index.query_many(sources, targets)
+
+
+def _run_road_render(snapshot):
+    from emergency.road_render import DEFAULT_STYLE, _render
+
+    # 렌더링 결과 캐시를 거치지 않고 실제 그리기 시간 측정
+    _render(snapshot, dict(DEFAULT_STYLE), "full", None)
+
+
+STAGES = {stage.name: stage for stage in [
+    Stage("transport_csv_cold", _setup_transport_csv, _run_transport_csv_cold),
+    Stage("transport_csv_cached", _setup_transport_csv_cached, _run_transport_csv_cached),
+    Stage("sos_parse", _setup_sos_records, _run_sos_parse),
+    Stage("epsg5174_convert", _setup_registry, _run_epsg5174),
+    Stage("region_resolve", _setup_registry, _run_region_resolve),
+    Stage("triage_score", _setup_assessments, _run_triage_score),
+    Stage("triage_enqueue_sqlite", _setup_triage_enqueue, _run_triage_enqueue, max_size=10 ** 5),
+    Stage("priority_queue", _setup_queue_ops, _run_queue_ops, unit="patients"),
+    Stage("ed_simulation", _setup_ed_simulation, _run_ed_simulation, unit="patients"),
+    Stage("road_csr", _setup_road, _run_road_csr, unit="nodes"),
+    Stage("nearest_provider", _setup_road_with_providers, _run_nearest_provider, unit="nodes"),
+    Stage("snap_queries_100k", _setup_snap_queries, _run_snap_queries, unit="nodes"),
+    Stage("coverage", _setup_road_with_providers, _run_coverage, max_size=10 ** 5, unit="nodes"),
+    # 업체 100곳, 사고 500건 배차 (행렬 계산은 준비 단계)
+    Stage("dispatch_500", _setup_dispatch, _run_dispatch, max_size=10 ** 5, unit="nodes"),
+    # 순수 파이썬 축약 과정이라 격자 10^4 노드에서 약 1분 소요
+    Stage("ch_build", _setup_road, _run_ch_build, max_size=10 ** 4, unit="nodes", max_repeat=1, trace_memory=False),
+    Stage("ch_queries_1k", _setup_ch_queries, _run_ch_queries, max_size=10 ** 4, unit="nodes"),
+    Stage("road_render", _setup_road, _run_road_render, max_size=10 ** 5, unit="nodes"),
+]}
@@ -0,0 +1 @@
+# 응급의료 대시보드(main.py)에서 사용하는 Streamlit 비의존 처리 모듈 모음
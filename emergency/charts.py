@@ -0,0 +1,55 @@
+# -------------------------------
+# 대시보드 차트 (PNG 바이트 캐시)
+# -------------------------------
+# 시도별 이송 건수 / 시간대별 / 월별 차트를 pyplot 전역 상태 없이 Figure 로 그리고 PNG 바이트로 저장한다.
+# 결과는 (차트 종류, 지역, 연도, 데이터 버전) 키로 캐시하여, 사이드바에서 지역을 다시 고르면 그리지 않고 바로 보여준다.
+import io
+import threading
+from collections import OrderedDict
+
+_CHART_CACHE_SIZE = 128
+_chart_cache = OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+# Matplotlib 한글 폰트 설정
+FONT_FAMILY = "Malgun Gothic"  # Windows 사용자
+# FONT_FAMILY = "AppleGothic"  # macOS 사용자
+
+
+def new_figure(figsize=None):
+    """(Figure, Axes). matplotlib 은 첫 차트를 그릴 때 import 한다."""
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    matplotlib.rcParams["font.family"] = FONT_FAMILY
+    matplotlib.rcParams["axes.unicode_minus"] = False  # 마이너스 폰트 깨짐 방지
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+
+def series_chart(series, kind, title, xlabel, ylabel, color, figsize=None, **plot_kwargs):
+    """pandas Series 하나를 그린 Figure."""
+    fig, ax = new_figure(figsize)
+    series.plot(kind=kind, ax=ax, color=color, **plot_kwargs)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
+
+
+def chart_png(key, draw, dpi=100):
+    """key 로 캐시된 차트 PNG 바이트. 없으면 draw() 가 반환한 Figure 를 PNG 로 저장하여 캐시한다."""
+    with _chart_cache_lock:
+        png = _chart_cache.get(key)
+        if png is not None:
+            _chart_cache.move_to_end(key)
+            return png
+    buffer = io.BytesIO()
+    draw().savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    png = buffer.getvalue()
+    with _chart_cache_lock:
+        _chart_cache[key] = png
+        if len(_chart_cache) > _CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return png
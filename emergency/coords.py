@@ -0,0 +1,147 @@
+# -------------------------------
+# 좌표 변환 (EPSG:5174 -> WGS84)
+# -------------------------------
+# 공공데이터포털(LOCALDATA) 인허가 자료의 '좌표정보x(epsg5174)' / '좌표정보y(epsg5174)'는
+# Bessel 타원체 기반 수정 중부원점 TM 좌표이므로, 지오코딩 없이 수식만으로 위경도를 얻을 수 있다.
+# 모든 연산은 NumPy 배열 단위로 수행되어 데이터프레임 전체를 한 번에 변환한다.
+import numpy as np
+import pandas as pd
+
+EPSG5174_X_COL = '좌표정보x(epsg5174)'
+EPSG5174_Y_COL = '좌표정보y(epsg5174)'
+LAT_COL = '출발_위도'
+LON_COL = '출발_경도'
+
+# Bessel 1841 타원체
+_BESSEL_A = 6377397.155
+_BESSEL_F = 1 / 299.1528128
+# WGS84 타원체
+_WGS84_A = 6378137.0
+_WGS84_F = 1 / 298.257223563
+
+# EPSG:5174 (Korean 1985 / Modified Central Belt) 투영 파라미터
+_LAT0 = np.radians(38.0)
+_LON0 = np.radians(127.0028902777778)  # 127°00'10.405" (동경 보정값 포함)
+_K0 = 1.0
+_X0 = 200000.0
+_Y0 = 500000.0
+
+# Bessel -> WGS84 7변수 변환 (국내 공공데이터에서 통용되는 towgs84 값, Position Vector 방식)
+_TOWGS84 = (-115.80, 474.99, 674.11, 1.16, -2.31, -1.63, 6.43)
+
+# 대한민국 영역 (범위를 벗어난 좌표는 잘못된 값으로 간주)
+_KOREA_LAT_RANGE = (32.5, 39.0)
+_KOREA_LON_RANGE = (124.0, 132.0)
+
+
+def _meridian_arc(phi, a, e2):
+    e4 = e2 * e2
+    e6 = e4 * e2
+    return a * ((1 - e2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+                - (3 * e2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * np.sin(2 * phi)
+                + (15 * e4 / 256 + 45 * e6 / 1024) * np.sin(4 * phi)
+                - (35 * e6 / 3072) * np.sin(6 * phi))
+
+
+def _tm_inverse(x, y):
+    # Transverse Mercator 역변환 (Snyder, Map Projections - A Working Manual, 식 8-12 ~ 8-18)
+    a = _BESSEL_A
+    e2 = _BESSEL_F * (2 - _BESSEL_F)
+    ep2 = e2 / (1 - e2)
+
+    m = _meridian_arc(_LAT0, a, e2) + (y - _Y0) / _K0
+    mu = m / (a * (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256))
+    e1 = (1 - np.sqrt(1 - e2)) / (1 + np.sqrt(1 - e2))
+    phi1 = (mu
+            + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * np.sin(2 * mu)
+            + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * np.sin(4 * mu)
+            + (151 * e1 ** 3 / 96) * np.sin(6 * mu)
+            + (1097 * e1 ** 4 / 512) * np.sin(8 * mu))
+
+    sin1 = np.sin(phi1)
+    cos1 = np.cos(phi1)
+    tan1 = np.tan(phi1)
+    c1 = ep2 * cos1 ** 2
+    t1 = tan1 ** 2
+    w = 1 - e2 * sin1 ** 2
+    n1 = a / np.sqrt(w)
+    r1 = a * (1 - e2) / w ** 1.5
+    d = (x - _X0) / (n1 * _K0)
+
+    lat = phi1 - (n1 * tan1 / r1) * (
+        d ** 2 / 2
+        - (5 + 3 * t1 + 10 * c1 - 4 * c1 ** 2 - 9 * ep2) * d ** 4 / 24
+        + (61 + 90 * t1 + 298 * c1 + 45 * t1 ** 2 - 252 * ep2 - 3 * c1 ** 2) * d ** 6 / 720)
+    lon = _LON0 + (
+        d
+        - (1 + 2 * t1 + c1) * d ** 3 / 6
+        + (5 - 2 * c1 + 28 * t1 - 3 * c1 ** 2 + 8 * ep2 + 24 * t1 ** 2) * d ** 5 / 120) / cos1
+    return lat, lon
+
+
+def _geodetic_to_ecef(lat, lon, a, f):
+    e2 = f * (2 - f)
+    n = a / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    x = n * np.cos(lat) * np.cos(lon)
+    y = n * np.cos(lat) * np.sin(lon)
+    z = n * (1 - e2) * np.sin(lat)
+    return x, y, z
+
+
+def _ecef_to_geodetic(x, y, z, a, f):
+    # Bowring 방식 (1회 반복으로 mm 수준 정확도)
+    e2 = f * (2 - f)
+    b = a * (1 - f)
+    ep2 = (a ** 2 - b ** 2) / b ** 2
+    p = np.hypot(x, y)
+    theta = np.arctan2(z * a, p * b)
+    lat = np.arctan2(z + ep2 * b * np.sin(theta) ** 3, p - e2 * a * np.cos(theta) ** 3)
+    lon = np.arctan2(y, x)
+    return lat, lon
+
+
+def _helmert(x, y, z):
+    tx, ty, tz, rx, ry, rz, ds = _TOWGS84
+    sec = np.pi / (180 * 3600)
+    rx, ry, rz = rx * sec, ry * sec, rz * sec
+    s = 1 + ds * 1e-6
+    xt = tx + s * (x - rz * y + ry * z)
+    yt = ty + s * (rz * x + y - rx * z)
+    zt = tz + s * (-ry * x + rx * y + z)
+    return xt, yt, zt
+
+
+def epsg5174_to_wgs84(x, y):
+    """EPSG:5174 좌표 배열(x, y)을 WGS84 (위도, 경도) 배열로 변환한다.
+
+    NaN 이거나 대한민국 영역을 벗어나는 결과는 NaN 으로 반환한다.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    with np.errstate(invalid='ignore'):
+        lat_b, lon_b = _tm_inverse(x, y)
+        ex, ey, ez = _geodetic_to_ecef(lat_b, lon_b, _BESSEL_A, _BESSEL_F)
+        ex, ey, ez = _helmert(ex, ey, ez)
+        lat, lon = _ecef_to_geodetic(ex, ey, ez, _WGS84_A, _WGS84_F)
+        lat = np.degrees(lat)
+        lon = np.degrees(lon)
+        valid = ((lat >= _KOREA_LAT_RANGE[0]) & (lat <= _KOREA_LAT_RANGE[1])
+                 & (lon >= _KOREA_LON_RANGE[0]) & (lon <= _KOREA_LON_RANGE[1]))
+    lat = np.where(valid, lat, np.nan)
+    lon = np.where(valid, lon, np.nan)
+    return lat, lon
+
+
+def epsg5174_coordinates(df):
+    """EPSG:5174 컬럼으로부터 '출발_위도'/'출발_경도' 두 컬럼짜리 데이터프레임을 만든다. (행 순서 유지, RangeIndex)
+
+    좌표 컬럼이 없거나 값이 비어 있는 행은 NaN 으로 남겨, 호출 측에서 지오코딩으로 보완하도록 한다.
+    """
+    if EPSG5174_X_COL in df.columns and EPSG5174_Y_COL in df.columns:
+        x = pd.to_numeric(df[EPSG5174_X_COL], errors='coerce').to_numpy()
+        y = pd.to_numeric(df[EPSG5174_Y_COL], errors='coerce').to_numpy()
+        lat, lon = epsg5174_to_wgs84(x, y)
+    else:
+        lat = np.full(len(df), np.nan)
+        lon = np.full(len(df), np.nan)
+    return pd.DataFrame({LAT_COL: lat, LON_COL: lon})
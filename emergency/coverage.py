@@ -0,0 +1,270 @@
+# -------------------------------
+# 이송업체 등시간권(isochrone) 및 커버리지 공백 분석
+# -------------------------------
+# 각 이송업체에서 최대 임계 시간까지만 탐색하는 제한 다익스트라로 5/10/15/20분 등시간권을 구하고,
+# 어떤 이송업체도 임계 시간 내에 도달하지 못하는 도로망 노드를 시군구별로 집계하고, 도로망 상에서 이어진 미도달 노드 묶음도 보고한다.
+# 행정 경계 자료가 없으므로 노드의 시군구는 가장 가까운 등록 사업장 주소(resolve_regions 로 판별한 시도/시군구)로 추정한다.
+#
+# 업체별 결과는 디스크에 저장되며, 이송업체 목록이 바뀌면 추가/삭제/변경된 업체만 다시 계산한다.
+# (영업상태명, 구급차특수, 구급차일반, 좌표가 바뀐 업체는 '변경'으로 간주)
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from emergency.regions import SIDO_COL, SIGUNGU_COL
+from emergency.routing import ACTIVE_STATUS, LAT_COL, LON_COL, NodeSnapper
+
+DEFAULT_COVERAGE_CACHE_DIR = os.path.join(".cache", "coverage")
+DEFAULT_THRESHOLDS_MIN = (5, 10, 15, 20)
+DEFAULT_MAX_SNAP_DISTANCE_M = 2000.0
+
+# 등록부에는 이름/주소가 같은 업체(지점)가 여러 번 나오므로 인허가일자까지 식별자에 포함하고,
+# 그래도 같은 행은 등장 순번을 덧붙여 구분한다.
+_IDENTITY_COLS = ("사업장명", "소재지전체주소", "인허가일자")
+_SIGNATURE_COLS = ("영업상태명", "구급차특수", "구급차일반", LAT_COL, LON_COL)
+
+# 작업 프로세스에서 공유하는 도로망 (initializer 에서 한 번만 준비)
+_worker_csr = None
+
+
+def _init_worker(snapshot_dir, csr):
+    global _worker_csr
+    if snapshot_dir is not None:
+        # 메모리 매핑으로 열어 부모 프로세스와 페이지를 공유
+        from emergency.road_snapshot import load_snapshot
+
+        _worker_csr = load_snapshot(snapshot_dir).csr("travel_time")
+    else:
+        _worker_csr = csr
+
+
+def _bounded_isochrone(source_node, limit_seconds, csr=None):
+    # limit 을 넘는 노드는 탐색하지 않는 제한 다익스트라 (조기 종료)
+    from scipy.sparse.csgraph import dijkstra
+
+    dist = dijkstra(csr if csr is not None else _worker_csr, directed=True, indices=int(source_node),
+                    limit=limit_seconds)
+    reached = np.flatnonzero(np.isfinite(dist)).astype(np.int32)
+    return reached, dist[reached].astype(np.float32)
+
+
+def _hash_values(values):
+    return hashlib.sha1("\x1f".join("" if pd.isna(v) else str(v) for v in values).encode("utf-8")).hexdigest()
+
+
+def provider_records(transport_df):
+    """이송업체별 {식별자: {signature, name, lat, lon, active}} 사전을 만든다. (행마다 하나씩)"""
+    has_fleet = "구급차특수" in transport_df.columns or "구급차일반" in transport_df.columns
+    records = {}
+    occurrences = {}
+    for row in transport_df.to_dict("records"):
+        identity = _hash_values([row.get(c) for c in _IDENTITY_COLS])[:16]
+        occurrences[identity] = occurrences.get(identity, 0) + 1
+        if occurrences[identity] > 1:
+            identity = _hash_values([identity, occurrences[identity] - 1])[:16]
+        fleet = sum(0.0 if pd.isna(row.get(c)) else float(row.get(c)) for c in ("구급차특수", "구급차일반"))
+        status = row.get("영업상태명")
+        records[identity] = {
+            "signature": _hash_values([row.get(c) for c in _SIGNATURE_COLS]),
+            "name": row.get("사업장명"),
+            "lat": row.get(LAT_COL),
+            "lon": row.get(LON_COL),
+            # 폐업 업체나 구급차가 0대로 등록된 업체는 출동할 수 없으므로 커버리지에서 제외
+            "active": (status is None or status == ACTIVE_STATUS) and (fleet > 0 or not has_fleet),
+        }
+    return records
+
+
+def region_anchors(transport_df):
+    """노드 시군구 추정의 기준점: 좌표와 시도/시군구가 모두 있는 등록 사업장 (영업 상태와 무관)."""
+    columns = [LAT_COL, LON_COL, SIDO_COL, SIGUNGU_COL]
+    if not all(c in transport_df.columns for c in columns):
+        return pd.DataFrame(columns=columns)
+    return transport_df[columns].dropna().reset_index(drop=True)
+
+
+def anchors_key(anchors):
+    """기준점 좌표나 시도/시군구가 바뀌면 달라지는 해시 키."""
+    hashed = pd.util.hash_pandas_object(anchors.astype(str), index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def node_regions(snapshot, anchors):
+    """도로망 노드별 (시도명, 시군구명) 데이터프레임. 각 노드에 가장 가까운 기준점의 지역을 붙인다. (근사)"""
+    from scipy.spatial import cKDTree
+
+    if anchors.empty:
+        return pd.DataFrame({SIDO_COL: [None] * snapshot.num_nodes, SIGUNGU_COL: [None] * snapshot.num_nodes})
+    # NodeSnapper 와 같은 등장방형 근사 (최근접 비교만 하므로 지구 반지름은 곱하지 않음)
+    cos_lat0 = np.cos(np.radians(float(np.mean(snapshot.node_y)))) if snapshot.num_nodes else 1.0
+
+    def project(lon, lat):
+        return np.column_stack((np.asarray(lon, dtype=np.float64) * cos_lat0, np.asarray(lat, dtype=np.float64)))
+
+    tree = cKDTree(project(anchors[LON_COL], anchors[LAT_COL]))
+    _, nearest = tree.query(project(snapshot.node_x, snapshot.node_y))
+    return pd.DataFrame({
+        SIDO_COL: anchors[SIDO_COL].to_numpy(dtype=object)[nearest],
+        SIGUNGU_COL: anchors[SIGUNGU_COL].to_numpy(dtype=object)[nearest],
+    })
+
+
+class CoverageAnalyzer:
+    """도로망 하나에 대한 증분 커버리지 분석기."""
+
+    def __init__(self, snapshot, cache_dir=DEFAULT_COVERAGE_CACHE_DIR, thresholds_min=DEFAULT_THRESHOLDS_MIN,
+                 max_workers=None, max_snap_distance_m=DEFAULT_MAX_SNAP_DISTANCE_M):
+        self.snapshot = snapshot
+        self.thresholds_min = tuple(sorted(thresholds_min))
+        self.limit_seconds = self.thresholds_min[-1] * 60.0
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_snap_distance_m = max_snap_distance_m
+        self.cache_dir = os.path.join(cache_dir, f"{snapshot.fingerprint[:16]}_{int(self.limit_seconds)}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._snapper = None
+        self.manifest = self._load_manifest()  # {식별자: {"signature", "name", "node"}}
+        self._isochrones = {}  # {식별자: (노드 배열, 시간 배열)} 메모리 캐시
+
+    def _manifest_path(self):
+        return os.path.join(self.cache_dir, "manifest.json")
+
+    def _load_manifest(self):
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _isochrone_path(self, identity):
+        return os.path.join(self.cache_dir, f"{identity}.npz")
+
+    def _snap(self, records):
+        if self._snapper is None:
+            self._snapper = NodeSnapper(self.snapshot)
+        lat = np.array([float(r["lat"]) for r in records], dtype=np.float64)
+        lon = np.array([float(r["lon"]) for r in records], dtype=np.float64)
+        return self._snapper.snap(lat, lon)
+
+    def _compute(self, nodes):
+        if len(nodes) <= 2 or self.max_workers <= 1:
+            csr = self.snapshot.csr("travel_time")
+            return [_bounded_isochrone(node, self.limit_seconds, csr) for node in nodes]
+        # 스냅샷 디렉터리가 있으면 경로만 넘겨 각 프로세스가 메모리 매핑으로 열도록 함
+        init_args = ((self.snapshot.source_dir, None) if self.snapshot.source_dir
+                     else (None, self.snapshot.csr("travel_time")))
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                 initargs=init_args) as pool:
+            return list(pool.map(_bounded_isochrone, nodes, [self.limit_seconds] * len(nodes)))
+
+    def update(self, transport_df):
+        """이송업체 목록을 반영한다. 추가/변경된 업체만 다시 계산하고 삭제된 업체는 제거한다.
+
+        반환값: {"added": [...], "changed": [...], "removed": [...]} (업체 식별자 목록)
+        """
+        records = {k: r for k, r in provider_records(transport_df).items()
+                   if r["active"] and not pd.isna(r["lat"]) and not pd.isna(r["lon"])}
+        added = [k for k in records if k not in self.manifest]
+        changed = [k for k in records if k in self.manifest and self.manifest[k]["signature"] != records[k]["signature"]]
+        removed = [k for k in self.manifest if k not in records]
+
+        for identity in removed:
+            del self.manifest[identity]
+            self._isochrones.pop(identity, None)
+            if os.path.exists(self._isochrone_path(identity)):
+                os.remove(self._isochrone_path(identity))
+
+        to_compute = added + changed
+        if to_compute:
+            nodes, distance = self._snap([records[k] for k in to_compute])
+            inside = distance <= self.max_snap_distance_m
+            computed = self._compute(nodes[inside].tolist())
+            results = iter(computed)
+            for identity, node, is_inside in zip(to_compute, nodes.tolist(), inside.tolist()):
+                # 도로망 밖의 업체도 기록하여, 목록이 바뀌지 않는 한 다시 스냅하지 않음
+                reached, times = next(results) if is_inside else (np.empty(0, np.int32), np.empty(0, np.float32))
+                np.savez(self._isochrone_path(identity), nodes=reached, times=times)
+                self._isochrones[identity] = (reached, times)
+                self.manifest[identity] = {"signature": records[identity]["signature"],
+                                           "name": records[identity]["name"],
+                                           "node": int(node) if is_inside else -1}
+        if to_compute or removed:
+            self._save_manifest()
+        return {"added": added, "changed": changed, "removed": removed}
+
+    def isochrone(self, identity):
+        """업체 하나의 (도달 노드 배열, 도달 시간(초) 배열)."""
+        if identity not in self._isochrones:
+            with np.load(self._isochrone_path(identity)) as data:
+                self._isochrones[identity] = (data["nodes"], data["times"])
+        return self._isochrones[identity]
+
+    def best_times(self):
+        """노드별로 가장 빨리 도달하는 업체의 도달 시간(초). 최대 임계 시간 내 도달 불가 노드는 inf."""
+        best = np.full(self.snapshot.num_nodes, np.inf, dtype=np.float32)
+        for identity in self.manifest:
+            nodes, times = self.isochrone(identity)
+            np.minimum.at(best, nodes, times)
+        return best
+
+    def coverage_summary(self, best=None):
+        """임계 시간별 도달 가능/불가 노드 수와 비율."""
+        best = self.best_times() if best is None else best
+        total = len(best)
+        rows = []
+        for minutes in self.thresholds_min:
+            covered = int(np.count_nonzero(best <= minutes * 60))
+            rows.append({
+                "임계시간(분)": minutes,
+                "도달 노드 수": covered,
+                "미도달 노드 수": total - covered,
+                "도달 비율(%)": round(100 * covered / total, 2) if total else 0.0,
+            })
+        return pd.DataFrame(rows)
+
+    def region_gaps(self, minutes, regions, best=None):
+        """시군구별 도로망 노드 수와 임계 시간 내 어떤 업체도 도달하지 못하는 노드 수. (미도달 노드 수 내림차순)
+
+        regions: node_regions() 결과 (노드 순서대로 시도명/시군구명)
+        """
+        best = self.best_times() if best is None else best
+        counts = pd.DataFrame({
+            SIDO_COL: regions[SIDO_COL].fillna("미상").to_numpy(),
+            SIGUNGU_COL: regions[SIGUNGU_COL].fillna("미상").to_numpy(),
+            "미도달": ~(best <= minutes * 60),
+        }).groupby([SIDO_COL, SIGUNGU_COL]).agg(**{"노드 수": ("미도달", "size"), "미도달 노드 수": ("미도달", "sum")})
+        counts = counts.reset_index()
+        counts["미도달 비율(%)"] = (100 * counts["미도달 노드 수"] / counts["노드 수"]).round(2)
+        counts = counts[counts["미도달 노드 수"] > 0]
+        return counts.sort_values(["미도달 노드 수", "노드 수"], ascending=False).reset_index(drop=True)
+
+    def uncovered_clusters(self, minutes, best=None, min_nodes=1):
+        """임계 시간 내 어떤 업체도 도달하지 못하는 노드 중 도로망으로 서로 이어진 묶음(연결 요소) 목록."""
+        from scipy.sparse.csgraph import connected_components
+
+        best = self.best_times() if best is None else best
+        uncovered = np.flatnonzero(~(best <= minutes * 60))
+        if len(uncovered) == 0:
+            return pd.DataFrame(columns=["연결 묶음", "노드 수", "중심 위도", "중심 경도"])
+        csr = self.snapshot.csr("length")
+        sub = csr[uncovered][:, uncovered]
+        _, labels = connected_components(sub, directed=True, connection="weak")
+        clusters = pd.DataFrame({
+            "연결 묶음": labels,
+            "위도": self.snapshot.node_y[uncovered],
+            "경도": self.snapshot.node_x[uncovered],
+        }).groupby("연결 묶음").agg(**{
+            "노드 수": ("위도", "size"),
+            "중심 위도": ("위도", "mean"),
+            "중심 경도": ("경도", "mean"),
+        }).reset_index()
+        clusters = clusters[clusters["노드 수"] >= min_nodes]
+        return clusters.sort_values("노드 수", ascending=False).reset_index(drop=True)
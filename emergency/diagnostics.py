@@ -0,0 +1,141 @@
+# -------------------------------
+# 처리 단계별 실행 시간 / 메모리 계측
+# -------------------------------
+# 대시보드 한 번의 실행(Streamlit rerun) 동안 로드, 시도 판별, 좌표 변환, 도로망 로드, 차트 그리기 등
+# 단계마다 걸린 시간과 프로세스 메모리 변화를 기록하고, 단계가 끝날 때마다 JSON Lines 로그 파일에 한 줄씩 추가한다.
+# 계측 자체는 perf_counter 와 현재 RSS 조회(psutil)뿐이라 항상 켜 두어도 부담이 없다. (tracemalloc 은 사용하지 않음)
+# 최대 RSS(ru_maxrss)는 단조 증가하여 단계별 변화가 대부분 0 으로 보이므로 쓰지 않는다. psutil 이 없으면 메모리는 비워 둔다.
+# 로그 파일이 max_log_bytes 를 넘으면 '.1' 백업으로 넘기고 새 파일을 시작하며, 진단 화면은 파일 끝부분만 읽는다.
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+DEFAULT_LOG_PATH = os.path.join(".cache", "logs", "stage_timings.jsonl")
+DEFAULT_MAX_LOG_BYTES = 5 * 2 ** 20
+_TAIL_BLOCK_BYTES = 64 * 1024
+
+_log_lock = threading.Lock()
+
+
+def memory_mb():
+    """현재 프로세스 RSS(MB). psutil 이 없으면 None."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 2 ** 20
+
+
+class StageRecorder:
+    """한 번의 실행 동안의 단계별 계측 기록. log_path 가 None 이면 파일에 쓰지 않는다."""
+
+    def __init__(self, log_path=DEFAULT_LOG_PATH, run_id=None, clock=time.perf_counter,
+                 max_log_bytes=DEFAULT_MAX_LOG_BYTES):
+        self.log_path = log_path
+        self.max_log_bytes = max_log_bytes
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self._clock = clock
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """with recorder.stage("transport_load") as extra: ... 형태로 사용. extra 에 넣은 값은 기록에 함께 저장된다."""
+        extra = dict(fields)
+        memory_before = memory_mb()
+        started = self._clock()
+        error = None
+        try:
+            yield extra
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record(name, self._clock() - started, memory_before=memory_before, error=error, **extra)
+
+    def record(self, name, seconds, memory_before=None, error=None, **fields):
+        """이미 측정한 구간(예: 스크립트 시작 ~ import 완료)을 기록한다."""
+        memory_after = memory_mb()
+        entry = {
+            "run_id": self.run_id,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "stage": name,
+            "seconds": round(seconds, 6),
+            "memory_mb": None if memory_after is None else round(memory_after, 1),
+            "memory_delta_mb": (None if memory_after is None or memory_before is None
+                                else round(memory_after - memory_before, 1)),
+        }
+        if error is not None:
+            entry["error"] = error
+        entry.update(fields)
+        self.records.append(entry)
+        if self.log_path:
+            self._append(entry)
+        return entry
+
+    def _append(self, entry):
+        directory = os.path.dirname(self.log_path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _log_lock:
+                if (self.max_log_bytes and os.path.exists(self.log_path)
+                        and os.path.getsize(self.log_path) >= self.max_log_bytes):
+                    os.replace(self.log_path, self.log_path + ".1")
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            # 로그를 남기지 못해도 화면 처리는 계속 진행
+            pass
+
+    def summary(self):
+        """이번 실행의 단계별 기록 (단계, 시간(초), 메모리(MB), 메모리 변화(MB))."""
+        columns = {"stage": "단계", "seconds": "시간(초)", "memory_mb": "메모리(MB)", "memory_delta_mb": "메모리 변화(MB)"}
+        df = pd.DataFrame(self.records, columns=list(columns))
+        return df.rename(columns=columns)
+
+    @property
+    def total_seconds(self):
+        return sum(entry["seconds"] for entry in self.records)
+
+
+def _tail_lines(path, max_lines):
+    # 파일 끝에서부터 블록 단위로 거꾸로 읽어 마지막 max_lines 줄만 반환 (파일 전체를 읽지 않음)
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= max_lines:
+            step = min(_TAIL_BLOCK_BYTES, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.split(b"\n")
+    if position > 0:
+        lines = lines[1:]  # 블록 경계에서 잘린 첫 줄
+    return [line.decode("utf-8", errors="replace") for line in lines if line.strip()][-max_lines:]
+
+
+def read_stage_log(path=DEFAULT_LOG_PATH, max_lines=None):
+    """JSON Lines 로그 파일을 데이터프레임으로 읽는다. (손상된 줄은 건너뜀)
+
+    max_lines 를 주면 파일 끝에서 그 줄 수만큼만 읽는다.
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    if max_lines:
+        lines = _tail_lines(path, max_lines)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return pd.DataFrame(entries)
@@ -0,0 +1,257 @@
+# -------------------------------
+# 구급차 일괄 배차 최적화 (이송업체 보유 대수 제약 + 중증도 가중 도착 시간 최소화)
+# -------------------------------
+# 1. 영업 중인 이송업체를 도로망 노드에 스냅하고 업체 노드마다 다익스트라를 한 번씩 수행하여
+#    (업체, 도로망 노드) 주행 시간 행렬을 미리 계산해 둔다. (도로망 fingerprint + 업체 목록 해시별 디스크 캐시)
+#    행렬이 max_matrix_bytes 보다 크고 미리 만든 CH 인덱스(emergency.eta_index)가 있으면 행렬 대신
+#    사고 묶음이 들어올 때마다 CH 다대다 질의로 업체 -> 사고 지점 주행 시간만 계산한다.
+# 2. 대기 중인 사고(환자) 묶음이 들어오면 행렬에서 사고 노드 열만 잘라 비용 행렬을 만들고,
+#    업체별 구급차 대수만큼 열을 복제한 뒤 헝가리안 알고리즘(linear_sum_assignment)으로
+#    sum(응급도 점수 x 도착 시간)이 최소가 되도록 배정한다.
+#    구급차가 모자라거나 도달할 수 없는 사고는 미배정(응급도 점수 x 벌점 시간)으로 계산되므로
+#    구급차가 부족하면 응급도가 높은 사고부터 배정된다.
+# 3. 같은 묶음을 응급도 순 + 최근접 우선 탐욕 배정과 비교하여 개선 정도를 보고한다.
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from emergency.routing import (DEFAULT_MAX_SNAP_DISTANCE_M, PROVIDER_NAME_COL, provider_key, select_active_providers,
+                               snap_providers)
+
+DEFAULT_DISPATCH_CACHE_DIR = os.path.join(".cache", "dispatch")
+FLEET_COLS = ("구급차특수", "구급차일반")
+# 미배정 사고의 비용으로 쓰는 도착 시간 (초). 어떤 실제 배정보다도 크게 잡아 가능한 한 모두 배정되도록 함
+DEFAULT_UNSERVED_PENALTY_SECONDS = 4 * 3600.0
+# (업체 노드 수 x 도로망 노드 수) 행렬이 이보다 크면 CH 인덱스가 있을 때 행렬을 만들지 않음
+DEFAULT_MAX_MATRIX_BYTES = 256 * 2 ** 20
+
+INCIDENT_LAT_COL = "위도"
+INCIDENT_LON_COL = "경도"
+INCIDENT_WEIGHT_COL = "응급도 점수"
+INCIDENT_LEVEL_COL = "중증도"
+OUTSIDE_GRAPH_COL = "도로망 밖"
+
+# 가상 대량 발생 시 중증도 분포 (경증 -> 매우_응급 순)
+DEFAULT_SURGE_LEVEL_PROBS = (0.35, 0.30, 0.20, 0.10, 0.05)
+
+
+def fleet_sizes(providers_df):
+    """업체별 출동 가능 구급차 대수 (특수 + 일반). 대수 컬럼이 없으면 업체당 1대로 본다."""
+    cols = [c for c in FLEET_COLS if c in providers_df.columns]
+    if not cols:
+        return np.ones(len(providers_df), dtype=np.int64)
+    fleet = sum(pd.to_numeric(providers_df[c], errors="coerce").fillna(0).to_numpy(dtype=np.float64) for c in cols)
+    return np.maximum(np.round(fleet), 0).astype(np.int64)
+
+
+class TravelTimeMatrix:
+    """(이송업체, 도로망 노드) 주행 시간(초) 행렬.
+
+    같은 노드에 스냅된 업체는 다익스트라 결과 한 행을 공유한다. (provider_rows[i]: 업체 i의 행 번호)
+    """
+
+    def __init__(self, snapshot, providers, provider_nodes, capacity, node_times, provider_rows, snapper):
+        self.snapshot = snapshot
+        self.providers = providers
+        self.provider_nodes = provider_nodes
+        self.capacity = capacity
+        self.node_times = node_times
+        self.provider_rows = provider_rows
+        self.snapper = snapper
+
+    @property
+    def num_providers(self):
+        return len(self.providers)
+
+    @property
+    def total_fleet(self):
+        return int(self.capacity.sum())
+
+    def times_to(self, nodes):
+        """(업체 수, 노드 수) 주행 시간 행렬. 도달할 수 없으면 inf."""
+        return self.node_times[:, np.asarray(nodes, dtype=np.int64)][self.provider_rows].astype(np.float64)
+
+
+class CHTravelTimeMatrix(TravelTimeMatrix):
+    """전체 행렬 대신 CH 인덱스로 사고 지점 열만 계산하는 주행 시간 행렬."""
+
+    def __init__(self, snapshot, providers, provider_nodes, capacity, eta_index, source_nodes, provider_rows, snapper):
+        super().__init__(snapshot, providers, provider_nodes, capacity, None, provider_rows, snapper)
+        self.eta_index = eta_index
+        self.source_nodes = source_nodes
+
+    def times_to(self, nodes):
+        return self.eta_index.matrix(self.source_nodes, nodes)[self.provider_rows]
+
+
+def fleet_key(providers_df):
+    """이송업체 목록(이름, 좌표)이나 구급차 대수가 바뀌면 달라지는 해시 키."""
+    return provider_key(providers_df) + hashlib.sha1(fleet_sizes(providers_df).tobytes()).hexdigest()[:16]
+
+
+def _cache_path(cache_dir, graph_fingerprint, providers_fingerprint):
+    return os.path.join(cache_dir, f"times_{graph_fingerprint[:16]}_{providers_fingerprint[:32]}.npy")
+
+
+def build_travel_time_matrix(snapshot, transport_df, cache_dir=DEFAULT_DISPATCH_CACHE_DIR,
+                             max_snap_distance_m=DEFAULT_MAX_SNAP_DISTANCE_M, eta_index=None,
+                             max_matrix_bytes=DEFAULT_MAX_MATRIX_BYTES):
+    """영업 중이고 구급차가 1대 이상인 업체에 대해 주행 시간 행렬을 만든다.
+
+    메모리 사용량은 (업체가 스냅된 서로 다른 노드 수) x (도로망 노드 수) x 4바이트이다.
+    이 크기가 max_matrix_bytes 를 넘고 eta_index(CHIndex)가 주어지면 CHTravelTimeMatrix 를 반환한다.
+    """
+    from scipy.sparse.csgraph import dijkstra
+
+    providers = select_active_providers(transport_df)
+    providers = providers[fleet_sizes(providers) > 0]
+    providers, provider_nodes, snapper = snap_providers(snapshot, providers, max_snap_distance_m=max_snap_distance_m)
+    unique_nodes, provider_rows = np.unique(provider_nodes, return_inverse=True)
+    if eta_index is not None and len(unique_nodes) * snapshot.num_nodes * 4 > max_matrix_bytes:
+        return CHTravelTimeMatrix(snapshot, providers.reset_index(drop=True), provider_nodes, fleet_sizes(providers),
+                                  eta_index, unique_nodes, provider_rows.ravel(), snapper)
+
+    path = _cache_path(cache_dir, snapshot.fingerprint, fleet_key(providers)) if cache_dir else None
+    if path and os.path.exists(path):
+        node_times = np.load(path, mmap_mode="r")
+    elif len(unique_nodes) == 0:
+        node_times = np.empty((0, snapshot.num_nodes), dtype=np.float32)
+    else:
+        node_times = dijkstra(snapshot.csr("travel_time"), directed=True, indices=unique_nodes).astype(np.float32)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, node_times)
+            os.replace(tmp_path, path)
+    return TravelTimeMatrix(snapshot, providers.reset_index(drop=True), provider_nodes, fleet_sizes(providers),
+                            node_times, provider_rows.ravel(), snapper)
+
+
+def arrival_times(times, assigned):
+    """배정된 업체의 도착 시간(초) 배열 (미배정: NaN)."""
+    served = assigned >= 0
+    arrival = np.full(len(assigned), np.nan)
+    arrival[served] = times[assigned[served], np.flatnonzero(served)]
+    return arrival
+
+
+def optimal_assignment(times, capacity, weights, unserved_penalty=DEFAULT_UNSERVED_PENALTY_SECONDS):
+    """sum(weights x 도착 시간)을 최소화하는 배정. 반환값: 사고별 업체 위치 배열 (-1: 미배정)."""
+    from scipy.optimize import linear_sum_assignment
+
+    num_incidents = times.shape[1]
+    if num_incidents == 0 or len(capacity) == 0:
+        return np.full(num_incidents, -1, dtype=np.int64)
+    # 업체마다 구급차 대수만큼 열을 복제 (사고 수보다 많이 복제할 필요는 없음)
+    slot_provider = np.repeat(np.arange(len(capacity)), np.minimum(capacity, num_incidents))
+    slot_times = times[slot_provider].T
+    weights = np.asarray(weights, dtype=np.float64)
+    # 비용을 "미배정 대비 절감량"으로 바꾸면(응급도 x (도착 시간 - 벌점 시간)) 미배정 열을 따로 두지 않아도 된다.
+    # 구급차가 모자라면 절감량이 큰(응급도가 높은) 사고부터 배정되고, 도달할 수 없는 칸(0)은 미배정과 같다.
+    cost = np.where(np.isfinite(slot_times), (slot_times - unserved_penalty) * weights[:, None], 0.0)
+    rows, cols = linear_sum_assignment(cost)
+    assigned = np.full(num_incidents, -1, dtype=np.int64)
+    assigned[rows] = slot_provider[cols]
+    # 비용상 선택되었더라도 실제로 도달할 수 없는 배정은 미배정으로 처리
+    assigned[~np.isfinite(arrival_times(times, assigned))] = -1
+    return assigned
+
+
+def greedy_assignment(times, capacity, weights):
+    """응급도가 높은 사고부터 남은 구급차가 있는 최근접 업체를 배정하는 기준 방식."""
+    remaining = np.array(capacity, dtype=np.int64)
+    assigned = np.full(times.shape[1], -1, dtype=np.int64)
+    for incident in np.argsort(-np.asarray(weights, dtype=np.float64), kind="stable"):
+        candidate_times = np.where(remaining > 0, times[:, incident], np.inf)
+        best = int(np.argmin(candidate_times)) if len(candidate_times) else -1
+        if best >= 0 and np.isfinite(candidate_times[best]):
+            assigned[incident] = best
+            remaining[best] -= 1
+    return assigned
+
+
+def _method_summary(name, assigned, times, weights, unserved_penalty):
+    served = assigned >= 0
+    arrival = arrival_times(times, assigned)
+    cost = float(np.sum(np.where(served, arrival, unserved_penalty) * weights))
+    return {
+        "방식": name,
+        "배정": int(served.sum()),
+        "미배정": int((~served).sum()),
+        "평균 도착(분)": float(np.nanmean(arrival) / 60) if served.any() else np.nan,
+        "최대 도착(분)": float(np.nanmax(arrival) / 60) if served.any() else np.nan,
+        "가중 도착 시간 합(점수x분)": cost / 60,
+    }
+
+
+def dispatch_batch(matrix, incidents, unserved_penalty=DEFAULT_UNSERVED_PENALTY_SECONDS,
+                   max_snap_distance_m=DEFAULT_MAX_SNAP_DISTANCE_M):
+    """사고 묶음(위도/경도/응급도 점수 컬럼)을 배차한다.
+
+    도로망에서 max_snap_distance_m 보다 멀리 떨어진 사고(다른 시도 등)는 가장자리 노드로 스냅하지 않고
+    미배정으로 처리하며, 배정 데이터프레임의 '도로망 밖' 컬럼에 표시한다.
+
+    반환값: (사고별 배정 데이터프레임, 방식별 요약 데이터프레임, 탐욕 배정 대비 가중 비용 감소율)
+    """
+    nodes, snap_distance = matrix.snapper.snap(incidents[INCIDENT_LAT_COL].to_numpy(),
+                                               incidents[INCIDENT_LON_COL].to_numpy())
+    outside = snap_distance > max_snap_distance_m
+    weights = incidents[INCIDENT_WEIGHT_COL].to_numpy(dtype=np.float64)
+    times = np.full((matrix.num_providers, len(nodes)), np.inf)
+    times[:, ~outside] = matrix.times_to(nodes[~outside])
+
+    optimal = optimal_assignment(times, matrix.capacity, weights, unserved_penalty)
+    greedy = greedy_assignment(times, matrix.capacity, weights)
+
+    names = (matrix.providers[PROVIDER_NAME_COL].to_numpy(dtype=object) if PROVIDER_NAME_COL in matrix.providers.columns
+             else np.arange(matrix.num_providers).astype(str).astype(object))
+    columns = {OUTSIDE_GRAPH_COL: outside}
+    for label, assigned in (("최적", optimal), ("탐욕", greedy)):
+        provider_names = np.full(len(assigned), None, dtype=object)
+        provider_names[assigned >= 0] = names[assigned[assigned >= 0]]
+        columns[f"{label} 이송업체"] = provider_names
+        columns[f"{label} 도착(분)"] = arrival_times(times, assigned) / 60
+    assignments = pd.concat([incidents.reset_index(drop=True), pd.DataFrame(columns)], axis=1)
+
+    summary = pd.DataFrame([_method_summary("최적 (헝가리안)", optimal, times, weights, unserved_penalty),
+                            _method_summary("탐욕 (응급도순 최근접)", greedy, times, weights, unserved_penalty)])
+    optimal_cost, greedy_cost = summary["가중 도착 시간 합(점수x분)"]
+    improvement = 1 - optimal_cost / greedy_cost if greedy_cost > 0 else 0.0
+    return assignments, summary, improvement
+
+
+def simulate_surge(snapshot, num_incidents, severity_scores, level_probs=DEFAULT_SURGE_LEVEL_PROBS, seed=0):
+    """도로망 노드 위에 무작위로 흩어진 가상 대량 발생 사고 목록."""
+    rng = np.random.default_rng(seed)
+    levels = list(severity_scores)
+    probs = np.asarray(level_probs[:len(levels)], dtype=np.float64)
+    drawn = rng.choice(len(levels), size=num_incidents, p=probs / probs.sum())
+    nodes = rng.integers(snapshot.num_nodes, size=num_incidents)
+    return pd.DataFrame({
+        "사고 ID": [f"S{i + 1:04d}" for i in range(num_incidents)],
+        INCIDENT_LEVEL_COL: np.asarray(levels, dtype=object)[drawn],
+        INCIDENT_WEIGHT_COL: np.asarray([severity_scores[level] for level in levels], dtype=np.float64)[drawn],
+        INCIDENT_LAT_COL: np.asarray(snapshot.node_y)[nodes],
+        INCIDENT_LON_COL: np.asarray(snapshot.node_x)[nodes],
+    })
+
+
+def incidents_from_queue(waiting_rows, snapshot, seed=0):
+    """대기열 환자 목록(queue_store.waiting())을 사고 목록으로 변환한다.
+
+    대기열 환자에는 발생 위치가 없으므로 도로망 노드 중 무작위 위치를 배정한다. (배차 훈련용)
+    """
+    rng = np.random.default_rng(seed)
+    rows = pd.DataFrame(waiting_rows)
+    if rows.empty:
+        return pd.DataFrame(columns=["사고 ID", INCIDENT_LEVEL_COL, INCIDENT_WEIGHT_COL, INCIDENT_LAT_COL, INCIDENT_LON_COL])
+    nodes = rng.integers(snapshot.num_nodes, size=len(rows))
+    return pd.DataFrame({
+        "사고 ID": rows["환자 ID"].to_numpy(),
+        INCIDENT_LEVEL_COL: rows["중증도"].to_numpy(),
+        INCIDENT_WEIGHT_COL: pd.to_numeric(rows["응급도 점수"], errors="coerce").fillna(1).to_numpy(dtype=np.float64),
+        INCIDENT_LAT_COL: np.asarray(snapshot.node_y)[nodes],
+        INCIDENT_LON_COL: np.asarray(snapshot.node_x)[nodes],
+    })
@@ -0,0 +1,161 @@
+# -------------------------------
+# 응급실 이산 사건 시뮬레이션 (헤드리스)
+# -------------------------------
+# 지역별 내원시간대(3시간 단위) 분포와 월별 계절성으로 비균질 포아송 도착을 만들고, 중증도를 배정한 뒤
+# N 개의 진료 병상에서 대기열(IndexedPriorityQueue 와 같은 규칙: 유효 점수 우선, 동점이면 선입선출/후입선출)로
+# 처리하여 중증도별 대기 시간 분포를 구한다.
+#
+# 도착 시각 / 중증도 / 진료 시간 / 정렬 키는 모두 NumPy 배열로 미리 만들어 두고, 사건 루프는 병상 완료 시각
+# 힙과 대기열 힙 두 개만 다룬다. 몬테카를로 반복은 프로세스 풀에서 병렬로 실행하며, 각 반복의 난수는
+# SeedSequence.spawn 으로 만들어 실행 순서나 작업자 수와 무관하게 같은 결과가 나온다.
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from emergency.triage_queue import QUEUE_LIFO
+
+HOURS_PER_BIN = 3
+BINS_PER_DAY = 24 // HOURS_PER_BIN
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+# 중증도 비율 / 평균 진료 시간(분) 기본값 (임의 설정, 시나리오마다 바꿔서 사용)
+DEFAULT_SEVERITY_MIX = {"경증": 0.45, "중등증": 0.30, "중증": 0.15, "응급": 0.07, "매우_응급": 0.03}
+DEFAULT_SERVICE_MINUTES = {"경증": 20.0, "중등증": 40.0, "중증": 90.0, "응급": 120.0, "매우_응급": 180.0}
+
+WAIT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+@dataclass
+class EDSimulationConfig:
+    hourly_counts: list  # 3시간 단위 8개 구간의 연간 내원 건수 (time_df 의 한 지역 행)
+    monthly_counts: list  # 1~12월 내원 건수 (month_df 의 한 지역 행)
+    severity_scores: dict  # 중증도 -> 응급도 점수
+    num_bays: int = 10
+    days: int = 365
+    start_month: int = 1
+    arrival_scale: float = 1.0  # 지역 전체 내원 건수 중 이 응급실이 받는 비율
+    severity_mix: dict = field(default_factory=lambda: dict(DEFAULT_SEVERITY_MIX))
+    service_minutes: dict = field(default_factory=lambda: dict(DEFAULT_SERVICE_MINUTES))
+    queue_type: str = "큐 (선입선출)"
+    aging_rate: float = 0.0  # 대기 1분당 추가 점수
+
+    @property
+    def levels(self):
+        return list(self.severity_mix)
+
+
+def config_from_views(time_df, month_df, region, severity_scores, **kwargs):
+    """time_view() / month_view() 표의 한 지역 행으로 시뮬레이션 설정을 만든다."""
+    hourly = time_df.loc[time_df["시도"] == region].iloc[0, 1:].astype(float).tolist()
+    monthly = month_df.loc[month_df["시도"] == region].iloc[0, 1:].astype(float).tolist()
+    return EDSimulationConfig(hourly_counts=hourly, monthly_counts=monthly, severity_scores=severity_scores, **kwargs)
+
+
+def arrival_rates(config):
+    """시뮬레이션 기간의 3시간 구간별 평균 도착 수 배열 (길이 days * 8)."""
+    hourly = np.asarray(config.hourly_counts, dtype=np.float64)
+    monthly = np.asarray(config.monthly_counts, dtype=np.float64)
+    if hourly.size != BINS_PER_DAY or monthly.size != 12:
+        raise ValueError("시간대 8개 구간과 12개월 건수가 필요합니다.")
+    hour_share = hourly / hourly.sum()
+    # 월 건수를 그 달의 일수로 나눈 일평균 도착 수
+    daily_by_month = monthly / _DAYS_IN_MONTH * config.arrival_scale
+
+    month_ends = np.cumsum(_DAYS_IN_MONTH)
+    start_day = month_ends[config.start_month - 2] if config.start_month > 1 else 0
+    month_of_day = np.searchsorted(month_ends, (start_day + np.arange(config.days)) % 365, side="right")
+    return (daily_by_month[month_of_day][:, None] * hour_share[None, :]).ravel()
+
+
+def generate_patients(config, rng):
+    """도착 시각(분), 중증도 코드, 진료 시간(분) 배열을 만든다."""
+    rates = arrival_rates(config)
+    counts = rng.poisson(rates)
+    bin_start = np.repeat(np.arange(rates.size, dtype=np.float64) * HOURS_PER_BIN * 60, counts)
+    arrivals = np.sort(bin_start + rng.random(bin_start.size) * HOURS_PER_BIN * 60)
+
+    levels = config.levels
+    mix = np.array([config.severity_mix[level] for level in levels], dtype=np.float64)
+    severity = rng.choice(len(levels), size=arrivals.size, p=mix / mix.sum()).astype(np.int8)
+    mean_service = np.array([config.service_minutes[level] for level in levels])
+    service = rng.exponential(mean_service[severity])
+    return arrivals, severity, service
+
+
+def simulate_queue(arrivals, priority, service, num_bays, lifo=False, aging_rate=0.0):
+    """비선점 우선순위 다중 병상 대기열. 환자별 대기 시간(분) 배열과 병상 가동률을 반환한다.
+
+    arrivals 는 오름차순이어야 하며, 유효 점수(priority + aging_rate * 대기 분)가 높은 환자부터 진료한다.
+    """
+    n = len(arrivals)
+    # 모든 환자에게 같은 보정 비율을 쓰므로 '점수 - 비율 * 도착 시각' 이 고정 정렬 키가 됨
+    keys = (-(np.asarray(priority, dtype=np.float64) - aging_rate * arrivals)).tolist()
+    ties = (-np.arange(n) if lifo else np.arange(n)).tolist()
+    arrival_list = arrivals.tolist()
+    service_list = service.tolist()
+    waits = np.empty(n, dtype=np.float64)
+
+    bays = [0.0] * num_bays  # 병상별 다음 진료 가능 시각 (최소 힙)
+    waiting = []
+    heappush, heappop, heapreplace = heapq.heappush, heapq.heappop, heapq.heapreplace
+    i, now = 0, 0.0
+    while i < n or waiting:
+        if waiting and (i >= n or bays[0] <= arrival_list[i]):
+            # 다음 도착 전에 병상이 비므로 대기 중인 최우선 환자를 진료 시작
+            _, _, p = heappop(waiting)
+            start = bays[0] if bays[0] > now else now
+            waits[p] = start - arrival_list[p]
+            heapreplace(bays, start + service_list[p])
+            now = start
+        else:
+            now = arrival_list[i]
+            heappush(waiting, (keys[i], ties[i], i))
+            i += 1
+
+    horizon = max(bays) if n else 0.0
+    utilization = float(np.sum(service) / (num_bays * horizon)) if horizon > 0 else 0.0
+    return waits, utilization
+
+
+def summarize_waits(waits, severity, levels):
+    """중증도별 대기 시간 분포 요약표."""
+    rows = []
+    for code, level in enumerate(levels):
+        w = waits[severity == code]
+        row = {"중증도": level, "환자 수": int(w.size), "평균 대기(분)": float(w.mean()) if w.size else np.nan}
+        quantiles = np.quantile(w, WAIT_QUANTILES) if w.size else [np.nan] * len(WAIT_QUANTILES)
+        row.update({f"p{int(q * 100)} 대기(분)": float(v) for q, v in zip(WAIT_QUANTILES, quantiles)})
+        row["최대 대기(분)"] = float(w.max()) if w.size else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def run_replication(config, seed):
+    """시뮬레이션 1회 실행. (중증도별 요약표, 병상 가동률)을 반환한다."""
+    rng = np.random.default_rng(seed)
+    arrivals, severity, service = generate_patients(config, rng)
+    priority = np.array([config.severity_scores[level] for level in config.levels], dtype=np.float64)[severity]
+    waits, utilization = simulate_queue(arrivals, priority, service, config.num_bays,
+                                        lifo=config.queue_type == QUEUE_LIFO, aging_rate=config.aging_rate)
+    return summarize_waits(waits, severity, config.levels), utilization
+
+
+def run_replications(config, replications=8, seed=0, max_workers=None):
+    """몬테카를로 반복을 프로세스 풀에서 실행한다.
+
+    반환값: (반복별 요약을 합친 long 표(반복 번호 포함), 중증도별 반복 평균 표, 반복별 병상 가동률 배열)
+    """
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    if max_workers == 1 or replications == 1:
+        results = [run_replication(config, s) for s in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(run_replication, [config] * replications, seeds))
+
+    per_run = pd.concat([summary.assign(반복=r) for r, (summary, _) in enumerate(results)], ignore_index=True)
+    mean = per_run.drop(columns="반복").groupby("중증도", sort=False).mean().reset_index()
+    utilization = np.array([u for _, u in results])
+    return per_run, mean, utilization
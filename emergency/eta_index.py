@@ -0,0 +1,395 @@
+# -------------------------------
+# 빠른 출발지 -> 도착지 주행 시간(ETA) 질의 (Contraction Hierarchies)
+# -------------------------------
+# 전처리 단계에서 노드를 중요도 순으로 하나씩 축약(contract)하며, 최단 경로가 끊기지 않도록
+# 지름길(shortcut) 간선을 추가한다. 질의는 출발지에서 "순위가 높아지는 방향"의 간선만,
+# 도착지에서 역방향으로 "순위가 높아지는 방향"의 간선만 따라가는 양방향 다익스트라로 수행되므로
+# 수백 개 노드만 탐색하고도 일반 다익스트라와 정확히 같은 결과를 얻는다.
+#
+# 축약(전처리)은 순수 파이썬이라 노드 1만 개에 약 1분, 용인시 규모에서는 수 분이 걸리므로 앱에서는 만들지 않는다.
+# 아래 명령으로 미리 만들어 .cache/eta 에 저장해 두면, 배차 화면에서 (업체, 노드) 주행 시간 행렬이
+# 너무 큰 도로망일 때 load_eta_index 로 불러와 사고 지점까지의 주행 시간 계산에 사용한다.
+#
+# 인덱스 생성, 다익스트라 대비 검증 및 벤치마크:
+#   python -m emergency.eta_index data/road_network/<지역>
+import heapq
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+DEFAULT_ETA_CACHE_DIR = os.path.join(".cache", "eta")
+ETA_INDEX_FORMAT_VERSION = 1
+
+# 목격 경로(witness) 탐색에서 확정할 최대 노드 수. 작을수록 전처리가 빠르지만 지름길이 늘어난다.
+# (목격 경로를 놓쳐도 불필요한 지름길이 생길 뿐 결과의 정확성에는 영향이 없음)
+_WITNESS_SETTLE_LIMIT = 60
+
+
+def _witness_search(out_adj, source, excluded, targets, max_cost):
+    # 축약 대상 노드(excluded)를 거치지 않는 source 로부터의 제한된 다익스트라
+    # (모든 targets 가 확정되거나, 비용 상한/확정 노드 수 상한에 도달하면 중단)
+    inf = float("inf")
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    settled = 0
+    remaining = len(targets)
+    while heap and remaining:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        if d > max_cost or settled >= _WITNESS_SETTLE_LIMIT:
+            break
+        settled += 1
+        if u in targets:
+            remaining -= 1
+        for v, w in out_adj[u].items():
+            if v == excluded:
+                continue
+            nd = d + w
+            if nd < dist.get(v, inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _shortcuts_for(out_adj, in_adj, v):
+    # 노드 v를 축약할 때 필요한 지름길 목록 [(u, w, 비용)]
+    inf = float("inf")
+    outs = out_adj[v]
+    shortcuts = []
+    if not outs:
+        return shortcuts
+    max_out = max(outs.values())
+    for u, w_uv in in_adj[v].items():
+        dist = _witness_search(out_adj, u, v, outs, w_uv + max_out)
+        for w, w_vw in outs.items():
+            if w == u:
+                continue
+            cost = w_uv + w_vw
+            if dist.get(w, inf) > cost:
+                shortcuts.append((u, w, cost))
+    return shortcuts
+
+
+def _to_csr(adjacency, n):
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(adjacency[u]) for u in range(n)])
+    indices = np.fromiter((v for u in range(n) for v in adjacency[u]), dtype=np.int32, count=indptr[-1])
+    weights = np.fromiter((w for u in range(n) for w in adjacency[u].values()), dtype=np.float64, count=indptr[-1])
+    return indptr, indices, weights
+
+
+def contract_graph(csr):
+    """CSR 가중치 행렬을 축약하여 (순위, 상향 정방향 CSR, 상향 역방향 CSR)를 만든다."""
+    n = csr.shape[0]
+    out_adj = [dict() for _ in range(n)]
+    in_adj = [dict() for _ in range(n)]
+    coo = csr.tocoo()
+    for u, v, w in zip(coo.row.tolist(), coo.col.tolist(), coo.data.tolist()):
+        if u != v and w < out_adj[u].get(v, float("inf")):
+            out_adj[u][v] = w
+            in_adj[v][u] = w
+
+    # 상향 그래프: forward[u] = {v: w} (rank[v] > rank[u]), backward[v] = {u: w} (원래 간선 u->v, rank[u] > rank[v])
+    forward = [dict() for _ in range(n)]
+    backward = [dict() for _ in range(n)]
+    rank = np.full(n, -1, dtype=np.int64)
+    deleted_neighbors = [0] * n
+
+    def priority(v, shortcuts):
+        # 간선 차이(edge difference) + 이미 축약된 이웃 수 (축약이 지역적으로 고르게 퍼지도록)
+        return len(shortcuts) - len(out_adj[v]) - len(in_adj[v]) + deleted_neighbors[v]
+
+    heap = [(priority(v, _shortcuts_for(out_adj, in_adj, v)), v) for v in range(n)]
+    heapq.heapify(heap)
+    next_rank = 0
+    while heap:
+        _, v = heapq.heappop(heap)
+        if rank[v] >= 0:
+            continue
+        # 지연 갱신(lazy update): 다시 계산한 우선순위가 다음 후보보다 나쁘면 재삽입.
+        # 이웃 노드의 우선순위는 축약 시점에 바로 갱신하지 않고 여기서 다시 계산한다.
+        shortcuts = _shortcuts_for(out_adj, in_adj, v)
+        current = priority(v, shortcuts)
+        if heap and current > heap[0][0]:
+            heapq.heappush(heap, (current, v))
+            continue
+
+        rank[v] = next_rank
+        next_rank += 1
+        forward[v] = dict(out_adj[v])
+        backward[v] = dict(in_adj[v])
+        for w in out_adj[v]:
+            del in_adj[w][v]
+            deleted_neighbors[w] += 1
+        for u in in_adj[v]:
+            del out_adj[u][v]
+            deleted_neighbors[u] += 1
+        out_adj[v] = {}
+        in_adj[v] = {}
+        for u, w, cost in shortcuts:
+            if cost < out_adj[u].get(w, float("inf")):
+                out_adj[u][w] = cost
+                in_adj[w][u] = cost
+
+    return rank, _to_csr(forward, n), _to_csr(backward, n)
+
+
+def _upward_search(indptr, indices, weights, source):
+    # 상향 그래프 전체 탐색 (다대다 버킷 계산용)
+    inf = float("inf")
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            nd = d + weights[k]
+            if nd < dist.get(v, inf):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+class CHIndex:
+    """Contraction Hierarchies 주행 시간 인덱스. 노드는 스냅샷의 배열 인덱스를 사용한다."""
+
+    def __init__(self, snapshot, rank, forward, backward):
+        self.snapshot = snapshot
+        self.rank = rank
+        self.forward = forward  # (indptr, indices, weights)
+        self.backward = backward
+        # 질의 내부 루프는 파이썬 리스트 조회가 NumPy 스칼라 조회보다 빠름
+        self._fwd = tuple(a.tolist() for a in forward)
+        self._bwd = tuple(a.tolist() for a in backward)
+        self.last_settled = 0  # 직전 질의에서 확정(settle)된 노드 수
+
+    @property
+    def num_shortcut_edges(self):
+        return len(self.forward[1]) + len(self.backward[1])
+
+    @classmethod
+    def build(cls, snapshot):
+        rank, forward, backward = contract_graph(snapshot.csr("travel_time"))
+        return cls(snapshot, rank, forward, backward)
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(path, format_version=ETA_INDEX_FORMAT_VERSION, fingerprint=np.array(self.snapshot.fingerprint),
+                 rank=self.rank,
+                 fwd_indptr=self.forward[0], fwd_indices=self.forward[1], fwd_weights=self.forward[2],
+                 bwd_indptr=self.backward[0], bwd_indices=self.backward[1], bwd_weights=self.backward[2])
+        return path
+
+    @classmethod
+    def load(cls, path, snapshot):
+        with np.load(path) as data:
+            if int(data["format_version"]) != ETA_INDEX_FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 ETA 인덱스 형식 버전입니다: {int(data['format_version'])}")
+            if str(data["fingerprint"]) != snapshot.fingerprint:
+                raise ValueError("ETA 인덱스가 현재 도로망 스냅샷과 일치하지 않습니다.")
+            forward = (data["fwd_indptr"], data["fwd_indices"], data["fwd_weights"])
+            backward = (data["bwd_indptr"], data["bwd_indices"], data["bwd_weights"])
+            return cls(snapshot, data["rank"], forward, backward)
+
+    @staticmethod
+    def _stalled(u, d, dist, opposite):
+        # stall-on-demand: 더 높은 순위의 이웃 x를 거쳐 u에 더 짧게 도달할 수 있으면
+        # u에서의 탐색 확장은 최단 경로에 기여하지 않으므로 건너뛴다.
+        indptr, indices, weights = opposite
+        for k in range(indptr[u], indptr[u + 1]):
+            x = indices[k]
+            if x in dist and dist[x] + weights[k] < d:
+                return True
+        return False
+
+    def query(self, source, target):
+        """노드 source 에서 target 까지의 최단 주행 시간(초). 도달 불가이면 inf."""
+        source, target = int(source), int(target)
+        inf = float("inf")
+        if source == target:
+            self.last_settled = 0
+            return 0.0
+        graphs = (self._fwd, self._bwd)
+        dists = ({source: 0.0}, {target: 0.0})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best = inf
+        settled = 0
+        side = 0
+        while True:
+            # 양쪽 큐의 최솟값이 현재 최선 이상이면 더 짧은 경로는 없음
+            f_min = heaps[0][0][0] if heaps[0] else inf
+            b_min = heaps[1][0][0] if heaps[1] else inf
+            if min(f_min, b_min) >= best:
+                break
+            if f_min >= best:
+                side = 1
+            elif b_min >= best:
+                side = 0
+            heap = heaps[side]
+            dist = dists[side]
+            other = dists[1 - side]
+            indptr, indices, weights = graphs[side]
+            d, u = heapq.heappop(heap)
+            if d <= dist[u] and not self._stalled(u, d, dist, graphs[1 - side]):
+                settled += 1
+                if u in other and d + other[u] < best:
+                    best = d + other[u]
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    nd = d + weights[k]
+                    if nd < dist.get(v, inf):
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+            side = 1 - side
+        self.last_settled = settled
+        return best
+
+    def query_many(self, sources, targets):
+        """(source, target) 쌍 배열에 대한 주행 시간 배열."""
+        sources = np.asarray(sources, dtype=np.int64).tolist()
+        targets = np.asarray(targets, dtype=np.int64).tolist()
+        return np.fromiter((self.query(s, t) for s, t in zip(sources, targets)), dtype=np.float64, count=len(sources))
+
+    def matrix(self, sources, targets):
+        """다대다 주행 시간 행렬 (len(sources) x len(targets)), 버킷 기반 CH 다대다 알고리즘."""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        result = np.full((len(sources), len(targets)), np.inf)
+        if len(sources) == 0 or len(targets) == 0:
+            return result
+        # 도착지별 역방향 상향 탐색 결과를 노드별 버킷에 모음
+        buckets = defaultdict(list)
+        unique_targets, target_inverse = np.unique(targets, return_inverse=True)
+        for j, t in enumerate(unique_targets.tolist()):
+            for v, d in _upward_search(*self._bwd, t).items():
+                buckets[v].append((j, d))
+        unique_sources, source_inverse = np.unique(sources, return_inverse=True)
+        unique_result = np.full((len(unique_sources), len(unique_targets)), np.inf)
+        for i, s in enumerate(unique_sources.tolist()):
+            row = unique_result[i].tolist()
+            for v, d in _upward_search(*self._fwd, s).items():
+                for j, dt in buckets.get(v, ()):
+                    if d + dt < row[j]:
+                        row[j] = d + dt
+            unique_result[i] = row
+        result[:] = unique_result[source_inverse][:, target_inverse]
+        return result
+
+
+def eta_index_path(snapshot, cache_dir=DEFAULT_ETA_CACHE_DIR):
+    return os.path.join(cache_dir, f"ch_{snapshot.fingerprint[:16]}.npz")
+
+
+def load_eta_index(snapshot, cache_dir=DEFAULT_ETA_CACHE_DIR):
+    """미리 만들어 둔 CH 인덱스. 없거나 도로망과 맞지 않으면 None (앱에서는 새로 만들지 않음)."""
+    path = eta_index_path(snapshot, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return CHIndex.load(path, snapshot)
+    except ValueError:
+        return None
+
+
+def load_or_build_eta_index(snapshot, cache_dir=DEFAULT_ETA_CACHE_DIR):
+    """디스크에 저장된 CH 인덱스를 불러오고, 없거나 도로망이 바뀌었으면 새로 만들어 저장한다."""
+    path = eta_index_path(snapshot, cache_dir)
+    if os.path.exists(path):
+        try:
+            return CHIndex.load(path, snapshot)
+        except ValueError:
+            pass
+    index = CHIndex.build(snapshot)
+    index.save(path)
+    return index
+
+
+def random_node_pairs(snapshot, num_pairs, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(snapshot.num_nodes, size=num_pairs), rng.integers(snapshot.num_nodes, size=num_pairs)
+
+
+def verify_against_dijkstra(index, num_pairs=200, seed=0):
+    """무작위 쌍(단일 질의)과 무작위 행렬 질의를 일반 다익스트라와 비교해 최대 절대 오차(초)를 반환한다."""
+    from scipy.sparse.csgraph import dijkstra
+
+    csr = index.snapshot.csr("travel_time")
+    sources, targets = random_node_pairs(index.snapshot, num_pairs, seed)
+    reference = dijkstra(csr, directed=True, indices=sources)
+    expected = np.concatenate([reference[np.arange(num_pairs), targets], reference[:20, targets[:20]].ravel()])
+    actual = np.concatenate([index.query_many(sources, targets), index.matrix(sources[:20], targets[:20]).ravel()])
+    if np.any(np.isinf(expected) != np.isinf(actual)):
+        return float("inf")
+    finite = np.isfinite(expected)
+    return float(np.max(np.abs(actual[finite] - expected[finite]), initial=0.0))
+
+
+def benchmark(index, num_pairs=1000, seed=1):
+    """CH 질의와 networkx / scipy 다익스트라(단일 쌍) 질의의 평균 시간을 비교한다."""
+    import networkx as nx
+    from scipy.sparse.csgraph import dijkstra
+
+    sources, targets = random_node_pairs(index.snapshot, num_pairs, seed)
+    csr = index.snapshot.csr("travel_time")
+    baseline_pairs = min(num_pairs, 50)
+
+    G = nx.from_scipy_sparse_array(csr, create_using=nx.DiGraph)
+    started = time.perf_counter()
+    for s, t in zip(sources[:baseline_pairs].tolist(), targets[:baseline_pairs].tolist()):
+        try:
+            nx.shortest_path_length(G, s, t, weight="weight")
+        except nx.NetworkXNoPath:
+            pass
+    networkx_per_query = (time.perf_counter() - started) / baseline_pairs
+
+    started = time.perf_counter()
+    for s in sources[:baseline_pairs].tolist():
+        dijkstra(csr, directed=True, indices=s)
+    scipy_per_query = (time.perf_counter() - started) / baseline_pairs
+
+    settled = 0
+    started = time.perf_counter()
+    for s, t in zip(sources.tolist(), targets.tolist()):
+        index.query(s, t)
+        settled += index.last_settled
+    ch_per_query = (time.perf_counter() - started) / num_pairs
+
+    started = time.perf_counter()
+    index.matrix(sources[:100], targets[:100])
+    matrix_seconds = time.perf_counter() - started
+
+    return {
+        "num_nodes": index.snapshot.num_nodes,
+        "ch_edges": index.num_shortcut_edges,
+        "networkx_ms_per_query": networkx_per_query * 1000,
+        "scipy_dijkstra_ms_per_query": scipy_per_query * 1000,
+        "ch_ms_per_query": ch_per_query * 1000,
+        "ch_queries_per_second": 1 / ch_per_query,
+        "ch_mean_settled_nodes": settled / num_pairs,
+        "speedup_vs_networkx": networkx_per_query / ch_per_query,
+        "speedup_vs_scipy": scipy_per_query / ch_per_query,
+        "matrix_100x100_ms": matrix_seconds * 1000,
+    }
+
+
+if __name__ == "__main__":
+    from emergency.road_snapshot import load_snapshot
+
+    if len(sys.argv) < 2:
+        print("사용법: python -m emergency.eta_index <스냅샷 디렉터리>")
+        sys.exit(1)
+    road = load_snapshot(sys.argv[1])
+    started = time.perf_counter()
+    eta = load_or_build_eta_index(road)
+    print(f"인덱스 준비: {time.perf_counter() - started:.2f}초 (간선 {eta.num_shortcut_edges}개)")
+    print(f"다익스트라 대비 최대 오차: {verify_against_dijkstra(eta):.6f}초")
+    for name, value in benchmark(eta).items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
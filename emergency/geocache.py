@@ -0,0 +1,156 @@
+# -------------------------------
+# 영구 지오코딩 캐시 (주소 -> 위도/경도)
+# -------------------------------
+# 정규화한 주소를 키로 SQLite 파일에 결과를 저장하여 프로세스가 재시작되어도 캐시가 유지된다.
+# 찾지 못한 주소도 (NULL, NULL)로 기록(네거티브 캐싱)하여 같은 주소를 반복 조회하지 않는다.
+# 실제 조회는 교체 가능한 지오코더 백엔드(주소 -> (위도, 경도) 또는 None 을 반환하는 호출 가능 객체)에 위임한다.
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "geocode.sqlite")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_address(address):
+    """캐시 키로 사용할 주소 문자열을 정규화한다. 유효하지 않은 주소는 None 을 반환한다."""
+    if address is None or (not isinstance(address, str) and pd.isna(address)):
+        return None
+    if not isinstance(address, str):
+        return None
+    key = unicodedata.normalize("NFC", address)
+    key = _WHITESPACE_RE.sub(" ", key).strip()
+    return key or None
+
+
+class NominatimGeocoder:
+    """geopy Nominatim 백엔드. 여러 작업 스레드가 공유해도 요청 간 최소 지연을 지킨다."""
+
+    def __init__(self, user_agent="emergency_app", min_delay_seconds=1.0, timeout=10):
+        # geopy는 폴백 지오코딩이 실제로 필요할 때만 import
+        from geopy.geocoders import Nominatim
+
+        self._geolocator = Nominatim(user_agent=user_agent, timeout=timeout)
+        self._min_delay = min_delay_seconds
+        self._lock = threading.Lock()
+        self._last_call = 0.0
+
+    def __call__(self, address):
+        # Nominatim 정책에 따라 요청 간 최소 1초 지연 (스레드 간 공유)
+        with self._lock:
+            wait = self._min_delay - (time.monotonic() - self._last_call)
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+        location = self._geolocator.geocode(address)
+        if location:
+            return location.latitude, location.longitude
+        return None
+
+
+class GeocodeCache:
+    """SQLite 기반 주소 -> (위도, 경도) 영구 캐시와 배치 조회 API."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, geocoder=None, max_workers=4):
+        self.path = path
+        self.geocoder = geocoder
+        self.max_workers = max(1, int(max_workers))
+        self.geocoder_calls = 0  # 이번 인스턴스에서 실제로 백엔드를 호출한 횟수
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " address TEXT PRIMARY KEY,"
+                " lat REAL,"
+                " lon REAL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """트랜잭션 하나 (정상 종료 시 commit, 예외 시 rollback) 후 연결을 닫는다."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup_many(self, keys):
+        """정규화된 주소 목록 중 캐시에 있는 항목만 {주소: (위도, 경도) 또는 (None, None)} 으로 반환한다."""
+        found = {}
+        keys = list(keys)
+        with self._connect() as conn:
+            # SQLite 바인딩 변수 개수 제한을 피하기 위해 나누어 조회
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT address, lat, lon FROM geocode WHERE address IN ({placeholders})", chunk
+                )
+                for address, lat, lon in rows:
+                    found[address] = (lat, lon)
+        return found
+
+    def store_many(self, results):
+        """{주소: (위도, 경도) 또는 None} 결과를 캐시에 기록한다. None 은 네거티브 캐시로 저장된다."""
+        now = time.time()
+        rows = []
+        for key, value in results.items():
+            lat, lon = value if value else (None, None)
+            rows.append((key, lat, lon, now))
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO geocode (address, lat, lon, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def _geocode_unseen(self, keys, progress_callback=None):
+        results = {}
+        if not keys or self.geocoder is None:
+            return results
+        total = len(keys)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.geocoder, key): key for key in keys}
+            for done, future in enumerate(as_completed(futures), start=1):
+                key = futures[future]
+                self.geocoder_calls += 1
+                try:
+                    results[key] = future.result()
+                except Exception:
+                    # 네트워크 오류 등 일시적 실패는 네거티브 캐시에 남기지 않음 (다음 실행에서 재시도)
+                    pass
+                if progress_callback:
+                    progress_callback(done, total)
+        self.store_many(results)
+        return results
+
+    def resolve_many(self, addresses, progress_callback=None):
+        """주소 목록을 (위도 리스트, 경도 리스트)로 변환한다.
+
+        중복 주소는 한 번만 조회하며, 캐시에 없는 주소만 지오코더 백엔드로 병렬 조회한다.
+        progress_callback(완료 수, 전체 수)는 실제 백엔드 조회가 진행될 때만 호출된다.
+        """
+        keys = [normalize_address(address) for address in addresses]
+        unique_keys = {key for key in keys if key is not None}
+        cached = self.lookup_many(unique_keys)
+        unseen = sorted(unique_keys - cached.keys())
+        for key, value in self._geocode_unseen(unseen, progress_callback).items():
+            cached[key] = value if value else (None, None)
+
+        latitudes = []
+        longitudes = []
+        for key in keys:
+            lat, lon = cached.get(key, (None, None)) if key is not None else (None, None)
+            latitudes.append(lat)
+            longitudes.append(lon)
+        return latitudes, longitudes
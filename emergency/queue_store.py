@@ -0,0 +1,338 @@
+# -------------------------------
+# 공유 응급 대기열 저장소
+# -------------------------------
+# 여러 브라우저 세션(여러 분류 간호사 단말)이 같은 대기열을 보도록 대기열을 세션 밖의 저장소에 둔다.
+# 저장소는 교체 가능하며 같은 메서드를 제공한다.
+#   - MemoryQueueStore: 프로세스 메모리의 IndexedPriorityQueue (단일 프로세스, 재시작 시 사라짐)
+#   - SQLiteQueueStore: WAL 모드 SQLite 파일 (여러 프로세스 공유, 재시작 후에도 유지)
+# 모든 변경은 하나의 트랜잭션 안에서 버전 카운터를 함께 올리므로, 세션은 버전이 바뀌었을 때만 목록을 다시 읽으면 된다.
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from emergency.triage_queue import QUEUE_FIFO, QUEUE_LIFO, IndexedPriorityQueue
+
+DEFAULT_QUEUE_PATH = os.path.join(".cache", "triage_queue.sqlite")
+
+WAITING = "waiting"
+TREATING = "treating"
+REMOVED = "removed"
+
+
+def _display_row(patient_id, info, score, arrival, now, aging_rate):
+    row = {
+        '환자 ID': patient_id,
+        '이름': info.get('이름', '알 수 없음'),
+        '중증도': info.get('중증도', '알 수 없음'),
+        '응급도 점수': score,
+        '대기 시간(분)': round((now - arrival) / 60.0, 1),
+    }
+    if aging_rate:
+        row['보정 점수'] = round(score + aging_rate * (now - arrival) / 60.0, 1)
+    return row
+
+
+class MemoryQueueStore:
+    """IndexedPriorityQueue 를 잠금과 버전 카운터로 감싼 프로세스 내 저장소."""
+
+    def __init__(self, aging_rate=0.0, clock=time.time):
+        self._queue = IndexedPriorityQueue(aging_rate=aging_rate, clock=clock)
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def aging_rate(self):
+        return self._queue.aging_rate
+
+    def version(self):
+        return self._version
+
+    def insert(self, patient_info, priority_score, queue_type=QUEUE_FIFO):
+        with self._lock:
+            patient_id = self._queue.insert(patient_info, priority_score, queue_type=queue_type)
+            self._version += 1
+            return patient_id
+
+    def insert_many(self, patient_infos, priority_scores, queue_type=QUEUE_FIFO):
+        with self._lock:
+            patient_ids = self._queue.insert_many(patient_infos, priority_scores, queue_type=queue_type)
+            self._version += 1
+            return patient_ids
+
+    def update_priority(self, patient_id, priority_score, patient_info=None):
+        """대기 중인 환자의 점수를 바꾼다. 이미 진료/이탈한 환자면 False."""
+        with self._lock:
+            if patient_id not in self._queue:
+                return False
+            self._queue.update_priority(patient_id, priority_score, patient_info=patient_info)
+            self._version += 1
+            return True
+
+    def remove(self, patient_id):
+        with self._lock:
+            if patient_id not in self._queue:
+                return None, None
+            self._version += 1
+            return self._queue.remove(patient_id)
+
+    def pop_highest(self):
+        """가장 응급한 환자를 꺼낸다. (환자 ID, 환자 정보, 점수) 또는 (None, None, None)"""
+        with self._lock:
+            if self._queue.is_empty():
+                return None, None, None
+            patient_id = self._queue.peek_id()
+            info, score = self._queue.remove(patient_id)
+            self._version += 1
+            return patient_id, info, score
+
+    def set_aging_rate(self, aging_rate):
+        with self._lock:
+            if float(aging_rate) != self._queue.aging_rate:
+                self._queue.set_aging_rate(aging_rate)
+                self._version += 1
+
+    def waiting_ids(self):
+        with self._lock:
+            return self._queue.patient_ids()
+
+    def waiting(self):
+        with self._lock:
+            return self._queue.get_all_patients_sorted()
+
+    def get_patient(self, patient_id):
+        with self._lock:
+            return self._queue.peek_patient(patient_id) if patient_id in self._queue else (None, None)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def is_empty(self):
+        return len(self) == 0
+
+
+class SQLiteQueueStore:
+    """WAL 모드 SQLite 파일 기반 대기열. 여러 스레드/프로세스가 동시에 사용해도 된다.
+
+    꺼내기(pop_highest)는 쓰기 잠금(BEGIN IMMEDIATE) 안에서 조회와 상태 변경을 함께 수행하므로
+    두 세션이 같은 환자를 동시에 진료 시작하는 일이 없다.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, clock=time.time, busy_timeout_seconds=30):
+        self.path = path
+        self.clock = clock
+        self.busy_timeout_seconds = busy_timeout_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+        with self._write() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS patients ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " info TEXT NOT NULL,"
+                " score REAL NOT NULL,"
+                " arrival REAL NOT NULL,"
+                " tie INTEGER NOT NULL DEFAULT 0,"
+                " sort_key REAL NOT NULL,"
+                " status TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            # 대기 중인 환자만 담는 부분 인덱스: 최우선 환자 조회와 대기 순서 목록이 정렬 없이 인덱스 순서로 나옴
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS patients_waiting ON patients (sort_key, tie) WHERE status = 'waiting'"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0), ('aging_rate', 0)")
+
+    # --- 연결 / 트랜잭션 ---
+    @contextmanager
+    def _connect(self):
+        """작업 하나에 쓸 연결을 열고 끝나면 닫는다. (Streamlit 스크립트 스레드가 바뀌어도 연결이 남지 않음)"""
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_seconds, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self):
+        """쓰기 트랜잭션 하나 (정상 종료 시 commit, 예외 시 rollback) 후 연결을 닫는다."""
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE: 트랜잭션 시작 시점에 쓰기 잠금을 잡아 조회 후 변경 사이에 다른 쓰기가 끼어들지 못하게 함
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _bump_version(conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    @staticmethod
+    def _meta(conn, key):
+        return conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    @staticmethod
+    def _sort_key(score, arrival, aging_rate):
+        # IndexedPriorityQueue 와 같은 고정 키: -(점수 - 보정 비율 * 도착 시각(분))
+        return -(score - aging_rate * arrival / 60.0)
+
+    # --- 공개 API ---
+    @property
+    def aging_rate(self):
+        with self._connect() as conn:
+            return self._meta(conn, "aging_rate")
+
+    def version(self):
+        with self._connect() as conn:
+            return int(self._meta(conn, "version"))
+
+    def insert(self, patient_info, priority_score, queue_type=QUEUE_FIFO):
+        arrival = self.clock()
+        with self._write() as conn:
+            aging_rate = self._meta(conn, "aging_rate")
+            cursor = conn.execute(
+                "INSERT INTO patients (info, score, arrival, sort_key, status, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (json.dumps(patient_info, ensure_ascii=False), priority_score, arrival,
+                 self._sort_key(priority_score, arrival, aging_rate), WAITING, arrival),
+            )
+            patient_id = cursor.lastrowid
+            # 동점일 때 순서: 선입선출은 먼저 들어온(id 가 작은) 환자, 후입선출은 나중에 들어온 환자가 앞
+            conn.execute("UPDATE patients SET tie = ? WHERE id = ?",
+                         (-patient_id if queue_type == QUEUE_LIFO else patient_id, patient_id))
+            self._bump_version(conn)
+        return patient_id
+
+    def insert_many(self, patient_infos, priority_scores, queue_type=QUEUE_FIFO):
+        """여러 환자를 한 트랜잭션으로 추가하고 환자 ID 목록을 반환한다. (입력 순서가 도착 순서)"""
+        arrival = self.clock()
+        with self._write() as conn:
+            aging_rate = self._meta(conn, "aging_rate")
+            # 쓰기 잠금을 잡은 상태이므로 새 행의 id 를 직접 연속으로 배정하여 tie 까지 한 번의 INSERT 로 기록
+            # (AUTOINCREMENT 는 삭제된 id 도 재사용하지 않으므로 sqlite_sequence 값과 MAX(id) 중 큰 값 다음부터)
+            last_id = conn.execute(
+                "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'patients'), 0),"
+                " COALESCE((SELECT MAX(id) FROM patients), 0))"
+            ).fetchone()[0]
+            sign = -1 if queue_type == QUEUE_LIFO else 1
+            infos = [json.dumps(info, ensure_ascii=False) for info in patient_infos]
+            rows = [(patient_id, info, score, arrival, sign * patient_id,
+                     self._sort_key(score, arrival, aging_rate), WAITING, arrival)
+                    for patient_id, info, score in zip(itertools.count(last_id + 1), infos, priority_scores)]
+            conn.executemany(
+                "INSERT INTO patients (id, info, score, arrival, tie, sort_key, status, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            patient_ids = [row[0] for row in rows]
+            self._bump_version(conn)
+        return patient_ids
+
+    def update_priority(self, patient_id, priority_score, patient_info=None):
+        """대기 중인 환자의 점수를 바꾼다. 이미 진료/이탈한 환자면 False."""
+        with self._write() as conn:
+            row = conn.execute("SELECT arrival FROM patients WHERE id = ? AND status = ?",
+                               (patient_id, WAITING)).fetchone()
+            if row is None:
+                return False
+            sort_key = self._sort_key(priority_score, row[0], self._meta(conn, "aging_rate"))
+            if patient_info is None:
+                conn.execute("UPDATE patients SET score = ?, sort_key = ?, updated_at = ? WHERE id = ?",
+                             (priority_score, sort_key, self.clock(), patient_id))
+            else:
+                conn.execute("UPDATE patients SET score = ?, sort_key = ?, info = ?, updated_at = ? WHERE id = ?",
+                             (priority_score, sort_key, json.dumps(patient_info, ensure_ascii=False), self.clock(),
+                              patient_id))
+            self._bump_version(conn)
+        return True
+
+    def _take(self, conn, patient_id, status):
+        row = conn.execute("SELECT info, score FROM patients WHERE id = ? AND status = ?",
+                           (patient_id, WAITING)).fetchone()
+        if row is None:
+            return None, None
+        conn.execute("UPDATE patients SET status = ?, updated_at = ? WHERE id = ?", (status, self.clock(), patient_id))
+        self._bump_version(conn)
+        return json.loads(row[0]), row[1]
+
+    def remove(self, patient_id):
+        """귀가/전원 등으로 대기열을 떠난 환자를 제거한다. (환자 정보, 점수) 또는 (None, None)"""
+        with self._write() as conn:
+            return self._take(conn, patient_id, REMOVED)
+
+    def pop_highest(self):
+        """가장 응급한 환자를 진료 중 상태로 바꾸고 (환자 ID, 환자 정보, 점수)를 반환한다."""
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT id FROM patients WHERE status = 'waiting' ORDER BY sort_key, tie LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None, None, None
+            info, score = self._take(conn, row[0], TREATING)
+            return row[0], info, score
+
+    def set_aging_rate(self, aging_rate):
+        """대기 보정 비율을 바꾸고 대기 중인 환자의 정렬 키를 한 번에 다시 계산한다."""
+        aging_rate = float(aging_rate)
+        with self._write() as conn:
+            if self._meta(conn, "aging_rate") == aging_rate:
+                return
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'aging_rate'", (aging_rate,))
+            conn.execute("UPDATE patients SET sort_key = -(score - ? * arrival / 60.0) WHERE status = 'waiting'",
+                         (aging_rate,))
+            self._bump_version(conn)
+
+    def waiting_ids(self):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM patients WHERE status = 'waiting' ORDER BY sort_key, tie"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def waiting(self):
+        """대기 순서대로 정렬된 환자 목록 (화면 표시용 행 사전 목록)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN")  # 목록과 보정 비율을 같은 스냅샷에서 읽음
+            try:
+                aging_rate = self._meta(conn, "aging_rate")
+                rows = conn.execute(
+                    "SELECT id, info, score, arrival FROM patients WHERE status = 'waiting' ORDER BY sort_key, tie"
+                ).fetchall()
+            finally:
+                conn.execute("COMMIT")
+        now = self.clock()
+        return [_display_row(pid, json.loads(info), score, arrival, now, aging_rate)
+                for pid, info, score, arrival in rows]
+
+    def get_patient(self, patient_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT info, score FROM patients WHERE id = ? AND status = ?",
+                               (patient_id, WAITING)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else (None, None)
+
+    def wait_for_change(self, since_version, timeout_seconds=30.0, poll_seconds=0.2):
+        """버전이 since_version 과 달라질 때까지 기다린 뒤 새 버전을 반환한다. (시간 초과 시 현재 버전)"""
+        deadline = time.monotonic() + timeout_seconds
+        version = self.version()
+        while version == since_version and time.monotonic() < deadline:
+            time.sleep(poll_seconds)
+            version = self.version()
+        return version
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM patients WHERE status = 'waiting'").fetchone()[0]
+
+    def is_empty(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM patients WHERE status = 'waiting' LIMIT 1").fetchone() is None
+
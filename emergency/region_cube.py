@@ -0,0 +1,121 @@
+# -------------------------------
+# 지역 x 연도 x 기간 사전 집계 큐브
+# -------------------------------
+# SOS 통계 long-format 테이블을 (지역, 연도, 기간) 3차원 NumPy 배열로 한 번만 집계하고,
+# 이송업체 수는 시도 범주 코드의 bincount 로 집계한다.
+# 화면에서는 지역 / 연도 인덱스로 배열을 잘라 쓰므로, 지역을 바꿀 때마다 데이터프레임을 필터링하거나 groupby 하지 않는다.
+# version 은 집계 결과의 해시로, 차트 이미지 캐시 키에 사용한다.
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from emergency.regions import SIDO_COL, SIDO_NAMES
+from emergency.sos_data import MONTH_PERIODS, PERIOD_COL, REGION_COL, TIME_PERIODS, TOTAL_REGION, VALUE_COL, YEAR_COL
+
+
+def _version(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class PeriodCube:
+    """(지역, 연도, 기간) 건수 배열. present 는 원본에 값이 있었던 칸 표시."""
+
+    def __init__(self, regions, years, periods, values, present):
+        self.regions = tuple(regions)
+        self.years = tuple(years)
+        self.periods = tuple(periods)
+        self.values = values
+        self.present = present
+        self.values.setflags(write=False)
+        self.present.setflags(write=False)
+        self._region_index = {region: i for i, region in enumerate(self.regions)}
+        self._year_index = {year: i for i, year in enumerate(self.years)}
+        # 연도별로 어느 지역에든 값이 있는 기간 (wide_view 의 컬럼 구성과 같음)
+        self._year_periods = present.any(axis=0)
+        self.version = _version(self.regions, self.years, self.periods, values, present)
+
+    def regions_with_data(self, year):
+        y = self._year_index.get(year)
+        if y is None:
+            return []
+        return [region for region, has in zip(self.regions, self.present[:, y, :].any(axis=1)) if has]
+
+    def series(self, region, year):
+        """지역 / 연도의 기간별 건수 Series. 해당 지역 / 연도 자료가 없으면 None."""
+        r = self._region_index.get(region)
+        y = self._year_index.get(year)
+        if r is None or y is None or not self.present[r, y].any():
+            return None
+        mask = self._year_periods[y]
+        return pd.Series(self.values[r, y, mask], index=np.asarray(self.periods, dtype=object)[mask], name=region)
+
+
+def build_period_cube(table, periods, include_total=False):
+    """SOS long-format 테이블에서 주어진 기간 목록의 큐브를 만든다. (분류가 여러 개면 합산)"""
+    subset = table[table[PERIOD_COL].isin(periods)]
+    if not include_total:
+        subset = subset[subset[REGION_COL] != TOTAL_REGION]
+    region_labels = subset[REGION_COL].astype(str)
+    regions = sorted(region_labels.unique().tolist())
+    years = sorted(subset[YEAR_COL].unique().tolist())
+    region_codes = pd.Categorical(region_labels, categories=regions).codes
+    year_codes = pd.Categorical(subset[YEAR_COL], categories=years).codes
+    period_codes = pd.Categorical(subset[PERIOD_COL].astype(str), categories=list(periods)).codes
+
+    shape = (len(regions), len(years), len(periods))
+    values = np.zeros(shape, dtype=np.int64)
+    present = np.zeros(shape, dtype=bool)
+    index = (region_codes, year_codes, period_codes)
+    np.add.at(values, index, subset[VALUE_COL].to_numpy(dtype=np.int64))
+    present[index] = True
+    return PeriodCube(regions, years, periods, values, present)
+
+
+def build_time_cube(table):
+    return build_period_cube(table, TIME_PERIODS)
+
+
+def build_month_cube(table):
+    return build_period_cube(table, MONTH_PERIODS)
+
+
+class RegionCounts:
+    """시도별 건수 배열 (이송업체 수 등)."""
+
+    def __init__(self, labels, counts):
+        self.labels = tuple(labels)
+        self.counts = counts
+        self.counts.setflags(write=False)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        self.version = _version(self.labels, counts)
+
+    def regions(self):
+        return [label for label, count in zip(self.labels, self.counts) if count > 0]
+
+    def get(self, region):
+        i = self._index.get(region)
+        return 0 if i is None else int(self.counts[i])
+
+    def series(self, region=None):
+        """region 이 있으면 해당 시도 한 개, 없으면 건수가 있는 전체 시도를 건수 내림차순으로."""
+        if region is not None:
+            return pd.Series([self.get(region)], index=[region])
+        order = np.argsort(-self.counts, kind="stable")
+        order = order[self.counts[order] > 0]
+        return pd.Series(self.counts[order], index=np.asarray(self.labels, dtype=object)[order])
+
+
+def sido_counts(transport_df, column=SIDO_COL):
+    """시도명 컬럼의 시도별 행 수. 범주형이면 범주 코드 bincount 로 계산한다."""
+    sido = transport_df[column]
+    if isinstance(sido.dtype, pd.CategoricalDtype):
+        codes = sido.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(sido.cat.categories))
+        return RegionCounts(sido.cat.categories.astype(str), counts.astype(np.int64))
+    counts = sido.value_counts()
+    labels = [name for name in SIDO_NAMES if name in counts.index] + sorted(set(counts.index) - set(SIDO_NAMES))
+    return RegionCounts(labels, counts.reindex(labels).to_numpy(dtype=np.int64))
@@ -0,0 +1,121 @@
+# -------------------------------
+# 주소 -> 행정구역(시도 / 시군구) 일괄 판별
+# -------------------------------
+# 시도 정식 명칭, 약칭('경기', '서울시'), 옛 명칭('강원도', '전라북도')을 하나의 별칭 사전으로 미리 만들어 두고,
+# 주소 컬럼 전체를 문자열 연산(str.extract / map)으로 한 번에 판별한다. 행마다 목록을 다시 만들거나
+# 부분 문자열로 비교하지 않으므로 '전라' 처럼 여러 시도에 걸치는 짧은 토큰 때문에 잘못 판별되는 일이 없다.
+import re
+
+import pandas as pd
+
+SIDO_COL = "시도명"
+SIGUNGU_COL = "시군구명"
+
+# (정식 명칭, 법정동 시도 코드, 약칭, 옛 명칭/기타 별칭)
+SIDO_TABLE = [
+    ("서울특별시", "11", "서울", ["서울시"]),
+    ("부산광역시", "26", "부산", ["부산시"]),
+    ("대구광역시", "27", "대구", ["대구시"]),
+    ("인천광역시", "28", "인천", ["인천시"]),
+    ("광주광역시", "29", "광주", ["광주시"]),
+    ("대전광역시", "30", "대전", ["대전시"]),
+    ("울산광역시", "31", "울산", ["울산시"]),
+    ("세종특별자치시", "36", "세종", ["세종시"]),
+    ("경기도", "41", "경기", []),
+    ("충청북도", "43", "충북", []),
+    ("충청남도", "44", "충남", []),
+    ("전라남도", "46", "전남", []),
+    ("경상북도", "47", "경북", []),
+    ("경상남도", "48", "경남", []),
+    ("제주특별자치도", "50", "제주", ["제주도"]),
+    ("강원특별자치도", "51", "강원", ["강원도"]),
+    ("전북특별자치도", "52", "전북", ["전라북도"]),
+]
+SIDO_NAMES = [name for name, _, _, _ in SIDO_TABLE]
+SIDO_SHORT_NAMES = {name: short for name, _, short, _ in SIDO_TABLE}
+
+# 행정구역 개편으로 바뀐 시군구 명칭 (시도, 옛 명칭) -> 현재 명칭
+SIGUNGU_ALIASES = {
+    ("인천광역시", "남구"): "미추홀구",
+    ("경기도", "여주군"): "여주시",
+    ("경기도", "포천군"): "포천시",
+    ("경기도", "양주군"): "양주시",
+    ("충청북도", "청원군"): "청주시",
+    ("충청남도", "당진군"): "당진시",
+    ("경상남도", "마산시"): "창원시",
+    ("경상남도", "진해시"): "창원시",
+    ("제주특별자치도", "북제주군"): "제주시",
+    ("제주특별자치도", "남제주군"): "서귀포시",
+}
+
+
+def _build_alias_index():
+    aliases = {}
+    for name, _, short, extra in SIDO_TABLE:
+        for alias in [name, short, *extra]:
+            aliases[alias] = name
+    return aliases
+
+
+SIDO_ALIASES = _build_alias_index()
+_SIGUNGU_ALIAS_KEYS = {f"{sido} {old}": new for (sido, old), new in SIGUNGU_ALIASES.items()}
+
+# 첫 토큰으로 판별되지 않을 때 주소 중간의 시도 명칭을 찾기 위한 패턴 (긴 별칭 우선)
+_ANY_SIDO_RE = re.compile(
+    r"(?:^|\s)(" + "|".join(re.escape(a) for a in sorted(SIDO_ALIASES, key=len, reverse=True)) + r")(?=\s|$)"
+)
+_SIGUNGU_RE = re.compile(r"^\S+[시군구]$")
+_GU_RE = re.compile(r"^\S+구$")
+
+
+def _sigungu(sido, second, third):
+    """시도 다음 토큰으로 시군구명을 만든다. '수원시 장안구' 처럼 일반구가 있는 시는 두 토큰을 합친다."""
+    is_sigungu = second.fillna("").str.match(_SIGUNGU_RE)
+    with_gu = is_sigungu & second.str.endswith("시", na=False) & third.fillna("").str.match(_GU_RE)
+    sigungu = second.where(is_sigungu)
+    sigungu = sigungu.mask(with_gu, second + " " + third)
+
+    renamed = (sido.astype("string") + " " + second).map(_SIGUNGU_ALIAS_KEYS)
+    sigungu = sigungu.mask(renamed.notna() & is_sigungu, renamed)
+    # 세종특별자치시는 시군구가 없음
+    return sigungu.mask(sido == "세종특별자치시")
+
+
+def _resolve_tokens(first, second, third):
+    # '강원 특별자치도 ...' 처럼 시도명이 두 토큰으로 나뉜 경우를 먼저 확인
+    joined = (first + second).map(SIDO_ALIASES)
+    split_name = joined.notna()
+    sido = joined.where(split_name, first.map(SIDO_ALIASES))
+    # '세종 ...', '세종시조치원읍' 처럼 붙어 쓴 세종 주소
+    sido = sido.mask(sido.isna() & first.str.startswith("세종", na=False), "세종특별자치시")
+    second, third = second.mask(split_name, third), third.mask(split_name, pd.NA)
+    return sido, _sigungu(sido, second, third).where(sido.notna())
+
+
+def resolve_regions(addresses):
+    """주소 Series 전체를 (시도명, 시군구명) 데이터프레임으로 변환한다.
+
+    시도명은 정식 명칭(옛 명칭은 현재 명칭으로 통일) 범주형, 시군구명은 범주형이며 판별하지 못한 값은 NaN 이다.
+    범주 코드(.cat.codes)를 그대로 지역 코드로 사용할 수 있다.
+    """
+    addresses = pd.Series(addresses, dtype="string")
+    tokens = addresses.str.strip().str.split(n=3, expand=True).reindex(columns=range(3))
+    # 같은 앞부분 토큰 조합은 한 번만 판별 (전국 단위 자료도 조합 수는 수천 개 수준)
+    codes, uniques = pd.MultiIndex.from_frame(tokens.astype("string")).factorize()
+    uniques = uniques.to_frame(index=False)
+    sido, sigungu = _resolve_tokens(*(uniques[c].astype("string") for c in uniques.columns))
+    sido = pd.Series(sido.to_numpy(dtype=object)[codes], index=addresses.index)
+    sigungu = pd.Series(sigungu.to_numpy(dtype=object)[codes], index=addresses.index)
+
+    # 앞에 번지 등이 붙어 있는 경우: 주소 중간에 있는 시도 명칭을 찾음 (시군구는 판별하지 않음)
+    unresolved = sido.isna() & addresses.fillna("").str.strip().ne("")
+    if unresolved.any():
+        found = addresses[unresolved].str.extract(_ANY_SIDO_RE, expand=False).map(SIDO_ALIASES)
+        sido = sido.mask(unresolved, found)
+
+    sido = sido.where(sido.notna(), None)
+    sigungu = sigungu.where(sigungu.notna() & sido.notna(), None)
+    return pd.DataFrame({
+        SIDO_COL: pd.Categorical(sido, categories=SIDO_NAMES),
+        SIGUNGU_COL: pd.Categorical(sigungu, categories=sorted(sigungu.dropna().unique().tolist())),
+    }, index=addresses.index)
@@ -0,0 +1,335 @@
+# -------------------------------
+# 시도별 도로망 관리 (필요할 때 로드 + 메모리 예산 LRU + 인접 시도 미리 로드)
+# -------------------------------
+# 선택한 시도의 도로망만 로컬 파일에서 불러오고, 최근 사용한 시도는 바이트 예산 안에서 메모리에 유지한다.
+# 예산을 넘으면 가장 오래 사용하지 않은 시도부터 내보낸다. 로드는 백그라운드 스레드에서 실행되므로
+# 지역을 바꿔도 화면이 멈추지 않고, 현재 시도를 사용하는 동안 인접 시도를 남는 예산 안에서 미리 불러 둔다.
+# 최근접 업체 인덱스, 주행 시간 행렬처럼 도로망에서 파생된 객체도 시도 항목에 붙여 두므로(derived)
+# 예산 계산에 포함되고, 시도를 내보내면 함께 사라진다.
+#
+# 시도별 자료 (data/road_network 아래, 앞에 있는 것을 우선 사용):
+#   <시도명>/          RoadSnapshot 디렉터리 (meta.json + .npy, 메모리 매핑으로 로드)
+#   <시도명>.graphml   osmnx.save_graphml 로 저장한 그래프 -> 처음 로드할 때 스냅샷으로 변환하여 저장
+#   <시도명>.osm       OSM XML 추출본 -> 위와 같음
+# 앱 실행 중에는 OpenStreetMap 에서 내려받지 않는다. 자료 준비 (네트워크 연결이 있는 환경에서 1회 실행):
+#   python -m emergency.road_regions 경기도                  # osmnx 로 시도 전체를 내려받아 스냅샷 저장
+#   python -m emergency.road_regions 경기도 gyeonggi.graphml  # 로컬 GraphML / OSM XML 을 스냅샷으로 변환
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from emergency.regions import SIDO_ALIASES, SIDO_NAMES
+from emergency.road_snapshot import (_ARRAY_NAMES, DEFAULT_SNAPSHOT_ROOT, build_snapshot, graph_to_snapshot,
+                                     load_snapshot, save_snapshot, snapshot_dir_for, snapshot_exists)
+
+DEFAULT_BYTE_BUDGET = 1024 * 2 ** 20
+# 시도 하나에 붙여 둘 파생 객체 수 (이송업체 목록이 바뀔 때마다 새 키가 생기므로 오래된 것부터 버림)
+DEFAULT_MAX_DERIVED = 8
+
+# 육로로 맞닿은 시도 쌍 (미리 로드 대상)
+_SIDO_BORDERS = [
+    ("서울특별시", "경기도"), ("서울특별시", "인천광역시"), ("인천광역시", "경기도"),
+    ("경기도", "강원특별자치도"), ("경기도", "충청북도"), ("경기도", "충청남도"),
+    ("강원특별자치도", "충청북도"), ("강원특별자치도", "경상북도"),
+    ("충청북도", "충청남도"), ("충청북도", "세종특별자치시"), ("충청북도", "대전광역시"),
+    ("충청북도", "전북특별자치도"), ("충청북도", "경상북도"),
+    ("충청남도", "세종특별자치시"), ("충청남도", "대전광역시"), ("충청남도", "전북특별자치도"),
+    ("세종특별자치시", "대전광역시"),
+    ("전북특별자치도", "전라남도"), ("전북특별자치도", "경상북도"), ("전북특별자치도", "경상남도"),
+    ("전라남도", "광주광역시"), ("전라남도", "경상남도"),
+    ("경상북도", "대구광역시"), ("경상북도", "울산광역시"), ("경상북도", "경상남도"),
+    ("경상남도", "대구광역시"), ("경상남도", "부산광역시"), ("경상남도", "울산광역시"),
+    ("부산광역시", "울산광역시"),
+]
+
+
+def _build_neighbors():
+    neighbors = {name: [] for name in SIDO_NAMES}
+    for a, b in _SIDO_BORDERS:
+        neighbors[a].append(b)
+        neighbors[b].append(a)
+    return neighbors
+
+
+SIDO_NEIGHBORS = _build_neighbors()
+
+
+def snapshot_nbytes(snapshot):
+    """스냅샷 배열과 만들어 둔 CSR 행렬의 바이트 수. (메모리 매핑 배열도 전체 크기로 계산)"""
+    total = sum(getattr(snapshot, name).nbytes for name in _ARRAY_NAMES)
+    for matrix in snapshot._csr_cache.values():
+        total += matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return total
+
+
+def object_nbytes(obj, _seen=None, _depth=0):
+    """파생 객체가 들고 있는 배열 / 희소 행렬 / 데이터프레임 / KD-트리의 대략적인 바이트 수.
+
+    객체 속성과 컨테이너를 몇 단계까지 따라가며 합산한다. RoadSnapshot 은 snapshot_nbytes 로 따로 계산하므로 제외한다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from emergency.road_snapshot import RoadSnapshot
+
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen or _depth > 4 or obj is None or isinstance(obj, (RoadSnapshot, str, bytes, int, float)):
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep=False).sum()) if isinstance(obj, pd.DataFrame) else int(obj.memory_usage())
+    if hasattr(obj, "indptr") and hasattr(obj, "data") and hasattr(obj, "indices"):  # scipy.sparse CSR / CSC
+        return obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes
+    if type(obj).__name__ in ("cKDTree", "KDTree"):
+        # 트리 노드 배열은 공개되지 않으므로 좌표 + 순서 배열의 두 배로 추정
+        return 2 * (obj.data.nbytes + obj.indices.nbytes)
+    if isinstance(obj, (list, tuple)):
+        if obj and isinstance(obj[0], (int, float)):
+            return sys.getsizeof(obj) + len(obj) * sys.getsizeof(obj[0])
+        return sum(object_nbytes(item, _seen, _depth + 1) for item in obj)
+    if isinstance(obj, dict):
+        return sum(object_nbytes(value, _seen, _depth + 1) for value in obj.values())
+    if hasattr(obj, "__dict__"):
+        return object_nbytes(vars(obj), _seen, _depth + 1)
+    return 0
+
+
+def region_sources(name, root=DEFAULT_SNAPSHOT_ROOT):
+    """지역 이름의 로컬 자료 후보 [(종류, 경로)] 중 실제로 있는 것. 종류: 'snapshot' / 'graphml' / 'osm'"""
+    snapshot_dir = snapshot_dir_for(name, root)
+    candidates = [("snapshot", snapshot_dir), ("graphml", snapshot_dir + ".graphml"), ("osm", snapshot_dir + ".osm")]
+    return [(kind, path) for kind, path in candidates
+            if (snapshot_exists(path) if kind == "snapshot" else os.path.exists(path))]
+
+
+def convert_graph_file(path, name, out_dir):
+    """GraphML / OSM XML 파일을 스냅샷으로 변환하여 out_dir 에 저장한다."""
+    import osmnx as ox
+
+    if path.endswith(".graphml"):
+        G = ox.load_graphml(path)
+    else:
+        G = ox.graph_from_xml(path, simplify=True, retain_all=True)
+    if not all("travel_time" in data for _, _, data in G.edges(data=True)):
+        G = ox.add_edge_travel_times(ox.add_edge_speeds(G))
+    snapshot = graph_to_snapshot(G, name)
+    save_snapshot(snapshot, out_dir)
+    return snapshot
+
+
+class RoadGraphManager:
+    """시도별 RoadSnapshot 을 필요할 때 불러오고 byte_budget 안에서 LRU 로 유지한다. 여러 세션이 공유해도 된다.
+
+    places: 시도 자료가 없을 때 대신 사용할 지역 이름 (예: {"경기도": "Yongin-si, Gyeonggi-do, South Korea"})
+    한 시도의 도로망(+ 파생 객체)이 예산보다 크면 그 시도 하나만 메모리에 남긴다.
+    """
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_ROOT, byte_budget=DEFAULT_BYTE_BUDGET, places=None,
+                 preload_neighbors=True, max_workers=2, max_derived=DEFAULT_MAX_DERIVED):
+        self.root = root
+        self.byte_budget = byte_budget
+        self.places = dict(places or {})
+        self.preload_neighbors = preload_neighbors
+        self.max_derived = max_derived
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()  # 시도명 -> RoadSnapshot (뒤쪽이 최근 사용)
+        self._derived = {}  # 시도명 -> OrderedDict(키 -> 파생 객체)
+        self._pending = {}  # 시도명 -> Future
+        self._errors = {}  # 시도명 -> 오류 메시지
+        # 미리 로드는 별도 스레드 1개에서 실행하여 사용자가 고른 시도의 로드를 막지 않음
+        self._foreground = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="road-load")
+        self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="road-preload")
+
+    @staticmethod
+    def region_key(region):
+        """'서울', '서울시', '서울특별시' 등을 시도 정식 명칭으로. 시도가 아니면 None."""
+        return SIDO_ALIASES.get(region) if region else None
+
+    def sources(self, region):
+        """시도의 로컬 자료 [(이름, 종류, 경로)] (우선순위 순)."""
+        sido = self.region_key(region)
+        if sido is None:
+            return []
+        names = [sido] + ([self.places[sido]] if sido in self.places else [])
+        return [(name, kind, path) for name in names for kind, path in region_sources(name, self.root)]
+
+    def status(self, region):
+        """'loaded' / 'loading' / 'error' / 'unloaded'(로컬 자료는 있으나 아직 로드 전) / 'missing'(로컬 자료 없음)"""
+        sido = self.region_key(region)
+        with self._lock:
+            if sido in self._loaded:
+                return "loaded"
+            if sido in self._pending:
+                return "loading"
+            if sido in self._errors:
+                return "error"
+        return "unloaded" if self.sources(sido) else "missing"
+
+    def error(self, region):
+        return self._errors.get(self.region_key(region))
+
+    def get(self, region, wait=False, timeout=None):
+        """메모리에 있으면 스냅샷을 바로 반환하고, 없으면 백그라운드 로드를 시작하고 None 을 반환한다.
+
+        wait=True 이면 로드가 끝날 때까지 기다린다. 로드에 실패한 시도는 retry() 전까지 다시 시도하지 않는다.
+        """
+        sido = self.region_key(region)
+        if sido is None:
+            return None
+        with self._lock:
+            snapshot = self._loaded.get(sido)
+            if snapshot is not None:
+                self._loaded.move_to_end(sido)
+            future = None if snapshot is not None or sido in self._errors else self._submit(sido, preload=False)
+        if snapshot is not None:
+            if self.preload_neighbors:
+                self.preload(SIDO_NEIGHBORS.get(sido, []))
+            return snapshot
+        if future is None or not wait:
+            return None
+        return future.result(timeout)
+
+    def derived(self, region, key, build):
+        """시도 도로망에서 파생된 객체를 key 로 캐시한다. 없으면 build() 로 만든다.
+
+        파생 객체는 시도 항목과 함께 예산에 포함되고 시도를 내보낼 때 같이 사라진다.
+        시도가 메모리에 없으면 (그 사이 내보내진 경우 등) 만든 객체를 캐시하지 않고 반환만 한다.
+        """
+        sido = self.region_key(region)
+        with self._lock:
+            cache = self._derived.get(sido)
+            if cache is not None and key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = build()
+        with self._lock:
+            if sido in self._loaded:
+                cache = self._derived.setdefault(sido, OrderedDict())
+                cache[key] = value
+                while len(cache) > self.max_derived:
+                    cache.popitem(last=False)
+                self._evict_locked(keep=sido)
+        return value
+
+    def retry(self, region):
+        """로드에 실패한 시도의 오류 기록을 지워 다음 get() 에서 다시 불러오게 한다."""
+        with self._lock:
+            self._errors.pop(self.region_key(region), None)
+
+    def preload(self, regions):
+        """남는 예산 안에 들어가는 시도만 백그라운드에서 미리 불러온다. (이미 있는 시도는 내보내지 않음)"""
+        for region in regions:
+            sido = self.region_key(region)
+            sources = self.sources(sido)
+            if not sources:
+                continue
+            estimate = self._estimate_nbytes(sources[0])
+            with self._lock:
+                if sido in self._loaded or sido in self._pending or sido in self._errors:
+                    continue
+                if self._used_bytes_locked() + estimate > self.byte_budget:
+                    continue
+                self._submit(sido, preload=True)
+
+    def evict(self, region):
+        with self._lock:
+            self._drop_locked(self.region_key(region))
+
+    @property
+    def used_bytes(self):
+        with self._lock:
+            return self._used_bytes_locked()
+
+    def loaded_regions(self):
+        """메모리에 있는 [(시도명, 파생 객체를 포함한 바이트 수)] (오래 사용하지 않은 순)."""
+        with self._lock:
+            return [(sido, self._entry_nbytes_locked(sido)) for sido in self._loaded]
+
+    def shutdown(self):
+        self._foreground.shutdown(wait=False, cancel_futures=True)
+        self._background.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, sido, preload):
+        # _lock 을 잡은 상태에서 호출
+        future = self._pending.get(sido)
+        if future is None:
+            if not self.sources(sido):
+                return None
+            executor = self._background if preload else self._foreground
+            future = executor.submit(self._load, sido, preload)
+            self._pending[sido] = future
+        return future
+
+    def _load(self, sido, preload):
+        try:
+            snapshot = self._open(sido)
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(sido, None)
+                self._errors[sido] = f"{type(e).__name__}: {e}"
+            return None
+        with self._lock:
+            self._pending.pop(sido, None)
+            self._loaded[sido] = snapshot
+            # 미리 로드한 시도는 아직 사용하지 않았으므로 가장 먼저 내보낼 순서에 둠
+            self._loaded.move_to_end(sido, last=not preload)
+            self._evict_locked(keep=sido)
+        return snapshot
+
+    def _open(self, sido):
+        name, kind, path = self.sources(sido)[0]
+        if kind == "snapshot":
+            return load_snapshot(path)
+        out_dir = snapshot_dir_for(name, self.root)
+        convert_graph_file(path, name, out_dir)
+        # 변환 결과도 메모리 매핑으로 다시 열어 다른 시도와 같은 방식으로 메모리를 사용
+        return load_snapshot(out_dir)
+
+    def _estimate_nbytes(self, source):
+        _, kind, path = source
+        if kind != "snapshot":
+            return os.path.getsize(path)
+        return sum(os.path.getsize(os.path.join(path, f"{name}.npy")) for name in _ARRAY_NAMES)
+
+    def _entry_nbytes_locked(self, sido):
+        derived = self._derived.get(sido, {})
+        return snapshot_nbytes(self._loaded[sido]) + sum(object_nbytes(value) for value in derived.values())
+
+    def _used_bytes_locked(self):
+        return sum(self._entry_nbytes_locked(sido) for sido in self._loaded)
+
+    def _drop_locked(self, sido):
+        self._loaded.pop(sido, None)
+        self._derived.pop(sido, None)
+
+    def _evict_locked(self, keep):
+        # CSR 행렬, 파생 객체처럼 로드 후에 늘어난 크기까지 다시 계산하여 예산을 넘는 동안 오래된 시도부터 내보냄
+        sizes = {sido: self._entry_nbytes_locked(sido) for sido in self._loaded}
+        used = sum(sizes.values())
+        for sido in list(self._loaded):
+            if used <= self.byte_budget:
+                break
+            if sido == keep:
+                continue
+            self._drop_locked(sido)
+            used -= sizes[sido]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or SIDO_ALIASES.get(sys.argv[1]) is None:
+        print('사용법: python -m emergency.road_regions <시도> [GraphML 또는 OSM XML 파일]')
+        sys.exit(1)
+    sido_name = SIDO_ALIASES[sys.argv[1]]
+    target_dir = snapshot_dir_for(sido_name)
+    started = time.perf_counter()
+    if len(sys.argv) > 2:
+        built = convert_graph_file(sys.argv[2], sido_name, target_dir)
+    else:
+        built = build_snapshot(f"{sido_name}, 대한민국", target_dir)
+    print(f"{target_dir}: 노드 {built.num_nodes}개, 간선 {built.num_edges}개 "
+          f"({time.perf_counter() - started:.1f}초)")
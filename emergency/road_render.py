@@ -0,0 +1,131 @@
+# -------------------------------
+# 도로망 렌더링 (LineCollection 1회 그리기 + PNG 바이트 캐시)
+# -------------------------------
+# ox.plot_graph 는 간선마다 networkx 속성을 읽어 그리므로 큰 도로망에서 느리다.
+# 여기서는 스냅샷 배열에서 선분 좌표를 벡터화하여 만들고 LineCollection 하나로 그린 뒤,
+# 결과 PNG 바이트를 (그래프 fingerprint, 스타일, 표시 범위, 상세 수준) 단위로 캐시한다.
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_STYLE = {
+    "bgcolor": "white",
+    "edge_color": "gray",
+    "edge_linewidth": 0.5,
+    "major_edge_linewidth": 0.9,
+    "node_color": "red",
+    "node_size": 5,
+    "figsize": (8, 8),
+    "dpi": 100,
+}
+
+# 축소 보기에서 남겨 둘 주요 도로 등급
+MAJOR_ROAD_CLASSES = frozenset({
+    "motorway", "motorway_link", "trunk", "trunk_link",
+    "primary", "primary_link", "secondary", "secondary_link", "tertiary",
+})
+
+# level_of_detail="auto" 일 때 이 범위(도)보다 넓게 보거나 간선이 이보다 많으면 주요 도로만 표시
+AUTO_LOD_SPAN_DEG = 0.15
+AUTO_LOD_MAX_EDGES = 20000
+
+_RENDER_CACHE_SIZE = 16
+_render_cache = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+def _style_key(style):
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in style.items()))
+
+
+def resolve_level_of_detail(snapshot, level_of_detail="auto", bbox=None):
+    """'full' / 'major' 중 실제로 사용할 상세 수준을 정한다."""
+    if level_of_detail != "auto":
+        return level_of_detail
+    if bbox is not None:
+        west, south, east, north = bbox
+        return "major" if max(east - west, north - south) > AUTO_LOD_SPAN_DEG else "full"
+    return "major" if snapshot.num_edges > AUTO_LOD_MAX_EDGES else "full"
+
+
+def edge_segments(snapshot, level_of_detail="full", bbox=None):
+    """그릴 선분 배열 (m, 2, 2)과 각 선분의 주요 도로 여부 배열을 만든다.
+
+    양방향 도로는 한 번만 그리고, level_of_detail="major" 이면 주요 도로 등급만 남긴다.
+    bbox=(서, 남, 동, 북)이 주어지면 한쪽 끝이라도 범위 안에 있는 선분만 남긴다.
+    """
+    src = snapshot.edge_sources()
+    dst = np.asarray(snapshot.indices)
+    major_codes = np.array([c in MAJOR_ROAD_CLASSES for c in snapshot.highway_classes] or [False], dtype=bool)
+    is_major = major_codes[np.asarray(snapshot.edge_highway)]
+
+    # (u, v)와 (v, u)는 같은 선분이므로 작은 번호 -> 큰 번호 방향 하나만 남김
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    _, first = np.unique(lo.astype(np.int64) * snapshot.num_nodes + hi, return_index=True)
+    keep = np.zeros(len(src), dtype=bool)
+    keep[first] = True
+    if level_of_detail == "major":
+        keep &= is_major
+
+    x = np.asarray(snapshot.node_x)
+    y = np.asarray(snapshot.node_y)
+    if bbox is not None:
+        west, south, east, north = bbox
+        inside = (x >= west) & (x <= east) & (y >= south) & (y <= north)
+        keep &= inside[src] | inside[dst]
+
+    src, dst = src[keep], dst[keep]
+    segments = np.stack((np.column_stack((x[src], y[src])), np.column_stack((x[dst], y[dst]))), axis=1)
+    return segments, is_major[keep]
+
+
+def _render(snapshot, style, level_of_detail, bbox):
+    # pyplot 전역 상태를 쓰지 않는 Figure 를 직접 만들어 여러 세션에서 동시에 호출해도 안전하게 함
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    segments, is_major = edge_segments(snapshot, level_of_detail, bbox)
+    fig = Figure(figsize=style["figsize"], facecolor=style["bgcolor"])
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_facecolor(style["bgcolor"])
+    linewidths = np.where(is_major, style["major_edge_linewidth"], style["edge_linewidth"])
+    ax.add_collection(LineCollection(segments, colors=style["edge_color"], linewidths=linewidths))
+
+    # 노드는 전체 보기에서만 표시 (축소 보기에서는 간선만 그림)
+    if level_of_detail == "full" and style["node_size"] > 0 and len(segments):
+        nodes = np.unique(segments.reshape(-1, 2), axis=0)
+        ax.scatter(nodes[:, 0], nodes[:, 1], s=style["node_size"], c=style["node_color"], linewidths=0)
+
+    if bbox is not None:
+        ax.set_xlim(bbox[0], bbox[2])
+        ax.set_ylim(bbox[1], bbox[3])
+    else:
+        ax.autoscale_view()
+    # 위도에 따른 경도 축척 보정
+    mean_lat = float(np.mean(snapshot.node_y)) if snapshot.num_nodes else 0.0
+    ax.set_aspect(1 / np.cos(np.radians(mean_lat)))
+    ax.axis("off")
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=style["dpi"], facecolor=style["bgcolor"])
+    return buffer.getvalue()
+
+
+def render_road_network_png(snapshot, style=None, level_of_detail="auto", bbox=None):
+    """도로망 이미지를 PNG 바이트로 반환한다. 같은 그래프/스타일/범위/상세 수준이면 캐시된 결과를 돌려준다."""
+    style = {**DEFAULT_STYLE, **(style or {})}
+    lod = resolve_level_of_detail(snapshot, level_of_detail, bbox)
+    key = (snapshot.fingerprint, _style_key(style), lod, tuple(bbox) if bbox is not None else None)
+    with _render_cache_lock:
+        png = _render_cache.get(key)
+        if png is not None:
+            _render_cache.move_to_end(key)
+            return png
+    png = _render(snapshot, style, lod, bbox)
+    with _render_cache_lock:
+        _render_cache[key] = png
+        if len(_render_cache) > _RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    return png
@@ -0,0 +1,266 @@
+# -------------------------------
+# 도로망 배열 스냅샷 (CSR 인접 구조 + 메모리 매핑 .npy)
+# -------------------------------
+# osmnx로 받은 MultiDiGraph를 한 번만 배열 형태로 저장해 두고, 앱은 OpenStreetMap 다운로드 없이
+# np.load(mmap_mode='r')로 즉시 불러온다. 메모리 매핑된 배열은 OS 페이지 캐시를 통해
+# 여러 Streamlit 워커 프로세스가 같은 물리 메모리를 공유한다.
+#
+# 스냅샷 생성 (네트워크 연결이 있는 환경에서 1회 실행):
+#   python -m emergency.road_snapshot "Yongin-si, Gyeonggi-do, South Korea"
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_SNAPSHOT_ROOT = os.path.join("data", "road_network")
+SNAPSHOT_FORMAT_VERSION = 1
+
+_ARRAY_NAMES = ("node_ids", "node_x", "node_y", "indptr", "indices",
+                "edge_key", "edge_length", "edge_travel_time", "edge_highway")
+
+# 속도 정보가 없는 간선에 사용할 도로 등급별 기본 속도 (km/h)
+DEFAULT_SPEED_KPH = {
+    "motorway": 100, "motorway_link": 60,
+    "trunk": 80, "trunk_link": 50,
+    "primary": 60, "primary_link": 40,
+    "secondary": 50, "secondary_link": 40,
+    "tertiary": 40, "tertiary_link": 30,
+    "unclassified": 30, "residential": 30, "living_street": 20,
+}
+FALLBACK_SPEED_KPH = 30
+
+
+def snapshot_dir_for(place_name, root=DEFAULT_SNAPSHOT_ROOT):
+    """지역 이름으로부터 스냅샷 디렉터리 경로를 만든다. (예: 'yongin-si-gyeonggi-do-south-korea')"""
+    slug = re.sub(r"[^0-9a-zA-Z가-힣]+", "-", place_name).strip("-").lower()
+    return os.path.join(root, slug)
+
+
+def _first(value):
+    # osmnx 단순화 그래프는 병합된 간선의 속성을 리스트로 저장하므로 첫 값을 사용
+    if isinstance(value, (list, tuple)):
+        return value[0] if value else None
+    return value
+
+
+def _edge_speed_kph(data):
+    speed = _first(data.get("speed_kph"))
+    if speed is not None:
+        try:
+            return float(speed)
+        except (TypeError, ValueError):
+            pass
+    maxspeed = _first(data.get("maxspeed"))
+    if maxspeed is not None:
+        match = re.match(r"\d+(\.\d+)?", str(maxspeed))
+        if match:
+            return float(match.group())
+    return DEFAULT_SPEED_KPH.get(_first(data.get("highway")), FALLBACK_SPEED_KPH)
+
+
+class RoadSnapshot:
+    """CSR 형태의 도로망. 노드는 0..n-1 정수 인덱스, 간선은 출발 노드 순으로 정렬되어 있다.
+
+    - node_ids: OSM 노드 ID (int64), node_x / node_y: 경도 / 위도
+    - indptr / indices: 노드 i 의 나가는 간선은 indices[indptr[i]:indptr[i+1]]
+    - edge_length (m), edge_travel_time (초), edge_highway: highway_classes 의 인덱스
+    """
+
+    def __init__(self, arrays, meta):
+        for name in _ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.meta = meta
+        self._csr_cache = {}
+        self._node_index = None
+        self.source_dir = None  # load_snapshot 으로 불러온 경우 스냅샷 디렉터리
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def place_name(self):
+        return self.meta.get("place_name")
+
+    @property
+    def highway_classes(self):
+        return self.meta.get("highway_classes", [])
+
+    @property
+    def fingerprint(self):
+        # 그래프 내용이 바뀌면 달라지는 식별자 (라우팅/커버리지 캐시 무효화 키로 사용)
+        return self.meta["fingerprint"]
+
+    # networkx 호환 조회 (기존 화면 코드에서 사용)
+    def __len__(self):
+        return self.num_nodes
+
+    def number_of_nodes(self):
+        return self.num_nodes
+
+    def number_of_edges(self):
+        return self.num_edges
+
+    def edge_sources(self):
+        """각 간선의 출발 노드 인덱스 배열."""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def node_index(self, osm_id):
+        """OSM 노드 ID를 배열 인덱스로 변환한다."""
+        if self._node_index is None:
+            self._node_index = {int(n): i for i, n in enumerate(self.node_ids)}
+        return self._node_index[int(osm_id)]
+
+    def csr(self, weight="travel_time"):
+        """scipy.sparse CSR 가중치 행렬. 평행 간선은 가장 작은 가중치 하나만 남긴다."""
+        if weight not in self._csr_cache:
+            from scipy.sparse import csr_matrix
+
+            values = self.edge_travel_time if weight == "travel_time" else self.edge_length
+            sources = self.edge_sources()
+            # (출발, 도착, 가중치) 순 정렬 후 첫 항목만 남겨 평행 간선 중 최솟값 선택
+            order = np.lexsort((values, self.indices, sources))
+            src, dst, val = sources[order], self.indices[order], values[order]
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+            # scipy csgraph는 0 가중치를 간선 없음으로 취급하므로 아주 작은 양수로 대체
+            val = np.maximum(val[keep], 1e-6)
+            self._csr_cache[weight] = csr_matrix(
+                (val, (src[keep], dst[keep])), shape=(self.num_nodes, self.num_nodes)
+            )
+        return self._csr_cache[weight]
+
+    def to_networkx(self):
+        """필요할 때만 networkx MultiDiGraph로 되돌린다 (osmnx 플로팅 등 호환용)."""
+        import networkx as nx
+
+        G = nx.MultiDiGraph(crs=self.meta.get("crs", "epsg:4326"), name=self.place_name)
+        node_ids = self.node_ids.tolist()
+        G.add_nodes_from(
+            (n, {"x": x, "y": y}) for n, x, y in zip(node_ids, self.node_x.tolist(), self.node_y.tolist())
+        )
+        classes = self.highway_classes
+        sources = self.edge_sources()
+        for s, d, k, length, tt, hw in zip(sources.tolist(), self.indices.tolist(), self.edge_key.tolist(),
+                                           self.edge_length.tolist(), self.edge_travel_time.tolist(),
+                                           self.edge_highway.tolist()):
+            G.add_edge(node_ids[s], node_ids[d], key=k, length=length, travel_time=tt, highway=classes[hw])
+        return G
+
+
+def graph_to_snapshot(G, place_name=None):
+    """osmnx MultiDiGraph를 RoadSnapshot으로 변환한다."""
+    node_ids = np.array(sorted(G.nodes), dtype=np.int64)
+    index = {int(n): i for i, n in enumerate(node_ids)}
+    node_x = np.array([G.nodes[n]["x"] for n in node_ids.tolist()], dtype=np.float64)
+    node_y = np.array([G.nodes[n]["y"] for n in node_ids.tolist()], dtype=np.float64)
+
+    highway_classes = []
+    class_index = {}
+    src, dst, keys, lengths, times, highways = [], [], [], [], [], []
+    for u, v, k, data in G.edges(keys=True, data=True):
+        length = float(data.get("length", 0.0) or 0.0)
+        travel_time = data.get("travel_time")
+        if travel_time is None:
+            travel_time = length / (_edge_speed_kph(data) * 1000 / 3600)
+        hw = str(_first(data.get("highway")) or "unclassified")
+        if hw not in class_index:
+            class_index[hw] = len(highway_classes)
+            highway_classes.append(hw)
+        src.append(index[int(u)])
+        dst.append(index[int(v)])
+        keys.append(int(k))
+        lengths.append(length)
+        times.append(float(travel_time))
+        highways.append(class_index[hw])
+
+    src = np.array(src, dtype=np.int32)
+    order = np.argsort(src, kind="stable")
+    counts = np.bincount(src, minlength=len(node_ids))
+    indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    arrays = {
+        "node_ids": node_ids,
+        "node_x": node_x,
+        "node_y": node_y,
+        "indptr": indptr,
+        "indices": np.array(dst, dtype=np.int32)[order],
+        "edge_key": np.array(keys, dtype=np.int16)[order],
+        "edge_length": np.array(lengths, dtype=np.float32)[order],
+        "edge_travel_time": np.array(times, dtype=np.float32)[order],
+        "edge_highway": np.array(highways, dtype=np.uint8)[order],
+    }
+    digest = hashlib.sha1()
+    for name in _ARRAY_NAMES:
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "place_name": place_name or G.graph.get("name"),
+        "crs": str(G.graph.get("crs", "epsg:4326")),
+        "highway_classes": highway_classes,
+        "num_nodes": int(len(node_ids)),
+        "num_edges": int(len(src)),
+        "fingerprint": digest.hexdigest(),
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return RoadSnapshot(arrays, meta)
+
+
+def save_snapshot(snapshot, out_dir):
+    """스냅샷을 디렉터리에 배열별 .npy 파일과 meta.json으로 저장한다."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name in _ARRAY_NAMES:
+        np.save(os.path.join(out_dir, f"{name}.npy"), np.ascontiguousarray(getattr(snapshot, name)))
+    # meta.json은 마지막에 기록하여, 저장 도중 중단된 디렉터리는 로드 대상이 되지 않도록 함
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(snapshot.meta, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+def snapshot_exists(snapshot_dir):
+    return os.path.exists(os.path.join(snapshot_dir, "meta.json"))
+
+
+def load_snapshot(snapshot_dir, mmap=True):
+    """저장된 스냅샷을 불러온다. mmap=True 이면 배열을 읽기 전용 메모리 매핑으로 연다."""
+    with open(os.path.join(snapshot_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 형식 버전입니다: {meta.get('format_version')}")
+    mode = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mode) for name in _ARRAY_NAMES}
+    snapshot = RoadSnapshot(arrays, meta)
+    snapshot.source_dir = snapshot_dir
+    return snapshot
+
+
+def build_snapshot(place_name, out_dir=None):
+    """osmnx로 도로망을 내려받아 스냅샷으로 저장한다. (네트워크 연결 필요)"""
+    import osmnx as ox
+
+    G = ox.graph_from_place(place_name, network_type="drive", simplify=True, retain_all=True)
+    G = ox.add_edge_speeds(G)
+    G = ox.add_edge_travel_times(G)
+    snapshot = graph_to_snapshot(G, place_name)
+    save_snapshot(snapshot, out_dir or snapshot_dir_for(place_name))
+    return snapshot
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print('사용법: python -m emergency.road_snapshot "<지역 이름>" [출력 디렉터리]')
+        sys.exit(1)
+    target_dir = sys.argv[2] if len(sys.argv) > 2 else snapshot_dir_for(sys.argv[1])
+    started = time.perf_counter()
+    built = build_snapshot(sys.argv[1], target_dir)
+    print(f"{target_dir}: 노드 {built.num_nodes}개, 간선 {built.num_edges}개 "
+          f"({time.perf_counter() - started:.1f}초)")
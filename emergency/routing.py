@@ -0,0 +1,158 @@
+# -------------------------------
+# 최근접 이송업체 라우팅 (KD-트리 노드 스냅 + 다중 출발점 다익스트라)
+# -------------------------------
+# 모든 이송업체 위치를 도로망 노드에 스냅한 뒤, 이송업체 전체를 출발점으로 하는 다익스트라를 한 번 수행하여
+# 도로망의 모든 노드에 대해 "가장 빨리 도착하는 이송업체"와 "그 도착 시간"을 미리 계산해 둔다.
+# 이후 임의 지점의 질의는 KD-트리 스냅(O(log n)) + 배열 조회(O(1))로 끝난다.
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROUTING_CACHE_DIR = os.path.join(".cache", "routing")
+ACTIVE_STATUS = "영업/정상"
+PROVIDER_NAME_COL = "사업장명"
+LAT_COL = "출발_위도"
+LON_COL = "출발_경도"
+
+# 이 거리(m)보다 도로망에서 멀리 떨어진 이송업체는 해당 도로망 밖에 있는 것으로 보고 제외
+DEFAULT_MAX_SNAP_DISTANCE_M = 2000.0
+_EARTH_RADIUS_M = 6371008.8
+
+
+def select_active_providers(transport_df):
+    """좌표가 있고 영업 중인 이송업체만 골라낸다."""
+    df = transport_df.dropna(subset=[LAT_COL, LON_COL])
+    if "영업상태명" in df.columns:
+        df = df[df["영업상태명"] == ACTIVE_STATUS]
+    return df
+
+
+def provider_key(providers_df):
+    """이송업체 목록(이름과 좌표)이 바뀌면 달라지는 해시 키."""
+    cols = [c for c in (PROVIDER_NAME_COL, LAT_COL, LON_COL) if c in providers_df.columns]
+    hashed = pd.util.hash_pandas_object(providers_df[cols], index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+class NodeSnapper:
+    """위경도 좌표를 가장 가까운 도로망 노드로 스냅하는 KD-트리."""
+
+    def __init__(self, snapshot):
+        from scipy.spatial import cKDTree
+
+        # 지역 규모에서는 등장방형(equirectangular) 근사로 충분하므로 미터 단위 평면 좌표로 변환 후 색인
+        self._lat0 = np.radians(float(np.mean(snapshot.node_y))) if snapshot.num_nodes else 0.0
+        self._tree = cKDTree(self._project(snapshot.node_x, snapshot.node_y))
+
+    def _project(self, lon, lat):
+        lon = np.radians(np.asarray(lon, dtype=np.float64))
+        lat = np.radians(np.asarray(lat, dtype=np.float64))
+        return np.column_stack((lon * np.cos(self._lat0) * _EARTH_RADIUS_M, lat * _EARTH_RADIUS_M))
+
+    def snap(self, lat, lon):
+        """좌표 배열을 (노드 인덱스 배열, 스냅 거리(m) 배열)로 변환한다."""
+        distance, node = self._tree.query(self._project(np.atleast_1d(lon), np.atleast_1d(lat)))
+        return node.astype(np.int64), distance
+
+
+class NearestProviderIndex:
+    """도로망 각 노드의 최근접(최단 주행 시간) 이송업체 인덱스.
+
+    - node_provider[v]: 노드 v에 가장 빨리 도착하는 이송업체의 providers 행 위치 (-1: 도달 불가)
+    - node_time[v]: 해당 이송업체에서 노드 v까지의 주행 시간(초)
+    """
+
+    def __init__(self, snapshot, providers, provider_nodes, node_provider, node_time, snapper=None):
+        self.snapshot = snapshot
+        self.providers = providers
+        self.provider_nodes = provider_nodes
+        self.node_provider = node_provider
+        self.node_time = node_time
+        self.snapper = snapper or NodeSnapper(snapshot)
+
+    @property
+    def num_providers(self):
+        return len(self.providers)
+
+    def lookup_nodes(self, nodes):
+        """도로망 노드 인덱스 배열에 대한 (이송업체 위치 배열, 주행 시간 배열)."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return self.node_provider[nodes], self.node_time[nodes]
+
+    def query_many(self, lat, lon):
+        """여러 지점에 대해 최근접 이송업체를 조회해 데이터프레임으로 반환한다."""
+        nodes, snap_distance = self.snapper.snap(lat, lon)
+        provider_pos, travel_time = self.lookup_nodes(nodes)
+        reachable = provider_pos >= 0
+        names = np.full(len(nodes), None, dtype=object)
+        if PROVIDER_NAME_COL in self.providers.columns and reachable.any():
+            names[reachable] = self.providers[PROVIDER_NAME_COL].to_numpy()[provider_pos[reachable]]
+        return pd.DataFrame({
+            "노드": nodes,
+            "스냅거리_m": snap_distance,
+            "이송업체_위치": provider_pos,
+            PROVIDER_NAME_COL: names,
+            "도착시간_초": np.where(reachable, travel_time, np.nan),
+        })
+
+    def query(self, lat, lon):
+        """한 지점에 대해 (이송업체 행(Series) 또는 None, 주행 시간(초))를 반환한다."""
+        nodes, _ = self.snapper.snap(lat, lon)
+        provider_pos, travel_time = self.lookup_nodes(nodes)
+        if provider_pos[0] < 0:
+            return None, float("inf")
+        return self.providers.iloc[int(provider_pos[0])], float(travel_time[0])
+
+
+def snap_providers(snapshot, providers_df, snapper=None, max_snap_distance_m=DEFAULT_MAX_SNAP_DISTANCE_M):
+    """이송업체를 도로망 노드에 스냅하고, 도로망 밖의 업체를 제외한 (업체 목록, 노드 배열, 스냅퍼)를 반환한다."""
+    snapper = snapper or NodeSnapper(snapshot)
+    if providers_df.empty:
+        return providers_df, np.empty(0, dtype=np.int64), snapper
+    nodes, distance = snapper.snap(providers_df[LAT_COL].to_numpy(), providers_df[LON_COL].to_numpy())
+    inside = distance <= max_snap_distance_m
+    return providers_df[inside], nodes[inside], snapper
+
+
+def _cache_path(cache_dir, graph_fingerprint, providers_fingerprint):
+    return os.path.join(cache_dir, f"nearest_{graph_fingerprint[:16]}_{providers_fingerprint[:16]}.npz")
+
+
+def build_nearest_provider_index(snapshot, providers_df, cache_dir=DEFAULT_ROUTING_CACHE_DIR,
+                                 max_snap_distance_m=DEFAULT_MAX_SNAP_DISTANCE_M):
+    """다중 출발점 다익스트라 1회로 모든 노드의 최근접 이송업체를 계산한다.
+
+    결과는 (도로망 fingerprint, 이송업체 목록 해시)를 키로 cache_dir에 저장되며,
+    둘 중 하나라도 바뀌면 새로 계산된다. cache_dir=None 이면 디스크 캐시를 사용하지 않는다.
+    """
+    from scipy.sparse.csgraph import dijkstra
+
+    providers, provider_nodes, snapper = snap_providers(snapshot, providers_df, max_snap_distance_m=max_snap_distance_m)
+    path = None
+    if cache_dir:
+        path = _cache_path(cache_dir, snapshot.fingerprint, provider_key(providers))
+        if os.path.exists(path):
+            with np.load(path) as cached:
+                return NearestProviderIndex(snapshot, providers, provider_nodes,
+                                            cached["node_provider"], cached["node_time"], snapper)
+
+    n = snapshot.num_nodes
+    if len(provider_nodes) == 0:
+        node_provider = np.full(n, -1, dtype=np.int32)
+        node_time = np.full(n, np.inf, dtype=np.float32)
+    else:
+        # 같은 노드에 여러 업체가 스냅되면 먼저 나온 업체를 대표로 사용 (도착 시간은 동일)
+        unique_nodes, first_pos = np.unique(provider_nodes, return_index=True)
+        dist, _, sources = dijkstra(snapshot.csr("travel_time"), directed=True, indices=unique_nodes,
+                                    min_only=True, return_predecessors=True)
+        node_to_provider = np.full(n, -1, dtype=np.int32)
+        node_to_provider[unique_nodes] = first_pos
+        node_provider = np.where(sources >= 0, node_to_provider[np.maximum(sources, 0)], -1).astype(np.int32)
+        node_time = dist.astype(np.float32)
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(path, node_provider=node_provider, node_time=node_time)
+    return NearestProviderIndex(snapshot, providers, provider_nodes, node_provider, node_time, snapper)
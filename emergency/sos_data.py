@@ -0,0 +1,281 @@
+# -------------------------------
+# 응급실 이용 통계(SOS) 로더: 다년도 long-format 테이블
+# -------------------------------
+# 정보_SOS_02.json(월별) / 정보_SOS_03.json(내원시간별)과 원본 통계 파일(확장자는 .csv 이지만 실제로는 XLSX)은
+# 앞부분 헤더 행에 열마다 연도('2023년')와 기간('1월', '00-03시이전', 'DOA' ...)이 적혀 있는 형태이다.
+# 헤더 행을 읽어 열 구성을 알아낸 뒤 본문 행을 일정 크기 묶음으로 (분류, 시도, 연도, 기간, 건수) long-format 으로
+# 변환한다. 파일 형식은 앞부분 매직 바이트로 판별하고, XLSX 는 읽기 전용 모드로 행 단위 스트리밍하여
+# 파일이 커져도 원본 행 전체를 메모리에 올리지 않는다.
+import csv
+import json
+import re
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+REGION_COL = "시도"
+LEVEL_COL = "분류"
+YEAR_COL = "연도"
+PERIOD_COL = "기간"
+VALUE_COL = "건수"
+TOTAL_REGION = "전체"
+
+TIME_PERIODS = ["00-03시", "03-06시", "06-09시", "09-12시", "12-15시", "15-18시", "18-21시", "21-24시"]
+MONTH_PERIODS = [f"{m}월" for m in range(1, 13)]
+
+# 본문 행을 이만큼씩 묶어서 변환 (메모리 사용량 상한)
+DEFAULT_CHUNK_ROWS = 5000
+
+_YEAR_RE = re.compile(r"^\s*(\d{4})\s*년?\s*$")
+_KEY_RE = re.compile(r"^col(\d+)$")
+
+_XLSX_MAGIC = b"PK\x03\x04"
+_OLE_MAGIC = b"\xd0\xcf\x11\xe0"
+
+
+def _normalize_period(label):
+    # '00-03시이전' -> '00-03시' (기존 화면의 컬럼명과 맞춤)
+    label = str(label).strip()
+    return label[:-2] if label.endswith("이전") else label
+
+
+def _cell_text(value):
+    return "" if value is None or (isinstance(value, float) and np.isnan(value)) else str(value).strip()
+
+
+@dataclass
+class _SosLayout:
+    width: int
+    level_idx: int
+    region_idx: int
+    value_idx: list
+    years: np.ndarray  # 값 열별 연도
+    period_codes: np.ndarray  # 값 열별 기간 코드
+    period_order: list
+
+
+def _header_layout(header, level_idx=None, region_idx=None):
+    """'No' 로 시작하는 헤더 행들에서 연도 행과 그 다음 기간 행을 찾아 열 구성을 만든다."""
+    width = max(len(row) for row in header)
+    header = [[_cell_text(v) for v in row] + [""] * (width - len(row)) for row in header]
+
+    year_row = next((i for i, row in enumerate(header) if any(_YEAR_RE.match(v) for v in row)), None)
+    if year_row is None or year_row + 1 >= len(header):
+        raise ValueError("연도/기간 헤더 행을 찾을 수 없습니다.")
+
+    # 병합 셀로 저장된 연도 헤더는 첫 칸에만 값이 있으므로 오른쪽으로 채움
+    years, current = [], None
+    for v in header[year_row]:
+        match = _YEAR_RE.match(v)
+        if match:
+            current = int(match.group(1))
+        elif v:
+            current = None
+        years.append(current)
+    periods = header[year_row + 1]
+
+    # 연도가 없는 열은 식별 열 ('No', 분류, 시도 ...). 첫 식별 열은 분류, 마지막 식별 열은 지역으로 본다.
+    id_idx = [i for i in range(1, width) if years[i] is None]
+    if level_idx is None:
+        level_idx = id_idx[0] if id_idx else 1
+    if region_idx is None:
+        region_idx = id_idx[-1] if id_idx else 2
+    value_idx = [i for i in range(width) if years[i] is not None and i not in (0, level_idx, region_idx)]
+
+    period_labels = [_normalize_period(periods[i]) for i in value_idx]
+    period_order = list(dict.fromkeys(period_labels))
+    return _SosLayout(
+        width=width,
+        level_idx=level_idx,
+        region_idx=region_idx,
+        value_idx=value_idx,
+        years=np.array([years[i] for i in value_idx], dtype=np.int16),
+        period_codes=np.array([period_order.index(p) for p in period_labels], dtype=np.int32),
+        period_order=period_order,
+    )
+
+
+def _encode(values, codes):
+    # 처음 나온 순서대로 코드를 붙임 (여러 묶음에 걸쳐 같은 사전을 공유)
+    for v in values:
+        if v and v not in codes:
+            codes[v] = len(codes)
+    return np.array([codes.get(v, -1) for v in values], dtype=np.int32)
+
+
+def _chunk_to_long(chunk, layout, levels, regions):
+    """본문 행 묶음을 (분류 코드, 지역 코드, 값 열 번호, 건수) 배열로 펼친다."""
+    frame = pd.DataFrame.from_records(chunk).reindex(columns=range(layout.width))
+    region_codes = _encode([_cell_text(v) for v in frame[layout.region_idx]], regions)
+    level_codes = _encode([_cell_text(v) for v in frame[layout.level_idx]], levels)
+
+    # 모든 값 셀을 한 번에 숫자로 변환 ('6,005,589' 처럼 쉼표가 들어간 문자열 포함)
+    cells = pd.Series(frame[layout.value_idx].to_numpy().ravel())
+    numbers = pd.to_numeric(cells.astype("string").str.replace(",", "", regex=False), errors="coerce").to_numpy()
+
+    n_values = len(layout.value_idx)
+    region_codes = np.repeat(region_codes, n_values)
+    keep = (region_codes >= 0) & ~np.isnan(numbers)
+    return (np.repeat(level_codes, n_values)[keep], region_codes[keep],
+            np.tile(np.arange(n_values, dtype=np.int32), len(frame))[keep], numbers[keep].astype(np.int64))
+
+
+def parse_sos_rows(rows, chunk_rows=DEFAULT_CHUNK_ROWS, level_idx=None, region_idx=None):
+    """SOS 표의 행(셀 값 시퀀스) 반복자를 (분류, 시도, 연도, 기간, 건수) long-format 데이터프레임으로 변환한다.
+
+    행은 앞에서부터 한 번만 읽으며, 본문은 chunk_rows 개씩 변환하므로 원본 행 전체를 보관하지 않는다.
+    """
+    rows = iter(rows)
+    header, pending = [], []
+    for row in rows:
+        row = list(row)
+        if row and _cell_text(row[0]) == "No":
+            header.append(row)
+            continue
+        pending.append(row)
+        break
+    if not header:
+        if not pending:
+            return empty_sos_table()
+        raise ValueError("연도/기간 헤더 행을 찾을 수 없습니다.")
+    layout = _header_layout(header, level_idx, region_idx)
+
+    levels, regions, parts = {}, {}, []
+    for row in rows:
+        pending.append(row)
+        if len(pending) >= chunk_rows:
+            parts.append(_chunk_to_long(pending, layout, levels, regions))
+            pending = []
+    if pending:
+        parts.append(_chunk_to_long(pending, layout, levels, regions))
+    if not parts:
+        return empty_sos_table()
+
+    level_codes, region_codes, value_cols, counts = (np.concatenate(arrays) for arrays in zip(*parts))
+    return pd.DataFrame({
+        LEVEL_COL: pd.Categorical.from_codes(level_codes, categories=list(levels)),
+        REGION_COL: pd.Categorical.from_codes(region_codes, categories=list(regions), ordered=True),
+        YEAR_COL: layout.years[value_cols],
+        PERIOD_COL: pd.Categorical.from_codes(layout.period_codes[value_cols], categories=layout.period_order,
+                                              ordered=True),
+        VALUE_COL: counts,
+    })
+
+
+def _records_to_rows(raw):
+    # {"col1": ..., "col2": ...} 레코드를 열 번호 순서의 행 목록으로 바꿈
+    for record in raw:
+        cells = {int(m.group(1)): v for k, v in record.items() if (m := _KEY_RE.match(k))}
+        if cells:
+            row = [None] * max(cells)
+            for i, v in cells.items():
+                row[i - 1] = v
+            yield row
+
+
+def parse_sos_records(raw, region_key="col3", level_key="col2"):
+    """SOS JSON 레코드 목록을 (분류, 시도, 연도, 기간, 건수) long-format 데이터프레임으로 변환한다."""
+    return parse_sos_rows(_records_to_rows(raw), level_idx=int(_KEY_RE.match(level_key).group(1)) - 1,
+                          region_idx=int(_KEY_RE.match(region_key).group(1)) - 1)
+
+
+def empty_sos_table():
+    return pd.DataFrame({
+        LEVEL_COL: pd.Categorical([]),
+        REGION_COL: pd.Categorical([]),
+        YEAR_COL: pd.Series([], dtype="int16"),
+        PERIOD_COL: pd.Categorical([]),
+        VALUE_COL: pd.Series([], dtype="int64"),
+    })
+
+
+def detect_sos_format(path):
+    """파일 앞부분 매직 바이트로 실제 형식('xlsx' / 'json' / 'csv')을 판별한다. 확장자는 보지 않는다."""
+    with open(path, "rb") as f:
+        head = f.read(512)
+    if head.startswith(_XLSX_MAGIC):
+        return "xlsx"
+    if head.startswith(_OLE_MAGIC):
+        raise ValueError("구형 Excel(.xls) 형식은 지원하지 않습니다. XLSX 또는 CSV로 저장해주세요.")
+    text = head.lstrip(b"\xef\xbb\xbf").lstrip()
+    if text[:1] in (b"[", b"{"):
+        return "json"
+    return "csv"
+
+
+def iter_xlsx_rows(path, sheet=None):
+    """XLSX 시트의 행을 읽기 전용 모드로 하나씩 돌려준다 (셀 값 튜플)."""
+    import openpyxl
+
+    # 확장자가 .csv 여도 읽을 수 있도록 파일 객체로 넘김
+    with open(path, "rb") as f:
+        with warnings.catch_warnings():
+            # 스타일 정보가 없는 통계 시스템 내보내기 파일에서 나오는 경고는 무시
+            warnings.simplefilter("ignore", UserWarning)
+            workbook = openpyxl.load_workbook(f, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+            # 파일에 기록된 시트 범위(dimension)가 'A1' 로 잘못 저장된 경우가 있어 실제 행을 끝까지 읽도록 초기화
+            worksheet.reset_dimensions()
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+
+def iter_csv_rows(path):
+    """CSV 행을 인코딩/구분자 감지 후 하나씩 돌려준다."""
+    from emergency.transport_io import sniff_encoding, sniff_separator
+
+    with open(path, "rb") as f:
+        sample = f.read(64 * 1024)
+    encoding = sniff_encoding(sample)
+    sep = sniff_separator(sample.decode(encoding, errors="ignore"))
+    with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+        yield from csv.reader(f, delimiter=sep)
+
+
+def load_sos_json(path):
+    """SOS JSON 파일을 long-format 테이블로 로드한다."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    return parse_sos_records(raw)
+
+
+def load_sos_file(path, sheet=None):
+    """SOS 통계 파일을 형식에 맞게 읽어 long-format 테이블로 로드한다.
+
+    반환값: (테이블, 형식 문자열 'xlsx' | 'json' | 'csv')
+    """
+    file_format = detect_sos_format(path)
+    if file_format == "json":
+        return load_sos_json(path), file_format
+    rows = iter_xlsx_rows(path, sheet) if file_format == "xlsx" else iter_csv_rows(path)
+    return parse_sos_rows(rows), file_format
+
+
+def available_years(table):
+    return sorted(table[YEAR_COL].unique().tolist(), reverse=True)
+
+
+def wide_view(table, year, periods, include_total=False):
+    """특정 연도의 지역 x 기간 표 (기존 화면에서 쓰던 '시도' + 기간 컬럼 형태)."""
+    subset = table[(table[YEAR_COL] == year) & table[PERIOD_COL].isin(periods)]
+    if not include_total:
+        subset = subset[subset[REGION_COL] != TOTAL_REGION]
+    wide = subset.pivot_table(index=REGION_COL, columns=PERIOD_COL, values=VALUE_COL,
+                              aggfunc="sum", observed=True, sort=True)
+    wide = wide.reindex(columns=[p for p in periods if p in wide.columns])
+    wide = wide.dropna(how="all").fillna(0).astype("int64")
+    wide.columns = wide.columns.astype(str)
+    wide.columns.name = None
+    return wide.reset_index().assign(**{REGION_COL: lambda d: d[REGION_COL].astype(str)})
+
+
+def time_view(table, year):
+    return wide_view(table, year, TIME_PERIODS)
+
+
+def month_view(table, year):
+    return wide_view(table, year, MONTH_PERIODS)
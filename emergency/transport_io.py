@@ -0,0 +1,143 @@
+# -------------------------------
+# 응급환자이송업 CSV 로더 (형식 1회 감지 + 컬럼형 캐시)
+# -------------------------------
+# 파일 앞부분 바이트 샘플로 인코딩과 구분자를 한 번만 감지한 뒤 C 엔진으로 한 번에 파싱하고,
+# 날짜 / EPSG 좌표 / 구급차 대수 등은 로드 단계에서 바로 타입을 지정한다.
+# 파싱 결과는 원본 파일 내용 해시를 키로 Parquet 파일에 저장하여 다음 실행부터는 캐시를 바로 읽는다.
+import csv
+import hashlib
+import os
+
+import pandas as pd
+
+DEFAULT_TRANSPORT_CACHE_DIR = os.path.join(".cache", "transport")
+# 파싱 규칙이 바뀌면 올려서 기존 캐시를 무효화
+TRANSPORT_LOADER_VERSION = 1
+
+_SAMPLE_BYTES = 64 * 1024
+_CANDIDATE_SEPS = [",", ";", "\t", "|"]
+
+# 로드 시점에 타입을 지정할 컬럼
+_FLOAT_COLS = ["좌표정보x(epsg5174)", "좌표정보y(epsg5174)", "소재지면적"]
+_COUNT_COLS = ["구급차특수", "구급차일반", "의료인수", "입원실수", "병상수", "총인원", "구조사수", "허가병상수"]
+# 앞자리 0 이나 18자리 번호가 숫자 변환으로 깨지지 않도록 문자열로 유지
+_STRING_COLS = ["관리번호", "소재지전화", "소재지우편번호", "도로명우편번호", "개방자치단체코드"]
+_DATE_COLS = ["인허가일자", "인허가취소일자", "폐업일자", "휴업시작일자", "휴업종료일자", "재개업일자",
+              "지정취소일자", "최초지정일자"]
+_DATETIME_COLS = ["최종수정시점", "데이터갱신일자"]
+_CATEGORY_COLS = ["개방서비스명", "개방서비스아이디", "영업상태명", "상세영업상태명", "데이터갱신구분"]
+
+
+def file_content_hash(path, chunk_size=1024 * 1024):
+    """파일 내용의 SHA-256 해시 (스트리밍으로 계산)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sniff_encoding(sample):
+    """바이트 샘플로 인코딩을 추정한다. (BOM -> UTF-8 검증 -> chardet 순)"""
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return "utf-8-sig"
+    try:
+        # 샘플 끝에서 잘린 멀티바이트 문자는 무시하고 검증
+        sample.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        if e.start >= len(sample) - 3:
+            return "utf-8"
+    import chardet
+
+    detected = (chardet.detect(sample).get("encoding") or "cp949").lower()
+    # EUC-KR 로 감지되어도 확장 완성형 문자가 섞일 수 있으므로 상위 호환인 cp949 사용
+    if detected in ("euc-kr", "euc_kr", "ks_c_5601-1987", "iso-2022-kr"):
+        return "cp949"
+    return detected
+
+
+def sniff_separator(text):
+    """디코딩된 샘플 텍스트로 구분자를 추정한다."""
+    lines = [line for line in text.splitlines()[:50] if line.strip()]
+    if not lines:
+        return ","
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters="".join(_CANDIDATE_SEPS)).delimiter
+    except csv.Error:
+        # 줄마다 개수가 가장 일정하게 많이 나오는 후보를 선택
+        def score(sep):
+            counts = [line.count(sep) for line in lines]
+            return min(counts) if min(counts) > 0 else 0
+        return max(_CANDIDATE_SEPS, key=score)
+
+
+def sniff_format(path):
+    """(인코딩, 구분자)를 파일 앞부분 샘플 한 번으로 감지한다."""
+    with open(path, "rb") as f:
+        sample = f.read(_SAMPLE_BYTES)
+    encoding = sniff_encoding(sample)
+    text = sample.decode(encoding, errors="ignore")
+    return encoding, sniff_separator(text)
+
+
+def _apply_types(df):
+    for col in _FLOAT_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    for col in _COUNT_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int32")
+    # 값이 모두 비어 있는 날짜 컬럼도 캐시 왕복 후 같은 타입이 되도록 단위를 통일
+    for col in _DATE_COLS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="%Y-%m-%d").astype("datetime64[us]")
+    for col in _DATETIME_COLS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed").astype("datetime64[us]")
+    for col in _CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def parse_transport_csv(path, encoding, sep):
+    """감지된 형식으로 CSV를 한 번 파싱하고 컬럼 타입을 지정한다."""
+    with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+        header = next(csv.reader(f, delimiter=sep), [])
+    dtype = {col: "string" for col in _STRING_COLS if col in header}
+    # '관리번호' 처럼 지수 표기('2.00063E+17')로 저장된 값도 그대로 문자열로 보존됨
+    df = pd.read_csv(path, encoding=encoding, sep=sep, engine="c", dtype=dtype,
+                     on_bad_lines="skip", encoding_errors="replace", low_memory=False)
+    return _apply_types(df)
+
+
+def _columnar_cache_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_transport_csv(path, cache_dir=DEFAULT_TRANSPORT_CACHE_DIR):
+    """이송업 CSV를 로드한다. 내용 해시가 같은 Parquet 캐시가 있으면 그것을 읽는다.
+
+    반환값: (데이터프레임, 정보 사전 {"source": "cache"|"csv", "encoding", "sep", "content_hash"})
+    """
+    content_hash = file_content_hash(path)
+    use_cache = cache_dir is not None and _columnar_cache_available()
+    cache_path = os.path.join(cache_dir, f"v{TRANSPORT_LOADER_VERSION}_{content_hash[:32]}.parquet") if use_cache else None
+
+    if cache_path and os.path.exists(cache_path):
+        df = pd.read_parquet(cache_path)
+        return df, {"source": "cache", "encoding": None, "sep": None, "content_hash": content_hash}
+
+    encoding, sep = sniff_format(path)
+    df = parse_transport_csv(path, encoding, sep)
+    if cache_path and not df.empty:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    return df, {"source": "csv", "encoding": encoding, "sep": sep, "content_hash": content_hash}
@@ -0,0 +1,165 @@
+# -------------------------------
+# 이송업 자료 전처리 파이프라인 (단계별 캐시 + 행 단위 증분 계산)
+# -------------------------------
+# 로드 -> 시도/시군구 판별 -> EPSG:5174 좌표 변환 -> 지오코딩 보완 -> 유효 행 선택 순서로 처리한다.
+# - 로드: 파일 (수정 시각, 크기)가 같으면 다시 읽지 않고, 내용이 바뀐 경우에도 내용 해시별 Parquet 캐시를 사용
+# - 파일 내용 해시가 지난 실행과 같으면 전처리 결과를 그대로 반환 (위젯 조작으로 인한 재실행은 여기서 끝남)
+# - 각 변환 단계는 입력 컬럼의 행 해시 -> 결과 메모를 유지하여, 행 일부가 바뀌면 바뀐 행만 다시 계산
+# 반환되는 데이터프레임은 여러 세션이 공유하므로 호출 측에서 수정하지 않는다.
+import os
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from emergency.coords import EPSG5174_X_COL, EPSG5174_Y_COL, LAT_COL, LON_COL, epsg5174_coordinates
+from emergency.regions import SIDO_COL, SIDO_NAMES, SIGUNGU_COL, resolve_regions
+from emergency.transport_io import DEFAULT_TRANSPORT_CACHE_DIR, load_transport_csv
+
+ADDRESS_COL = "소재지전체주소"
+
+
+def file_signature(path):
+    """파일 내용 해시를 계산하지 않고 변경 여부를 판단하기 위한 (수정 시각, 크기)."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def row_hashes(df, columns):
+    """지정한 컬럼 값만으로 계산한 행별 64비트 해시 (인덱스는 포함하지 않음)."""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+class RowMemo:
+    """행 해시 -> 단계 결과 메모. 처음 보는 해시의 행만 계산 함수에 넘긴다.
+
+    메모는 마지막 입력에 있던 해시만 남겨 두므로 메모리 사용량은 자료 한 벌 크기를 넘지 않는다.
+    keep_missing=False 이면 결과가 모두 비어 있는 행은 메모하지 않아 다음 입력에서 다시 계산한다.
+    """
+
+    def __init__(self, output_columns, keep_missing=True):
+        self.output_columns = list(output_columns)
+        self.keep_missing = keep_missing
+        self._table = pd.DataFrame(columns=self.output_columns, index=pd.Index([], dtype="uint64"))
+
+    def apply(self, keys, compute):
+        """keys: 행별 해시 배열. compute(위치 배열) -> 해당 행들의 결과 데이터프레임.
+
+        반환값: (행 순서대로 정렬된 결과 데이터프레임(RangeIndex), 새로 계산한 고유 행 수)
+        """
+        unique_keys, first_positions, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        known = self._table.index.get_indexer(unique_keys)
+        new = known < 0
+        parts = [self._table.iloc[known[~new]]]
+        if new.any():
+            computed = compute(first_positions[new])
+            parts.append(pd.DataFrame({col: computed[col].to_numpy(dtype=object) for col in self.output_columns},
+                                      index=unique_keys[new]))
+        table = pd.concat(parts) if len(parts) > 1 else parts[0]
+        table = table.reindex(unique_keys)
+        self._table = table if self.keep_missing else table.dropna(how="all")
+        return table.iloc[inverse.ravel()].reset_index(drop=True), int(new.sum())
+
+
+class TransportPipeline:
+    """이송업 CSV 한 개에 대한 전처리 파이프라인. 여러 세션이 공유해도 되도록 실행은 직렬화된다."""
+
+    def __init__(self, cache_dir=DEFAULT_TRANSPORT_CACHE_DIR, geocode_cache=None):
+        self.cache_dir = cache_dir
+        self.geocode_cache = geocode_cache
+        self._lock = threading.Lock()
+        self._loaded = None  # (경로, 파일 서명, 원본 데이터프레임, 로드 정보)
+        self._result = None  # (내용 해시, 결과 데이터프레임, 보고서)
+        self._regions = RowMemo([SIDO_COL, SIGUNGU_COL])
+        self._coordinates = RowMemo([LAT_COL, LON_COL])
+        # 일시적 조회 실패로 비어 있는 결과는 메모하지 않음 (찾지 못한 주소는 지오코딩 캐시가 기억)
+        self._geocoded = RowMemo([LAT_COL, LON_COL], keep_missing=False)
+
+    def load(self, path):
+        """원본 데이터프레임과 로드 정보. 파일 서명이 같으면 메모리에 있는 것을 그대로 반환한다."""
+        signature = file_signature(path)
+        if self._loaded and self._loaded[:2] == (path, signature):
+            return self._loaded[2], {**self._loaded[3], "source": "memory"}
+        df, load_info = load_transport_csv(path, cache_dir=self.cache_dir)
+        self._loaded = (path, signature, df, load_info)
+        return df, load_info
+
+    def run(self, path, progress_callback=None, recorder=None):
+        """전처리된 데이터프레임과 보고서 사전을 반환한다.
+
+        recorder(emergency.diagnostics.StageRecorder)를 넘기면 실제로 실행된 단계의 소요 시간을 기록한다.
+
+        보고서: load(로드 정보), rows_loaded, has_address, epsg_converted, geocode_needed, geocoded,
+        dropped_no_coords, dropped_no_sido, recomputed({단계: 새로 계산한 고유 행 수}), reused(전처리 결과 재사용 여부)
+        """
+        stage = recorder.stage if recorder is not None else (lambda name, **fields: nullcontext({}))
+        with self._lock:
+            with stage("transport_load") as stage_info:
+                raw, load_info = self.load(path)
+                stage_info["source"] = load_info["source"]
+            content_hash = load_info["content_hash"]
+            if self._result and self._result[0] == content_hash:
+                return self._result[1], {**self._result[2], "load": load_info, "reused": True}
+            df, report = self._process(raw, progress_callback, stage)
+            report["load"] = load_info
+            self._result = (content_hash, df, report)
+            return df, {**report, "reused": False}
+
+    def _process(self, raw, progress_callback, stage):
+        report = {"rows_loaded": len(raw), "has_address": ADDRESS_COL in raw.columns, "epsg_converted": 0,
+                  "geocode_needed": 0, "geocoded": 0, "dropped_no_coords": 0, "dropped_no_sido": 0, "recomputed": {}}
+        if raw.empty or not report["has_address"]:
+            return raw, report
+
+        df = raw.reset_index(drop=True)
+        addresses = df[ADDRESS_COL]
+        address_keys = row_hashes(df, [ADDRESS_COL])
+
+        # 1. 시도/시군구 판별 (주소가 같은 행은 같은 결과)
+        with stage("region_resolve", rows=len(df)):
+            regions, report["recomputed"]["regions"] = self._regions.apply(
+                address_keys, lambda positions: resolve_regions(addresses.iloc[positions]))
+
+        # 2. EPSG:5174 -> WGS84 (좌표 값이 같은 행은 같은 결과)
+        if EPSG5174_X_COL in df.columns and EPSG5174_Y_COL in df.columns:
+            xy = df[[EPSG5174_X_COL, EPSG5174_Y_COL]]
+            with stage("coordinates_epsg5174", rows=len(df)):
+                coordinates, report["recomputed"]["coordinates"] = self._coordinates.apply(
+                    row_hashes(df, [EPSG5174_X_COL, EPSG5174_Y_COL]),
+                    lambda positions: epsg5174_coordinates(xy.iloc[positions]))
+            # 지오코딩 결과를 채워 넣을 수 있도록 쓰기 가능한 복사본으로 만듦
+            lat = np.array(coordinates[LAT_COL], dtype=np.float64)
+            lon = np.array(coordinates[LON_COL], dtype=np.float64)
+        else:
+            lat = np.full(len(df), np.nan)
+            lon = np.full(len(df), np.nan)
+        missing = np.isnan(lat) | np.isnan(lon)
+        report["epsg_converted"] = int((~missing).sum())
+
+        # 3. 좌표가 없는 행만 주소 지오코딩으로 보완 (처음 보는 주소만 지오코딩 캐시에 질의)
+        fallback = np.flatnonzero(missing & addresses.notna().to_numpy())
+        report["geocode_needed"] = len(fallback)
+        if len(fallback) > 0 and self.geocode_cache is not None:
+            def geocode(positions):
+                latitudes, longitudes = self.geocode_cache.resolve_many(
+                    addresses.iloc[fallback[positions]], progress_callback=progress_callback)
+                return pd.DataFrame({LAT_COL: latitudes, LON_COL: longitudes})
+
+            with stage("coordinates_geocode", rows=len(fallback)):
+                geocoded, report["recomputed"]["geocode"] = self._geocoded.apply(address_keys[fallback], geocode)
+            lat[fallback] = pd.to_numeric(geocoded[LAT_COL], errors="coerce").to_numpy(dtype=np.float64)
+            lon[fallback] = pd.to_numeric(geocoded[LON_COL], errors="coerce").to_numpy(dtype=np.float64)
+            report["geocoded"] = int((~(np.isnan(lat[fallback]) | np.isnan(lon[fallback]))).sum())
+
+        # 4. 결과 조립 및 유효 행 선택 (좌표가 있고 시도가 판별된 행)
+        df[SIDO_COL] = pd.Categorical(regions[SIDO_COL].where(regions[SIDO_COL].notna(), None), categories=SIDO_NAMES)
+        sigungu = regions[SIGUNGU_COL].where(regions[SIGUNGU_COL].notna(), None)
+        df[SIGUNGU_COL] = pd.Categorical(sigungu, categories=sorted(sigungu.dropna().unique().tolist()))
+        df[LAT_COL] = lat
+        df[LON_COL] = lon
+        has_coords = ~(np.isnan(lat) | np.isnan(lon))
+        has_sido = df[SIDO_COL].notna().to_numpy()
+        report["dropped_no_coords"] = int((~has_coords).sum())
+        report["dropped_no_sido"] = int((has_coords & ~has_sido).sum())
+        return df[has_coords & has_sido].reset_index(drop=True), report
@@ -0,0 +1,114 @@
+# -------------------------------
+# 간이 진단서 응급도 채점 (표 기반, 일괄 처리)
+# -------------------------------
+# 문항별 응답 -> 점수, 총점 -> 중증도 구간, 중증도 -> 최종 응급도 점수를 모두 표로 정의하고,
+# 진단서 여러 건(데이터프레임 / CSV)을 문항별 범주 코드 + NumPy 배열 조회로 한 번에 채점한다.
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from emergency.triage_queue import QUEUE_FIFO
+
+# 중증도 맵핑 (점수가 높을수록 응급도 높음)
+SEVERITY_SCORES = {
+    "경증": 1,
+    "중등증": 3,
+    "중증": 5,
+    "응급": 10,
+    "매우_응급": 20,
+}
+
+# 문항(진단서 컬럼) -> (화면 질문, {응답: 점수}). 첫 번째 응답은 정상 소견(0점)이며 응답이 비어 있으면 이 값으로 본다.
+TRIAGE_QUESTIONS = {
+    "의식 상태": ("1. 의식 상태", {"명료": 0, "기면 (졸림)": 3, "혼미 (자극에 반응)": 7, "혼수 (자극에 무반응)": 15}),
+    "호흡 곤란": ("2. 호흡 곤란 여부", {"없음": 0, "가벼운 곤란": 4, "중간 곤란": 9, "심한 곤란": 20}),
+    "통증/출혈": ("3. 주요 통증/출혈 정도", {"없음": 0, "경미": 2, "중간": 6, "심함": 12}),
+    "외상": ("4. 외상 여부", {"없음": 0, "찰과상/멍": 3, "열상/골절 의심": 8, "다발성 외상/심각한 출혈": 18}),
+}
+
+# 총점 하한 -> 중증도 (오름차순)
+SEVERITY_THRESHOLDS = [
+    (0, "경증"),
+    (3, "중등증"),
+    (10, "중증"),
+    (20, "응급"),
+    (35, "매우_응급"),
+]
+
+NAME_COL = "이름"
+RAW_SCORE_COL = "진단 점수"
+LEVEL_COL = "중증도"
+PRIORITY_COL = "계산된 점수"
+
+
+def _answer_points(answers, question, options):
+    codes = pd.Categorical(answers, categories=list(options)).codes
+    invalid = (codes < 0) & answers.notna().to_numpy()
+    if invalid.any():
+        bad = sorted(set(answers[invalid].astype(str)))
+        raise ValueError(f"'{question}' 문항에 알 수 없는 응답이 있습니다: {', '.join(bad[:5])}")
+    points = np.array(list(options.values()), dtype=np.int32)
+    # 빈 응답(-1 코드)은 첫 번째(정상) 응답으로 처리
+    return points[np.maximum(codes, 0)]
+
+
+def score_assessments(assessments, questions=TRIAGE_QUESTIONS, thresholds=SEVERITY_THRESHOLDS,
+                      severity_scores=SEVERITY_SCORES):
+    """진단서 데이터프레임 전체를 채점하여 진단 점수 / 중증도 / 계산된 점수 컬럼을 붙인 복사본을 반환한다."""
+    missing = [col for col in questions if col not in assessments.columns]
+    if missing:
+        raise ValueError(f"진단서에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+
+    raw = np.zeros(len(assessments), dtype=np.int32)
+    for col, (question, options) in questions.items():
+        raw += _answer_points(assessments[col], question, options)
+
+    bounds = np.array([lower for lower, _ in thresholds])
+    levels = [level for _, level in thresholds]
+    level_codes = np.searchsorted(bounds, raw, side="right") - 1
+    priorities = np.array([severity_scores.get(level, 1) for level in levels], dtype=np.int32)
+
+    result = assessments.copy()
+    result[RAW_SCORE_COL] = raw
+    result[LEVEL_COL] = pd.Categorical.from_codes(level_codes, categories=levels, ordered=True)
+    result[PRIORITY_COL] = priorities[level_codes]
+    return result
+
+
+def score_assessment(answers, **kwargs):
+    """진단서 한 건({문항: 응답})을 채점하여 (진단 점수, 중증도, 계산된 점수)를 반환한다."""
+    row = score_assessments(pd.DataFrame([answers]), **kwargs).iloc[0]
+    return int(row[RAW_SCORE_COL]), row[LEVEL_COL], int(row[PRIORITY_COL])
+
+
+def read_assessments_csv(source):
+    """진단서 CSV(파일 경로 또는 바이트/파일 객체)를 인코딩/구분자 감지 후 문자열 컬럼으로 읽는다."""
+    from emergency.transport_io import sniff_encoding, sniff_separator
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source if isinstance(source, bytes) else source.read()
+    encoding = sniff_encoding(data[:64 * 1024])
+    sep = sniff_separator(data[:64 * 1024].decode(encoding, errors="ignore"))
+    return pd.read_csv(io.BytesIO(data), encoding=encoding, sep=sep, dtype=str, keep_default_na=True)
+
+
+def enqueue_scored(store, scored, queue_type=QUEUE_FIFO):
+    """채점된 진단서를 대기열 저장소에 한 번에 추가하고 환자 ID 목록을 반환한다."""
+    info_cols = [NAME_COL, LEVEL_COL, *TRIAGE_QUESTIONS, PRIORITY_COL]
+    frame = scored.copy()
+    if NAME_COL not in frame.columns:
+        frame[NAME_COL] = [f"환자 {i + 1}" for i in range(len(frame))]
+    frame[LEVEL_COL] = frame[LEVEL_COL].astype(str)
+    frame[PRIORITY_COL] = frame[PRIORITY_COL].astype(int)
+    for col in TRIAGE_QUESTIONS:
+        # 빈 응답은 채점과 같은 기준(정상 소견)으로 기록
+        frame[col] = frame[col].fillna(next(iter(TRIAGE_QUESTIONS[col][1])))
+    # DataFrame.to_dict("records") 보다 컬럼 리스트를 zip 하는 편이 수만 건에서 훨씬 빠름
+    columns = [frame[col].tolist() for col in info_cols]
+    records = [dict(zip(info_cols, values)) for values in zip(*columns)]
+    return store.insert_many(records, columns[-1], queue_type=queue_type)
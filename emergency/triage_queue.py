@@ -0,0 +1,215 @@
+# -------------------------------
+# 응급 대기열: 환자 ID 로 색인된 이진 힙
+# -------------------------------
+# 힙 배열과 함께 환자 ID -> 힙 위치 사전을 유지하므로 재분류(우선순위 변경)와 중간 이탈(귀가/전원)을
+# O(log n) 에 처리할 수 있다. 화면에 보여줄 대기 순서는 힙과 같은 키를 담은 SortedList 로 함께 유지하므로
+# 삽입/삭제마다 O(log n) 으로 갱신되고, 대기 목록을 그릴 때 전체 정렬을 다시 하지 않는다.
+#
+# 대기 보정(aging): 유효 점수 = 응급도 점수 + aging_rate * 대기 시간(분).
+# 모든 환자에게 같은 비율을 적용하면 두 환자의 유효 점수 차이는 시간이 지나도 변하지 않으므로,
+# '응급도 점수 - aging_rate * 도착 시각(분)' 을 고정 키로 쓰면 시간이 흘러도 힙을 다시 만들 필요가 없다.
+import heapq
+import itertools
+import math
+import time
+
+from sortedcontainers import SortedList
+
+QUEUE_FIFO = "큐 (선입선출)"
+QUEUE_LIFO = "스택 (후입선출)"
+
+
+class IndexedPriorityQueue:
+    def __init__(self, aging_rate=0.0, clock=time.time):
+        self.aging_rate = float(aging_rate)  # 대기 1분당 더해지는 점수
+        self.clock = clock
+        self._heap = []  # 힙 배열: 정렬 키 튜플
+        self._pos = {}  # 환자 ID -> 힙 위치
+        self._entries = {}  # 환자 ID -> {"info", "score", "arrival", "tie"}
+        self._counter = itertools.count()
+        self._ordered = SortedList()  # 대기 순서대로 정렬된 정렬 키 (힙과 같은 키)
+
+    # --- 정렬 키 ---
+    def _key(self, patient_id):
+        entry = self._entries[patient_id]
+        # 최소 힙: 유효 점수가 높을수록, 그다음 tie 값이 작을수록 앞
+        return (-(entry["score"] - self.aging_rate * entry["arrival"] / 60.0), entry["tie"], patient_id)
+
+    # --- 힙 내부 연산 ---
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][2]] = i
+        self._pos[heap[j][2]] = j
+
+    def _sift_up(self, i):
+        while i > 0:
+            parent = (i - 1) // 2
+            if self._heap[i] >= self._heap[parent]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        n = len(self._heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self._heap[child] < self._heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
+
+    def _heap_remove(self, patient_id):
+        i = self._pos.pop(patient_id)
+        self._ordered.remove(self._heap[i])
+        last = self._heap.pop()
+        if i < len(self._heap):
+            self._heap[i] = last
+            self._pos[last[2]] = i
+            self._sift_up(i)
+            self._sift_down(self._pos[last[2]])
+
+    def _heap_push(self, patient_id):
+        key = self._key(patient_id)
+        self._heap.append(key)
+        self._ordered.add(key)
+        self._pos[patient_id] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def _rebuild(self, keys):
+        # 키 목록으로 힙을 O(n) 에 다시 구성 (정렬된 보기는 호출한 쪽에서 갱신)
+        heapq.heapify(keys)
+        self._heap = keys
+        self._pos = {key[2]: i for i, key in enumerate(keys)}
+
+    # --- 공개 API ---
+    def insert(self, patient_info, priority_score, queue_type=QUEUE_FIFO, patient_id=None):
+        """환자를 대기열에 추가하고 환자 ID 를 반환한다.
+
+        동일 유효 점수 안에서는 queue_type 에 따라 먼저 온 환자(선입선출) 또는 나중에 온 환자(후입선출)가 앞선다.
+        """
+        order = next(self._counter)
+        if patient_id is None:
+            patient_id = f"P{order + 1:05d}"
+        if patient_id in self._entries:
+            raise KeyError(f"이미 대기 중인 환자 ID 입니다: {patient_id}")
+        self._entries[patient_id] = {
+            "info": patient_info,
+            "score": priority_score,
+            "arrival": self.clock(),
+            "tie": -order if queue_type == QUEUE_LIFO else order,
+        }
+        self._heap_push(patient_id)
+        return patient_id
+
+    def insert_many(self, patient_infos, priority_scores, queue_type=QUEUE_FIFO):
+        """여러 환자를 한 번에 추가하고 환자 ID 목록을 반환한다.
+
+        추가할 환자가 많으면 하나씩 sift 하지 않고 키를 붙인 뒤 힙을 한 번에 다시 구성(O(n))한다.
+        정렬된 보기는 어느 경우든 새 키만큼만 갱신한다.
+        """
+        arrival = self.clock()
+        new_entries = {}
+        for info, score in zip(patient_infos, priority_scores):
+            order = next(self._counter)
+            patient_id = f"P{order + 1:05d}"
+            if patient_id in self._entries:
+                raise KeyError(f"이미 대기 중인 환자 ID 입니다: {patient_id}")
+            new_entries[patient_id] = {
+                "info": info,
+                "score": score,
+                "arrival": arrival,
+                "tie": -order if queue_type == QUEUE_LIFO else order,
+            }
+        self._entries.update(new_entries)
+        new_ids = list(new_entries)
+        if len(new_ids) * math.log2(len(self._heap) + 2) < len(self._heap):
+            for patient_id in new_ids:
+                self._heap_push(patient_id)
+        else:
+            new_keys = [self._key(pid) for pid in new_ids]
+            self._ordered.update(new_keys)
+            self._rebuild(self._heap + new_keys)
+        return new_ids
+
+    def update_priority(self, patient_id, priority_score, patient_info=None):
+        """재분류: 대기 중인 환자의 응급도 점수를 바꾼다. (도착 시각과 동점 순서는 유지)"""
+        self._heap_remove(patient_id)
+        entry = self._entries[patient_id]
+        entry["score"] = priority_score
+        if patient_info is not None:
+            entry["info"] = patient_info
+        self._heap_push(patient_id)
+
+    def remove(self, patient_id):
+        """귀가/전원 등으로 대기열을 떠난 환자를 제거하고 (환자 정보, 점수)를 반환한다."""
+        self._heap_remove(patient_id)
+        entry = self._entries.pop(patient_id)
+        return entry["info"], entry["score"]
+
+    def get_highest_priority_patient(self):
+        if not self._heap:
+            return None, None  # 큐가 비어있으면 None 반환
+        return self.remove(self._heap[0][2])
+
+    def peek(self):
+        if not self._heap:
+            return None, None
+        entry = self._entries[self._heap[0][2]]
+        return entry["info"], entry["score"]
+
+    def peek_id(self):
+        return self._heap[0][2] if self._heap else None
+
+    def peek_patient(self, patient_id):
+        entry = self._entries[patient_id]
+        return entry["info"], entry["score"]
+
+    def set_aging_rate(self, aging_rate):
+        """대기 보정 비율을 바꾼다. 모든 키가 바뀌므로 O(n log n) 으로 다시 구성한다."""
+        aging_rate = float(aging_rate)
+        if aging_rate == self.aging_rate:
+            return
+        self.aging_rate = aging_rate
+        keys = [self._key(pid) for pid in self._entries]
+        self._ordered = SortedList(keys)
+        self._rebuild(keys)
+
+    def effective_score(self, patient_id, now=None):
+        entry = self._entries[patient_id]
+        now = self.clock() if now is None else now
+        return entry["score"] + self.aging_rate * (now - entry["arrival"]) / 60.0
+
+    def is_empty(self):
+        return not self._heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._entries
+
+    def patient_ids(self):
+        """대기 순서대로 정렬된 환자 ID 목록."""
+        return [key[2] for key in self._ordered]
+
+    def get_all_patients_sorted(self):
+        # 정렬된 보기를 그대로 순회하므로 추가 정렬 없이 O(n)
+        now = self.clock()
+        sorted_patients = []
+        for _, _, patient_id in self._ordered:
+            entry = self._entries[patient_id]
+            row = {
+                '환자 ID': patient_id,
+                '이름': entry["info"].get('이름', '알 수 없음'),
+                '중증도': entry["info"].get('중증도', '알 수 없음'),
+                '응급도 점수': entry["score"],
+                '대기 시간(분)': round((now - entry["arrival"]) / 60.0, 1),
+            }
+            if self.aging_rate:
+                row['보정 점수'] = round(self.effective_score(patient_id, now), 1)
+            sorted_patients.append(row)
+        return sorted_patients
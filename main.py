@@ -1,240 +1,189 @@
+import time
+script_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import json
-from collections import deque
 import os
-import chardet
-
-# 공간 데이터 및 그래프 처리를 위한 라이브러리
-import networkx as nx
-import osmnx as ox
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter 
 
-# Matplotlib 한글 폰트 설정
-plt.rcParams['font.family'] = 'Malgun Gothic' # Windows 사용자
-# plt.rcParams['font.family'] = 'AppleGothic' # macOS 사용자
-plt.rcParams['axes.unicode_minus'] = False # 마이너스 폰트 깨짐 방지
+# matplotlib / osmnx / networkx / geopy 등 무거운 라이브러리는 해당 화면을 실제로 그릴 때만 import
+from emergency.charts import chart_png, series_chart
+from emergency.coverage import CoverageAnalyzer, anchors_key, node_regions, region_anchors
+from emergency.diagnostics import StageRecorder, read_stage_log
+from emergency.dispatch import (OUTSIDE_GRAPH_COL, build_travel_time_matrix, dispatch_batch, fleet_key, fleet_sizes,
+                                incidents_from_queue, simulate_surge)
+from emergency.ed_simulation import config_from_views, run_replications
+from emergency.eta_index import load_eta_index
+from emergency.geocache import DEFAULT_CACHE_PATH, GeocodeCache, NominatimGeocoder
+from emergency.queue_store import DEFAULT_QUEUE_PATH, SQLiteQueueStore
+from emergency.region_cube import build_month_cube, build_time_cube, sido_counts
+from emergency.road_render import render_road_network_png
+from emergency.road_regions import RoadGraphManager
+from emergency.routing import build_nearest_provider_index, provider_key, select_active_providers
+from emergency.sos_data import available_years, empty_sos_table, load_sos_file, month_view, time_view
+from emergency.transport_pipeline import TransportPipeline
+from emergency.triage import (SEVERITY_SCORES, TRIAGE_QUESTIONS, enqueue_scored, read_assessments_csv,
+                               score_assessment, score_assessments)
 
 st.set_page_config(page_title="응급의료 이송 및 분석 대시보드", layout="wide")
 st.title("🚑 응급환자 이송 및 응급실 이용 분석")
 
+# 이번 실행의 단계별 소요 시간 / 메모리 기록 (사이드바 진단 패널과 .cache/logs 로그 파일에 표시)
+stages = StageRecorder()
+stages.record("imports", time.perf_counter() - script_started)
+
 # -------------------------------
 # 파일 경로
 # -------------------------------
 transport_path = "data/정보_01_행정안전부_응급환자이송업(공공데이터포털).csv"
-time_json_path = "data/정보_SOS_03.json"
-month_json_path = "data/정보_SOS_02.json"
+# 응급실 이용 통계: 원본 통계 파일(확장자는 .csv 이지만 실제로는 XLSX)을 우선 사용하고, 없으면 JSON 내보내기 사용
+time_sos_paths = ["data/정보_03_내원시간별+응급실+이용(시도별).csv", "data/정보_SOS_03.json"]
+month_sos_paths = ["data/정보_02_월별+응급실+이용(시도별).csv", "data/정보_SOS_02.json"]
 
 # -------------------------------
 # 데이터 로딩 함수
 # -------------------------------
-@st.cache_data
-def load_transport_data(path):
-    if not os.path.exists(path):
-        st.error(f"파일을 찾을 수 없습니다: {path}")
-        return pd.DataFrame()
-    
-    try:
-        # 다양한 인코딩과 구분자 시도
-        possible_encodings = ['cp949', 'euc-kr', 'utf-8', 'utf-8-sig'] 
-        possible_seps = [',', ';', '\t', '|']
-
-        df = None
-        for enc in possible_encodings:
-            for sep in possible_seps:
-                try:
-                    df = pd.read_csv(path, encoding=enc, sep=sep, on_bad_lines='skip', engine='python')
-                    # 데이터가 제대로 로드되었는지 확인 (비어있지 않고 컬럼이 충분한지)
-                    if not df.empty and len(df.columns) > 1:
-                        st.info(f"'{path}' 파일을 '{enc}' 인코딩, 구분자 '{sep}'로 성공적으로 로드했습니다.")
-                        return df
-                    else:
-                        continue # 다음 조합 시도
-                except (UnicodeDecodeError, pd.errors.ParserError) as e:
-                    continue # 디코딩 또는 파싱 오류 시 다음 조합 시도
-                except Exception as e:
-                    st.error(f"'{path}' 파일을 여는 중 예상치 못한 오류 발생 (인코딩: {enc}, 구분자: {sep}): {e}")
-                    continue
-        
-        st.error(f"'{path}' 파일을 지원되는 어떤 인코딩/구분자로도 로드할 수 없습니다. 파일 내용을 직접 확인해주세요.")
-        return pd.DataFrame()
-
-    except Exception as e:
-        st.error(f"'{path}' 파일을 로드하는 중 최상위 오류 발생: {e}")
-        return pd.DataFrame()
+def first_existing_path(paths):
+    return next((p for p in paths if os.path.exists(p)), paths[-1])
 
+# SOS 통계 파일(시간대별/월별)을 (분류, 시도, 연도, 기간, 건수) long-format 테이블로 로드하는 함수
+# 파일 형식(XLSX / JSON / CSV)은 확장자가 아니라 파일 앞부분 바이트로 판별
 @st.cache_data
-def load_time_data(path):
+def load_sos_table(path):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            raw = json.load(f)
-        records = raw[4:] # 실제 데이터가 시작하는 부분 (파일 구조에 따라 다름)
-        time_cols = {
-            'col5': '00-03시', 'col6': '03-06시', 'col7': '06-09시', 'col8': '09-12시',
-            'col9': '12-15시', 'col10': '15-18시', 'col11': '18-21시', 'col12': '21-24시'
-        }
-        rows = []
-        for row in records:
-            region = row.get('col3')
-            if region == "전체" or not region: # '전체' 또는 빈 지역명 제외
-                continue
-            values = [int(row.get(c, "0").replace(",", "")) for c in time_cols.keys()]
-            rows.append([region] + values)
-        df = pd.DataFrame(rows, columns=['시도'] + list(time_cols.values()))
-        st.info(f"'{path}' JSON 파일을 성공적으로 로드했습니다.")
-        return df
+        table, file_format = load_sos_file(path)
+        st.info(f"'{path}' 파일을 {file_format.upper()} 형식으로 성공적으로 로드했습니다. (연도: {', '.join(map(str, available_years(table)))})")
+        return table
     except FileNotFoundError:
-        st.error(f"JSON 파일을 찾을 수 없습니다: {path}")
-        return pd.DataFrame()
+        st.error(f"파일을 찾을 수 없습니다: {path}")
+        return empty_sos_table()
     except json.JSONDecodeError as e:
         st.error(f"'{path}' JSON 파일 디코딩 오류: {e}. 파일 내용이 올바른 JSON 형식인지 확인해주세요.")
-        return pd.DataFrame()
+        return empty_sos_table()
     except Exception as e:
-        st.error(f"'{path}' JSON 파일을 로드하는 중 오류 발생: {e}")
-        return pd.DataFrame()
+        st.error(f"'{path}' 파일을 로드하는 중 오류 발생: {e}")
+        return empty_sos_table()
+
+# 특정 연도의 시간대별 / 월별 표 ('시도' + 기간 컬럼)
+def load_time_data(path, year):
+    return time_view(load_sos_table(path), year)
+
+def load_month_data(path, year):
+    return month_view(load_sos_table(path), year)
+
+# 시간대별 / 월별 통계를 (지역, 연도, 기간) 배열로 한 번만 집계 (지역을 바꿔도 배열 조회만 수행)
+@st.cache_resource
+def load_sos_cubes(time_path, month_path):
+    return build_time_cube(load_sos_table(time_path)), build_month_cube(load_sos_table(month_path))
+
+# 시도별 도로망 관리자 (모든 세션이 공유). 로컬 자료(스냅샷 / GraphML / OSM XML)를 백그라운드에서 불러오고
+# ROAD_GRAPH_BUDGET_MB 안에서 최근 사용한 시도만 메모리에 유지. 경기도 전체 자료가 없으면 용인시 스냅샷으로 대신함
+ROAD_GRAPH_BUDGET_MB = 1024
+ROAD_GRAPH_FALLBACK_PLACES = {"경기도": "Yongin-si, Gyeonggi-do, South Korea"}
+
+@st.cache_resource
+def get_road_graph_manager():
+    return RoadGraphManager(byte_budget=ROAD_GRAPH_BUDGET_MB * 2 ** 20, places=ROAD_GRAPH_FALLBACK_PLACES)
+
+# 아래 도로망별 파생 객체는 관리자의 시도 항목에 붙여 캐시하므로 메모리 예산에 포함되고, 시도를 내보내면 함께 사라짐
+# 최근접 이송업체 인덱스 (도로망 fingerprint 또는 이송업체 목록 해시가 바뀌면 다시 계산)
+def get_nearest_provider_index(road_region, road_graph, providers):
+    return get_road_graph_manager().derived(
+        road_region, ("nearest_provider", road_graph.fingerprint, provider_key(providers)),
+        lambda: build_nearest_provider_index(road_graph, providers))
+
+# 구급차 배차용 (이송업체, 도로망 노드) 주행 시간 행렬 (도로망 / 이송업체 목록이 바뀌면 다시 계산)
+# 행렬이 너무 큰 도로망은 CLI 로 미리 만들어 둔 CH 인덱스가 있으면 그것으로 주행 시간을 계산
+def get_travel_time_matrix(road_region, road_graph, transport_df, providers_fingerprint):
+    return get_road_graph_manager().derived(
+        road_region, ("travel_time_matrix", road_graph.fingerprint, providers_fingerprint),
+        lambda: build_travel_time_matrix(road_graph, transport_df, eta_index=load_eta_index(road_graph)))
+
+# 이송업체 커버리지 분석기 (업체별 등시간권은 디스크에 저장되어 변경된 업체만 다시 계산)
+def get_coverage_analyzer(road_region, road_graph):
+    return get_road_graph_manager().derived(
+        road_region, ("coverage_analyzer", road_graph.fingerprint), lambda: CoverageAnalyzer(road_graph))
+
+def get_coverage_report(road_region, road_graph, transport_df):
+    anchors = region_anchors(transport_df)
+
+    def build():
+        analyzer = get_coverage_analyzer(road_region, road_graph)
+        analyzer.update(transport_df)
+        best = analyzer.best_times()
+        regions = node_regions(road_graph, anchors)
+        region_gaps = {minutes: analyzer.region_gaps(minutes, regions, best) for minutes in analyzer.thresholds_min}
+        clusters = {minutes: analyzer.uncovered_clusters(minutes, best) for minutes in analyzer.thresholds_min}
+        return analyzer.coverage_summary(best), region_gaps, clusters
+
+    # 영업 중인 업체 목록, 좌표, 구급차 대수와 시군구 기준점이 같으면 이전 보고서를 그대로 사용
+    providers_fingerprint = fleet_key(select_active_providers(transport_df))
+    return get_road_graph_manager().derived(
+        road_region, ("coverage_report", road_graph.fingerprint, providers_fingerprint, anchors_key(anchors)), build)
+
+# 주소 지오코딩 캐시 (SQLite 영구 캐시 + Nominatim 백엔드, 프로세스 간 재사용)
+@st.cache_resource
+def get_geocode_cache(user_agent="emergency_app"):
+    return GeocodeCache(DEFAULT_CACHE_PATH, geocoder=NominatimGeocoder(user_agent=user_agent), max_workers=2)
+
+# 이송업 자료 전처리 파이프라인 (로드 -> 시도 판별 -> 좌표 변환 -> 지오코딩 보완)
+# 파일 내용이 같으면 이전 결과를 그대로 반환하고, 일부 행만 바뀌면 바뀐 행만 다시 계산 (모든 세션이 공유)
+@st.cache_resource
+def get_transport_pipeline():
+    return TransportPipeline(geocode_cache=get_geocode_cache())
 
-@st.cache_data
-def load_month_data(path):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            raw = json.load(f)
-        records = raw[4:] # 실제 데이터가 시작하는 부분
-        month_cols = {
-            'col7': '1월', 'col8': '2월', 'col9': '3월', 'col10': '4월',
-            'col11': '5월', 'col12': '6월', 'col13': '7월', 'col14': '8월',
-            'col15': '9월', 'col16': '10월', 'col17': '11월', 'col18': '12월'
-        }
-        rows = []
-        for row in records:
-            region = row.get('col3')
-            if region == "전체" or not region: # '전체' 또는 빈 지역명 제외
-                continue
-            values = [int(row.get(c, "0").replace(",", "")) for c in month_cols.keys()]
-            rows.append([region] + values)
-        df = pd.DataFrame(rows, columns=['시도'] + list(month_cols.values()))
-        st.info(f"'{path}' JSON 파일을 성공적으로 로드했습니다.")
-        return df
-    except FileNotFoundError:
-        st.error(f"JSON 파일을 찾을 수 없습니다: {path}")
-        return pd.DataFrame()
-    except json.JSONDecodeError as e:
-        st.error(f"'{path}' JSON 파일 디코딩 오류: {e}. 파일 내용이 올바른 JSON 형식인지 확인해주세요.")
-        return pd.DataFrame()
-    except Exception as e:
-        st.error(f"'{path}' JSON 파일을 로드하는 중 오류 발생: {e}")
+def load_transport_data(path):
+    if not os.path.exists(path):
+        st.error(f"파일을 찾을 수 없습니다: {path}")
         return pd.DataFrame()
 
-# osmnx를 사용하여 도로망 그래프를 로드하고 networkx 그래프로 반환하는 함수
-@st.cache_data
-def load_road_network_from_osmnx(place_name):
-    try:
-        st.info(f"'{place_name}' 지역의 도로망 데이터를 OpenStreetMap에서 가져오는 중입니다. 잠시 기다려주세요...")
-        G = ox.graph_from_place(place_name, network_type='drive', simplify=True, retain_all=True)
-        st.success(f"'{place_name}' 도로망을 NetworkX 그래프로 변환했습니다. 노드 수: {G.number_of_nodes()}, 간선 수: {G.number_of_edges()}")
-        return G
-
-    except Exception as e:
-        st.error(f"'{place_name}' 도로망 데이터를 OpenStreetMap에서 가져오고 그래프로 변환하는 중 오류 발생: {e}")
-        st.warning("네트워크 연결을 확인하거나, 지역 이름이 정확한지 확인해주세요. 너무 큰 지역을 지정하면 메모리 부족이나 타임아웃이 발생할 수 있습니다.")
-        return None
-
-# Geopy를 이용한 주소 지오코딩 함수
-@st.cache_data
-def geocode_address(address, user_agent="emergency_app"):
-    geolocator = Nominatim(user_agent=user_agent)
-    # Nominatim 정책에 따라 요청 간 최소 1초 지연 권장
-    geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1) 
+    # 지오코딩 진행 표시줄은 실제로 새 주소를 조회할 때만 만듦
+    progress = {}
+    def show_progress(done, total):
+        if "bar" not in progress:
+            st.info(f"좌표 정보가 없는 주소 중 캐시에 없는 {total}개를 위도/경도로 변환 중입니다.")
+            progress["bar"] = st.progress(0)
+        progress["bar"].progress(done / total)
 
     try:
-        if pd.isna(address) or not isinstance(address, str) or not address.strip():
-            return None, None # 유효하지 않은 주소는 None 반환
-        
-        location = geocode(address)
-        if location:
-            return location.latitude, location.longitude
-        else:
-            return None, None
+        df, report = get_transport_pipeline().run(path, progress_callback=show_progress, recorder=stages)
     except Exception as e:
-        # 지오코딩 실패 시 오류 메시지 출력 (디버깅용, 실제 앱에서는 주석 처리 권장)
-        # st.warning(f"주소 '{address}' 지오코딩 실패: {e}") 
-        return None, None
+        st.error(f"'{path}' 파일을 로드하는 중 최상위 오류 발생: {e}")
+        return pd.DataFrame()
+    if "bar" in progress:
+        progress["bar"].empty()
+        st.success("주소 지오코딩이 완료되었습니다.")
 
-# -------------------------------
-# 중증도 맵핑 정의 (점수가 높을수록 응급도 높음)
-# -------------------------------
-severity_scores = {
-    "경증": 1,
-    "중등증": 3,
-    "중증": 5,
-    "응급": 10,
-    "매우_응급": 20 
-}
+    load_info = report["load"]
+    if report["rows_loaded"] == 0 or len(df.columns) <= 1:
+        st.error(f"'{path}' 파일을 지원되는 어떤 인코딩/구분자로도 로드할 수 없습니다. 파일 내용을 직접 확인해주세요.")
+        return pd.DataFrame()
+    # 메모리에 있는 자료를 그대로 사용한 재실행("memory")에서는 로드 안내를 생략
+    if load_info["source"] == "cache":
+        st.info(f"'{path}' 파일을 컬럼형 캐시에서 로드했습니다.")
+    elif load_info["source"] == "csv":
+        st.info(f"'{path}' 파일을 '{load_info['encoding']}' 인코딩, 구분자 '{load_info['sep']}'로 성공적으로 로드했습니다.")
+
+    if not report["has_address"]:
+        st.warning("'transport_df'에 '소재지전체주소' 컬럼이 없습니다. '시도명' 생성을 건너킵니다.")
+    elif not report["reused"]:
+        st.info(f"EPSG:5174 좌표로 {report['epsg_converted']}개 이송 기록의 위도/경도를 변환했습니다. "
+                f"(주소 지오코딩 보완: {report['geocoded']}/{report['geocode_needed']}개)")
+        st.info(f"유효한 좌표가 없는 {report['dropped_no_coords']}개, 시도를 판별하지 못한 {report['dropped_no_sido']}개의 이송 기록이 제거되었습니다.")
+    return df
 
 # -------------------------------
-# 우선순위 큐 클래스 (힙 구현)
+# 중증도 맵핑 정의 (점수가 높을수록 응급도 높음)
 # -------------------------------
-import heapq
+# 진단서 문항별 점수 / 중증도 구간 표는 emergency.triage 에 정의
+severity_scores = SEVERITY_SCORES
 
-class PriorityQueue:
-    def __init__(self):
-        self.heap = [] # (우선순위 점수, 삽입 순서, 환자 정보) 튜플 저장
-        self.counter = 0 # 삽입 순서 (동일 우선순위 내 선입선출/후입선출 보장용)
+# 응급 대기열은 모든 세션이 공유하는 SQLite 저장소에 두고, 현재 진료중인 환자 정보만 세션별로 저장
+@st.cache_resource
+def get_queue_store(path=DEFAULT_QUEUE_PATH):
+    return SQLiteQueueStore(path)
 
-    def insert(self, patient_info, priority_score, queue_type="큐 (선입선출)"):
-        # heapq는 최소 힙이므로, 높은 응급도를 높은 숫자로 정의했다면
-        # 음수로 변환하여 저장하면 가장 높은 응급도(큰 양수)가 가장 작은 음수가 되어 최상위로 옴
-        adjusted_score = -priority_score
-        
-        if queue_type == "큐 (선입선출)":
-            # 점수가 같으면 먼저 들어온 (counter가 작은) 항목이 우선
-            entry = [adjusted_score, self.counter, patient_info]
-        elif queue_type == "스택 (후입선출)":
-            # 점수가 같으면 나중에 들어온 (counter가 큰) 항목의 음수 값이 더 작아지므로 우선
-            entry = [adjusted_score, -self.counter, patient_info]
-        else:
-            # 기본값은 선입선출 (혹시 모를 오류 방지)
-            entry = [adjusted_score, self.counter, patient_info]
-
-        heapq.heappush(self.heap, entry)
-        self.counter += 1 
-
-    def get_highest_priority_patient(self):
-        if not self.heap:
-            return None, None  # 큐가 비어있으면 None 반환
-        adjusted_score, _, patient_info = heapq.heappop(self.heap)
-        original_score = -adjusted_score # 원래의 양수 점수로 변환
-        return patient_info, original_score
-
-    def is_empty(self):
-        return not bool(self.heap)
-
-    def peek(self):
-        if not self.heap:
-            return None, None
-        adjusted_score, _, patient_info = self.heap[0]
-        original_score = -adjusted_score
-        return patient_info, original_score
-        
-    def get_all_patients_sorted(self):
-        # 현재 힙의 모든 항목을 복사하여 정렬된 형태로 반환 (실제 힙 변경 없음)
-        # 힙은 내부적으로 순서가 보장되지만, 전체 리스트로 볼 때는 정렬이 필요
-        # 튜플의 첫 번째 요소(우선순위 점수), 두 번째 요소(삽입 순서) 순으로 정렬됨
-        temp_heap = sorted(self.heap) 
-        sorted_patients = []
-        for adjusted_score, _, patient_info in temp_heap:
-            sorted_patients.append({
-                '이름': patient_info.get('이름', '알 수 없음'),
-                '중증도': patient_info.get('중증도', '알 수 없음'),
-                '응급도 점수': -adjusted_score
-            })
-        return sorted_patients
-
-# Streamlit session_state에 우선순위 큐 인스턴스 및 현재 진료중인 환자 정보 저장
-if 'priority_queue' not in st.session_state:
-    st.session_state.priority_queue = PriorityQueue()
+queue_store = get_queue_store()
 if 'current_patient_in_treatment' not in st.session_state:
     st.session_state.current_patient_in_treatment = None
 
@@ -242,91 +191,31 @@ if 'current_patient_in_treatment' not in st.session_state:
 # -------------------------------
 # 데이터 로드 및 전처리
 # -------------------------------
+# 전처리된 자료는 세션 간 공유되므로 이후 코드에서 수정하지 않음 (위젯 조작으로 인한 재실행에서는 재사용)
 transport_df = load_transport_data(transport_path)
 
-# --- transport_df 전처리: '시도명' 컬럼 생성 및 보정 ---
-if not transport_df.empty and '소재지전체주소' in transport_df.columns:
-    def extract_sido(address):
-        if pd.isna(address) or not isinstance(address, str) or not address.strip():
-            return None
-        
-        addr_str = str(address).strip() 
-        parts = addr_str.split(' ')
-        if not parts: 
-            return None
+# 두 통계에 공통으로 있는 연도 (기본값: 가장 최근 연도)
+time_sos_path = first_existing_path(time_sos_paths)
+month_sos_path = first_existing_path(month_sos_paths)
+with stages.stage("sos_load"):
+    time_cube, month_cube = load_sos_cubes(time_sos_path, month_sos_path)
+    sos_years = sorted(set(time_cube.years) & set(month_cube.years), reverse=True)
 
-        first_part = parts[0]
-
-        if '세종' in first_part:
-            return '세종특별자치시'
-        
-        korean_sido_list = ["서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시",
-                                 "대전광역시", "울산광역시", "세종특별자치시", "경기도", "강원특별자치도", # 강원도 -> 강원특별자치도
-                                 "충청북도", "충청남도", "전라북도", "전라남도", "경상북도", "경상남도",
-                                 "제주특별자치도"]
-            
-        for sido in korean_sido_list:
-            if first_part in sido: 
-                return sido 
-        
-        for part in parts:
-            if isinstance(part, str) and ('특별시' in part or '광역시' in part or '자치시' in part or '자치도' in part):
-                # '강원특별자치도' 등 긴 이름 처리
-                if '강원' in part or '전라' in part or '충청' in part or '경상' in part or '경기' in part or '제주' in part:
-                    # 두 단어 이상으로 된 시도명 (예: 강원특별자치도) 처리
-                    if len(parts) > 1 and f"{parts[0]}{part}" in korean_sido_list: # 첫 단어와 결합하여 검사
-                        return f"{parts[0]}{part}"
-                    return part # 단일 단어 시도명 (예: 강원도)
-                return part # 서울특별시, 부산광역시 등
-        return None 
-
-    transport_df['시도명'] = transport_df['소재지전체주소'].apply(extract_sido)
-
-    # '소재지전체주소'를 이용해 위도, 경도 컬럼 생성
-    if '소재지전체주소' in transport_df.columns:
-        st.info("구급차 이송 데이터의 주소를 위도/경도로 변환 중입니다. (시간이 다소 소요될 수 있습니다.)")
-        progress_bar = st.progress(0)
-        
-        latitudes = []
-        longitudes = []
-        total_addresses = len(transport_df)
-
-        for i, address in enumerate(transport_df['소재지전체주소']):
-            lat, lon = geocode_address(address)
-            latitudes.append(lat)
-            longitudes.append(lon)
-            progress_bar.progress((i + 1) / total_addresses)
-        
-        transport_df['출발_위도'] = latitudes
-        transport_df['출발_경도'] = longitudes
-        
-        progress_bar.empty() 
-        st.success("주소 지오코딩이 완료되었습니다.")
-        
-        transport_df.dropna(subset=['출발_위도', '출발_경도'], inplace=True)
-        st.info(f"유효한 좌표가 없는 {total_addresses - len(transport_df)}개의 이송 기록이 제거되었습니다.")
-
-    transport_df.dropna(subset=['시도명'], inplace=True) 
-    st.info("'소재지전체주소' 컬럼을 기반으로 '시도명' 컬럼을 생성하고 보정했습니다.")
-elif not transport_df.empty:
-    st.warning("'transport_df'에 '소재지전체주소' 컬럼이 없습니다. '시도명' 생성을 건너킵니다.")
-
-time_df = load_time_data(time_json_path)
-month_df = load_month_data(month_json_path)
-
-# Road network는 용인시로 고정
-place_for_osmnx = "Yongin-si, Gyeonggi-do, South Korea" 
-road_graph = load_road_network_from_osmnx(place_for_osmnx) 
+# 시도별 이송업체 수 (시도 범주 코드 집계)
+provider_counts = sido_counts(transport_df) if not transport_df.empty and '시도명' in transport_df.columns else None
 
 
 # -------------------------------
 # 사이드바 사용자 상호작용
 # -------------------------------
 st.sidebar.title("사용자 설정")
-if not time_df.empty and not month_df.empty:
-    all_regions = set(time_df['시도']) | set(month_df['시도'])
-    if not transport_df.empty and '시도명' in transport_df.columns:
-        all_regions |= set(transport_df['시도명'].unique()) 
+year = st.sidebar.selectbox("연도 선택", sos_years) if sos_years else None
+time_regions = time_cube.regions_with_data(year) if year else []
+month_regions = month_cube.regions_with_data(year) if year else []
+if time_regions and month_regions:
+    all_regions = set(time_regions) | set(month_regions)
+    if provider_counts is not None:
+        all_regions |= set(provider_counts.regions())
     
     if all_regions:
         region = st.sidebar.selectbox("지역 선택", sorted(list(all_regions)))
@@ -347,19 +236,15 @@ if not transport_df.empty:
     if st.checkbox("📌 이송 데이터 요약 통계 보기"):
         st.write(transport_df.describe(include='all'))
     
-    if '시도명' in transport_df.columns and transport_df['시도명'].notna().any(): 
-        fig1, ax1 = plt.subplots(figsize=(10, 5))
-        if region and region in transport_df['시도명'].unique():
-            transport_df[transport_df['시도명'] == region].groupby('시도명').size().plot(kind='barh', ax=ax1, color='skyblue') 
-            ax1.set_title(f"{region} 시도별 이송 건수")
-        else:
-            transport_df.groupby('시도명').size().sort_values(ascending=False).plot(kind='barh', ax=ax1, color='skyblue') 
-            ax1.set_title("시도별 이송 건수")
-        
-        ax1.set_xlabel("건수")
-        ax1.set_ylabel("시도")
-        plt.tight_layout() 
-        st.pyplot(fig1)
+    if provider_counts is not None and provider_counts.regions(): 
+        with stages.stage("chart_transport_by_sido"):
+            # 차트 이미지는 (차트, 지역, 데이터 버전)별로 캐시되어 지역을 다시 고르면 그리지 않음
+            selected_sido = region if region and provider_counts.get(region) > 0 else None
+            title = f"{selected_sido} 시도별 이송 건수" if selected_sido else "시도별 이송 건수"
+            st.image(chart_png(
+                ("transport_by_sido", selected_sido, provider_counts.version),
+                lambda: series_chart(provider_counts.series(selected_sido), 'barh', title, "건수", "시도", 'skyblue', figsize=(10, 5)),
+            ))
     else:
         st.warning("이송 데이터에 '시도명' 컬럼이 없거나 유효한 시도명 값이 없습니다. 데이터 내용을 확인해주세요.")
 else:
@@ -368,17 +253,15 @@ else:
 # -------------------------------
 # 2️⃣ 시간대별 분석
 # -------------------------------
-st.subheader("2️⃣ 시간대별 응급실 이용 현황 (2023)")
-if not time_df.empty and region:
-    time_row = time_df[time_df['시도'] == region]
-    if not time_row.empty:
-        time_row_data = time_row.iloc[0, 1:]
-        fig2, ax2 = plt.subplots()
-        time_row_data.plot(kind='bar', color='deepskyblue', ax=ax2)
-        ax2.set_ylabel("이용 건수")
-        ax2.set_xlabel("시간대")
-        ax2.set_title(f"{region} 시간대별 응급실 이용")
-        st.pyplot(fig2)
+st.subheader(f"2️⃣ 시간대별 응급실 이용 현황 ({year})")
+if time_regions and region:
+    time_row_data = time_cube.series(region, year)
+    if time_row_data is not None:
+        with stages.stage("chart_time"):
+            st.image(chart_png(
+                ("time", region, year, time_cube.version),
+                lambda: series_chart(time_row_data, 'bar', f"{region} 시간대별 응급실 이용", "시간대", "이용 건수", 'deepskyblue'),
+            ))
     else:
         st.warning(f"'{region}' 지역에 대한 시간대별 데이터가 없습니다.")
 else:
@@ -387,17 +270,15 @@ else:
 # -------------------------------
 # 3️⃣ 월별 분석
 # -------------------------------
-st.subheader("3️⃣ 월별 응급실 이용 현황 (2023)")
-if not month_df.empty and region:
-    month_row = month_df[month_df['시도'] == region]
-    if not month_row.empty:
-        month_row_data = month_row.iloc[0, 1:]
-        fig3, ax3 = plt.subplots()
-        month_row_data.plot(kind='line', marker='o', color='seagreen', ax=ax3)
-        ax3.set_ylabel("이용 건수")
-        ax3.set_xlabel("월")
-        ax3.set_title(f"{region} 월별 응급실 이용")
-        st.pyplot(fig3)
+st.subheader(f"3️⃣ 월별 응급실 이용 현황 ({year})")
+if month_regions and region:
+    month_row_data = month_cube.series(region, year)
+    if month_row_data is not None:
+        with stages.stage("chart_month"):
+            st.image(chart_png(
+                ("month", region, year, month_cube.version),
+                lambda: series_chart(month_row_data, 'line', f"{region} 월별 응급실 이용", "월", "이용 건수", 'seagreen', marker='o'),
+            ))
     else:
         st.warning(f"'{region}' 지역에 대한 월별 데이터가 없습니다.")
 else:
@@ -408,19 +289,115 @@ else:
 # 4️⃣ 도로망 그래프 정보
 # -------------------------------
 st.subheader("🛣️ 도로망 그래프 정보")
-if road_graph:
-    st.write(f"**로드된 도로망 그래프 (`{place_for_osmnx}`):**") 
+# 선택한 시도의 도로망 (지역을 고르지 않았으면 경기도). 아직 메모리에 없으면 백그라운드에서 불러오는 동안 나머지 화면을 먼저 표시
+road_manager = get_road_graph_manager()
+road_region = road_manager.region_key(region) or "경기도"
+with stages.stage("road_graph_load", region=road_region):
+    road_graph = road_manager.get(road_region)
+    road_status = road_manager.status(road_region)
+    if road_graph is None and road_status == "loaded":
+        # get() 과 status() 사이에 백그라운드 로드가 끝난 경우
+        road_graph = road_manager.get(road_region)
+        road_status = "loaded" if road_graph is not None else road_manager.status(road_region)
+
+if road_graph is None:
+    if road_status == "loading":
+        st.info(f"'{road_region}' 도로망을 불러오는 중입니다. 로드가 끝나면 자동으로 표시됩니다.")
+        if hasattr(st, "fragment"):
+            @st.fragment(run_every=1)
+            def watch_road_graph():
+                if road_manager.status(road_region) != "loading":
+                    st.rerun()
+
+            watch_road_graph()
+    elif road_status == "error":
+        st.error(f"'{road_region}' 도로망을 불러오는 중 오류 발생: {road_manager.error(road_region)}")
+        if st.button("도로망 다시 불러오기"):
+            road_manager.retry(road_region)
+            st.rerun()
+    elif road_status != "missing":
+        # 로드 직후 다른 시도에 밀려 내보내진 경우 등 (자동 재실행은 하지 않음)
+        st.info(f"'{road_region}' 도로망이 아직 메모리에 없습니다.")
+        if st.button("도로망 불러오기"):
+            st.rerun()
+    else:
+        st.warning(f"'{road_region}' 도로망 자료가 없습니다. 네트워크 연결이 있는 환경에서 "
+                   f"`python -m emergency.road_regions {road_region}` 으로 스냅샷을 만들거나, "
+                   f"GraphML / OSM XML 파일을 지정하여 변환해주세요.")
+else:
+    st.write(f"**로드된 도로망 그래프 (`{road_graph.place_name or road_region}`):**") 
     st.write(f"  - 노드 수: {road_graph.number_of_nodes()}개")
     st.write(f"  - 간선 수: {road_graph.number_of_edges()}개")
+    loaded_roads = road_manager.loaded_regions()
+    st.caption(f"메모리에 있는 도로망 ({sum(n for _, n in loaded_roads) / 2 ** 20:.0f}/{ROAD_GRAPH_BUDGET_MB}MB): "
+               + ", ".join(f"{sido} {n / 2 ** 20:.0f}MB" for sido, n in reversed(loaded_roads)))
     
     st.write("간단한 도로망 지도 시각화 (노드와 간선):")
-    # osmnx 버전 1.2.0 이후부터는 `close` 파라미터가 제거되었습니다.
-    fig, ax = ox.plot_graph(road_graph, show=False, bgcolor='white', node_color='red', node_size=5, edge_color='gray', edge_linewidth=0.5)
-    st.pyplot(fig) 
-    st.caption("참고: 전체 도로망은 복잡하여 로딩이 느릴 수 있습니다.")
-
-else:
-    st.warning("도로망 그래프 로드에 실패했습니다. 지정된 지역을 확인해주세요.")
+    detail_label = st.radio("도로망 표시 수준", ["자동", "전체 도로", "주요 도로만"], horizontal=True)
+    level_of_detail = {"자동": "auto", "전체 도로": "full", "주요 도로만": "major"}[detail_label]
+    # 렌더링 결과(PNG)는 그래프 버전과 스타일별로 캐시되므로 일반적인 재실행에서는 캐시 조회만 수행
+    with stages.stage("chart_road_network", level_of_detail=level_of_detail):
+        st.image(render_road_network_png(road_graph, level_of_detail=level_of_detail))
+    st.caption("참고: 도로망이 큰 경우 '자동' 모드에서는 주요 도로만 표시합니다.")
+
+    # 도로망 기반 최근접 이송업체 조회
+    if not transport_df.empty:
+        providers = select_active_providers(transport_df)
+        with stages.stage("nearest_provider_index"):
+            provider_index = get_nearest_provider_index(road_region, road_graph, providers)
+        st.write(f"도로망 내 영업 중인 이송업체: {provider_index.num_providers}개")
+        if provider_index.num_providers > 0:
+            with st.expander("🚑 가장 빨리 도착하는 이송업체 조회"):
+                col_lat, col_lon = st.columns(2)
+                query_lat = col_lat.number_input("위도", value=float(road_graph.node_y.mean()), format="%.6f")
+                query_lon = col_lon.number_input("경도", value=float(road_graph.node_x.mean()), format="%.6f")
+                nearest_provider, eta_seconds = provider_index.query(query_lat, query_lon)
+                if nearest_provider is not None:
+                    st.success(f"**{nearest_provider.get('사업장명', '알 수 없음')}** 에서 약 {eta_seconds / 60:.1f}분 내 도착 가능합니다.")
+                else:
+                    st.warning("해당 지점에 도달할 수 있는 이송업체가 없습니다.")
+
+        # 여러 사고를 한 번에 배차: 업체별 구급차 대수 제약 아래 응급도 가중 도착 시간 합 최소화
+        with st.expander("🚨 구급차 일괄 배차 최적화"):
+            st.write(f"영업 중인 이송업체 구급차 {int(fleet_sizes(providers).sum())}대 (도로망 밖 업체는 배차 시 제외)")
+            incident_source = st.radio("사고 목록", ["가상 대량 발생", "현재 대기열 환자 (위치는 도로망 내 무작위)"], horizontal=True)
+            col_n, col_seed = st.columns(2)
+            num_incidents = col_n.number_input("사고 수", min_value=1, max_value=2000, value=200,
+                                               disabled=incident_source != "가상 대량 발생")
+            dispatch_seed = col_seed.number_input("난수 시드", min_value=0, value=0, key="dispatch_seed")
+            if st.button("배차 계산"):
+                if incident_source == "가상 대량 발생":
+                    incidents = simulate_surge(road_graph, int(num_incidents), severity_scores, seed=int(dispatch_seed))
+                else:
+                    incidents = incidents_from_queue(queue_store.waiting(), road_graph, seed=int(dispatch_seed))
+                if incidents.empty:
+                    st.warning("배차할 사고가 없습니다.")
+                else:
+                    # 주행 시간 행렬은 처음 배차할 때 한 번 계산 (업체 노드마다 다익스트라 1회)
+                    with stages.stage("dispatch_matrix"):
+                        travel_times = get_travel_time_matrix(road_region, road_graph, transport_df, fleet_key(providers))
+                    with stages.stage("dispatch_batch", incidents=len(incidents)):
+                        assignments, dispatch_summary, improvement = dispatch_batch(travel_times, incidents)
+                    st.write(f"배차 가능 이송업체 {travel_times.num_providers}개, 구급차 {travel_times.total_fleet}대")
+                    num_outside = int(assignments[OUTSIDE_GRAPH_COL].sum())
+                    if num_outside:
+                        st.warning(f"도로망({road_region}) 밖에 있는 사고 {num_outside}건은 배차하지 않았습니다.")
+                    st.dataframe(dispatch_summary)
+                    st.success(f"응급도 가중 도착 시간 합이 탐욕(응급도순 최근접) 배정보다 {improvement:.1%} 줄었습니다.")
+                    st.dataframe(assignments)
+
+        # 이송업체 등시간권 커버리지 및 공백 지역
+        with st.expander("🗺️ 이송업체 도달 시간 커버리지 분석"):
+            with stages.stage("coverage_report"):
+                coverage_summary, region_gaps, uncovered_clusters = get_coverage_report(
+                    road_region, road_graph, transport_df)
+            st.dataframe(coverage_summary)
+            gap_minutes = st.selectbox("공백 지역 기준 시간(분)", list(region_gaps.keys()), index=1)
+            st.write(f"{gap_minutes}분 내 어떤 이송업체도 도달하지 못하는 도로망 노드 수 (시군구별):")
+            st.caption("행정 경계 자료가 없어 노드의 시군구는 가장 가까운 등록 사업장 주소로 추정한 값입니다.")
+            st.dataframe(region_gaps[gap_minutes])
+            st.write(f"{gap_minutes}분 내 미도달 노드 중 도로망으로 이어진 묶음 (노드 수 기준 상위 10개):")
+            st.dataframe(uncovered_clusters[gap_minutes].head(10))
 
 
 # -------------------------------
@@ -430,6 +407,11 @@ st.subheader("5️⃣ 응급환자 진단 및 대기열 관리 시뮬레이션")
 
 # 대기 방식 선택 라디오 버튼 (이제 이 값이 큐 동작에 영향을 미침)
 mode = st.radio("동일 중증도 내 대기 방식 선택", ['큐 (선입선출)', '스택 (후입선출)'])
+# 대기 시간이 길어질수록 점수를 더해 경증 환자가 무한정 밀리지 않도록 함 (0이면 보정 없음)
+# 공유 설정이므로 사용자가 값을 바꿨을 때만 저장소에 반영 (다른 세션의 기본값으로 덮어쓰지 않도록)
+aging_rate = st.number_input("대기 보정 (대기 1분당 추가 점수)", min_value=0.0, max_value=5.0,
+                             value=float(queue_store.aging_rate), step=0.1, key="aging_rate_input",
+                             on_change=lambda: queue_store.set_aging_rate(st.session_state.aging_rate_input))
 
 
 # 진단서 작성 섹션
@@ -438,67 +420,47 @@ with st.expander("📝 환자 진단서 작성", expanded=True):
 
     patient_name = st.text_input("환자 이름", value="")
 
-    q1 = st.selectbox("1. 의식 상태", ["명료", "기면 (졸림)", "혼미 (자극에 반응)", "혼수 (자극에 무반응)"])
-    q2 = st.selectbox("2. 호흡 곤란 여부", ["없음", "가벼운 곤란", "중간 곤란", "심한 곤란"])
-    q3 = st.selectbox("3. 주요 통증/출혈 정도", ["없음", "경미", "중간", "심함"])
-    q4 = st.selectbox("4. 외상 여부", ["없음", "찰과상/멍", "열상/골절 의심", "다발성 외상/심각한 출혈"])
+    # 문항과 응답 선택지는 채점 표(TRIAGE_QUESTIONS)에서 가져옴
+    answers = {column: st.selectbox(question, list(options)) for column, (question, options) in TRIAGE_QUESTIONS.items()}
 
     submit_diagnosis = st.button("진단 완료 및 큐에 추가")
 
     if submit_diagnosis and patient_name:
-        current_priority_score = 0
-        current_severity_level = "경증" 
-
-        # 응급도 점수 계산 로직 (임의 설정)
-        if q1 == "기면 (졸림)": current_priority_score += 3
-        elif q1 == "혼미 (자극에 반응)": current_priority_score += 7
-        elif q1 == "혼수 (자극에 무반응)": current_priority_score += 15
-
-        if q2 == "가벼운 곤란": current_priority_score += 4
-        elif q2 == "중간 곤란": current_priority_score += 9
-        elif q2 == "심한 곤란": current_priority_score += 20
-
-        if q3 == "경미": current_priority_score += 2
-        elif q3 == "중간": current_priority_score += 6
-        elif q3 == "심함": current_priority_score += 12
-
-        if q4 == "찰과상/멍": current_priority_score += 3
-        elif q4 == "열상/골절 의심": current_priority_score += 8
-        elif q4 == "다발성 외상/심각한 출혈": current_priority_score += 18
-        
-        # 총점에 따라 중증도 레벨 결정 (임의 기준)
-        if current_priority_score >= 35:
-            current_severity_level = "매우_응급"
-        elif current_priority_score >= 20:
-            current_severity_level = "응급"
-        elif current_priority_score >= 10:
-            current_severity_level = "중증"
-        elif current_priority_score >= 3:
-            current_severity_level = "중등증"
-        else:
-            current_severity_level = "경증"
-
-        # 최종 응급도 점수: 정의된 severity_scores에서 가져옴
-        final_priority_score = severity_scores.get(current_severity_level, 1)
+        # 응급도 점수 계산: 문항별 점수 합계 -> 중증도 구간 -> 최종 응급도 점수(severity_scores)
+        _, current_severity_level, final_priority_score = score_assessment(answers)
 
         patient_info = {
             "이름": patient_name,
             "중증도": current_severity_level,
-            "의식 상태": q1,
-            "호흡 곤란": q2,
-            "통증/출혈": q3,
-            "외상": q4,
-            "계산된 점수": final_priority_score 
+            **answers,
+            "계산된 점수": final_priority_score
         }
         
         # 큐 타입(mode)을 insert 함수에 전달
-        st.session_state.priority_queue.insert(patient_info, final_priority_score, queue_type=mode)
+        queue_store.insert(patient_info, final_priority_score, queue_type=mode)
         st.success(f"'{patient_name}' 환자가 '{current_severity_level}' (점수: {final_priority_score}) 상태로 큐에 추가되었습니다.")
         st.rerun() # UI 업데이트를 위해 다시 실행
 
     elif submit_diagnosis and not patient_name:
         st.warning("환자 이름을 입력해주세요.")
 
+# 진단서 일괄 등록 (다수 사상자 훈련 재현 등): CSV 전체를 한 번에 채점하여 대기열에 추가
+with st.expander("📂 진단서 CSV 일괄 등록"):
+    question_columns = ", ".join(f"'{c}'" for c in TRIAGE_QUESTIONS)
+    st.write(f"'이름'(선택)과 {question_columns} 컬럼이 있는 CSV를 올려주세요.")
+    uploaded_assessments = st.file_uploader("진단서 CSV", type=["csv"])
+    if uploaded_assessments is not None:
+        try:
+            scored_df = score_assessments(read_assessments_csv(uploaded_assessments.getvalue()))
+        except ValueError as e:
+            st.error(f"진단서 채점 중 오류 발생: {e}")
+        else:
+            st.dataframe(scored_df['중증도'].value_counts(sort=False).rename('환자 수'))
+            if st.button(f"{len(scored_df)}명 대기열에 추가"):
+                enqueue_scored(queue_store, scored_df, queue_type=mode)
+                st.success(f"{len(scored_df)}명의 환자를 대기열에 추가했습니다.")
+                st.rerun()
+
 # -------------------------------
 # 현재 진료중인 환자 정보 표시 섹션
 # -------------------------------
@@ -521,14 +483,25 @@ else:
 # -------------------------------
 st.markdown("#### 🏥 현재 응급 대기열 현황")
 
-if not st.session_state.priority_queue.is_empty():
-    st.dataframe(pd.DataFrame(st.session_state.priority_queue.get_all_patients_sorted()))
+# 다른 단말에서 대기열을 바꾸면 버전 카운터가 올라가므로, 버전이 바뀐 경우에만 화면을 다시 그림
+st.session_state.queue_version = queue_store.version()
+if hasattr(st, "fragment"):
+    @st.fragment(run_every=2)
+    def watch_queue_version():
+        if queue_store.version() != st.session_state.queue_version:
+            st.rerun()
+
+    watch_queue_version()
+
+if not queue_store.is_empty():
+    st.dataframe(pd.DataFrame(queue_store.waiting()))
     
     col1, col2 = st.columns(2)
     with col1:
         process_patient = st.button("환자 진료 시작 (가장 응급한 환자)")
         if process_patient:
-            processed_patient, score = st.session_state.priority_queue.get_highest_priority_patient()
+            # 여러 단말이 동시에 눌러도 한 환자는 한 번만 진료 시작됨 (저장소에서 원자적으로 꺼냄)
+            _, processed_patient, score = queue_store.pop_highest()
             if processed_patient: 
                 # 진료 시작된 환자 정보를 session_state에 저장
                 st.session_state.current_patient_in_treatment = processed_patient
@@ -539,10 +512,61 @@ if not st.session_state.priority_queue.is_empty():
             st.rerun() 
     with col2:
         st.markdown(f"현재 선택된 대기 방식: **{mode}** (동일 중증도 내 적용)")
+
+    # 재분류 / 대기열 이탈 (환자 ID 로 바로 찾아 처리, 그사이 다른 단말에서 진료 시작된 환자는 건너뜀)
+    with st.expander("🔁 대기 환자 재분류 / 이탈 처리"):
+        target_id = st.selectbox("대상 환자 ID", queue_store.waiting_ids())
+        new_level = st.selectbox("새 중증도", list(severity_scores.keys()))
+        col3, col4 = st.columns(2)
+        if col3.button("중증도 재분류"):
+            target_info, _ = queue_store.get_patient(target_id)
+            if target_info is not None:
+                target_info = {**target_info, "중증도": new_level, "계산된 점수": severity_scores[new_level]}
+                queue_store.update_priority(target_id, severity_scores[new_level], patient_info=target_info)
+            st.rerun()
+        if col4.button("대기열에서 제거 (귀가/전원)"):
+            queue_store.remove(target_id)
+            st.rerun()
 else:
     st.info("현재 응급 대기 환자가 없습니다.")
-    st.session_state.current_patient_in_treatment = None # 큐가 비면 진료중인 환자 없음
+
+
+# -------------------------------
+# 응급실 대기 시뮬레이션 (시간대별/월별 이용 분포 기반 몬테카를로)
+# -------------------------------
+with st.expander("📊 응급실 병상 수 시나리오 시뮬레이션"):
+    if region and region in set(time_regions) & set(month_regions):
+        time_df = load_time_data(time_sos_path, year)
+        month_df = load_month_data(month_sos_path, year)
+        st.write(f"{region} {year}년 시간대별/월별 응급실 이용 분포로 환자 도착을 만들어 병상 수에 따른 대기 시간을 추정합니다.")
+        col_a, col_b, col_c = st.columns(3)
+        num_bays = col_a.number_input("진료 병상 수", min_value=1, max_value=500, value=10)
+        arrival_scale = col_b.number_input("지역 내원 중 이 응급실 비율", min_value=0.001, max_value=1.0, value=0.01, format="%.3f")
+        replications = col_c.number_input("반복 횟수", min_value=1, max_value=64, value=4)
+        sim_seed = st.number_input("난수 시드", min_value=0, value=0)
+        if st.button("시뮬레이션 실행"):
+            sim_config = config_from_views(time_df, month_df, region, severity_scores, num_bays=int(num_bays),
+                                           arrival_scale=arrival_scale, queue_type=mode, aging_rate=aging_rate)
+            with st.spinner("시뮬레이션 실행 중..."), stages.stage("ed_simulation", replications=int(replications)):
+                _, sim_summary, sim_utilization = run_replications(sim_config, int(replications), seed=int(sim_seed))
+            st.dataframe(sim_summary)
+            st.write(f"평균 병상 가동률: {sim_utilization.mean():.1%}")
+    else:
+        st.info("시뮬레이션에는 선택한 지역의 시간대별/월별 데이터가 필요합니다.")
 
 
 st.markdown("---")
 st.caption("ⓒ 2025 스마트 응급의료 데이터 분석 프로젝트 - SDG 3.8 보건서비스 접근성 개선")
+
+
+# -------------------------------
+# 진단 정보 (사이드바, 선택 표시)
+# -------------------------------
+# 모든 단계가 끝난 뒤에 그려야 이번 실행 전체가 표에 포함됨
+if st.sidebar.checkbox("🔧 단계별 소요 시간 보기"):
+    st.sidebar.markdown(f"**이번 실행:** {time.perf_counter() - script_started:.2f}초 (계측 단계 합계 {stages.total_seconds:.2f}초)")
+    st.sidebar.dataframe(stages.summary())
+    stage_log = read_stage_log(stages.log_path, max_lines=200)
+    if not stage_log.empty:
+        st.sidebar.write("최근 200개 기록 기준 단계별 시간(초):")
+        st.sidebar.dataframe(stage_log.groupby('stage')['seconds'].agg(['count', 'median', 'max']))
@@ -0,0 +1,82 @@
+# -------------------------------
+# CH 주행 시간 인덱스 정확성 검증
+# -------------------------------
+# 합성 도로망에서 간선 일부를 지우고 주행 시간을 무작위로 바꾼 방향 그래프를 만든 뒤,
+# 단일 질의(query), 쌍 질의(query_many), 다대다 행렬(matrix) 결과를 scipy 다익스트라와 비교한다.
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from benchmarks import generators
+from emergency.eta_index import CHIndex
+from emergency.road_snapshot import RoadSnapshot
+
+
+def _directed_snapshot(num_nodes, seed):
+    # 격자의 양방향 간선 중 일부만 남기고 방향마다 다른 주행 시간을 주어 비대칭/도달 불가 쌍을 만든다
+    grid = generators.road_snapshot(num_nodes, seed=seed)
+    rng = np.random.default_rng(seed)
+    keep = rng.random(grid.num_edges) > 0.25
+    src = grid.edge_sources()[keep]
+    dst = np.asarray(grid.indices)[keep]
+    n = grid.num_nodes
+    m = len(dst)
+    arrays = {name: np.asarray(getattr(grid, name)) for name in ("node_ids", "node_x", "node_y")}
+    arrays.update({
+        "indptr": np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))]).astype(np.int64),
+        "indices": dst.astype(np.int32),
+        "edge_key": np.zeros(m, dtype=np.int16),
+        "edge_length": rng.uniform(10, 500, m).astype(np.float32),
+        "edge_travel_time": rng.uniform(1, 60, m).astype(np.float32),
+        "edge_highway": np.zeros(m, dtype=np.uint8),
+    })
+    meta = dict(grid.meta, fingerprint=f"directed-{num_nodes}-{seed}", num_edges=m)
+    return RoadSnapshot(arrays, meta)
+
+
+@pytest.fixture(scope="module", params=[0, 1])
+def case(request):
+    snapshot = _directed_snapshot(400, seed=request.param)
+    index = CHIndex.build(snapshot)
+    reference = dijkstra(snapshot.csr("travel_time"), directed=True)
+    return snapshot, index, reference
+
+
+def _assert_same_times(actual, expected):
+    assert np.array_equal(np.isinf(actual), np.isinf(expected))
+    finite = np.isfinite(expected)
+    np.testing.assert_allclose(actual[finite], expected[finite], rtol=1e-6, atol=1e-3)
+
+
+def test_query_matches_dijkstra(case):
+    snapshot, index, reference = case
+    rng = np.random.default_rng(2)
+    for source, target in rng.integers(snapshot.num_nodes, size=(300, 2)):
+        _assert_same_times(np.array([index.query(source, target)]), reference[source, target:target + 1])
+    assert index.query(5, 5) == 0.0
+
+
+def test_query_many_matches_dijkstra(case):
+    snapshot, index, reference = case
+    rng = np.random.default_rng(3)
+    sources = rng.integers(snapshot.num_nodes, size=500)
+    targets = rng.integers(snapshot.num_nodes, size=500)
+    _assert_same_times(index.query_many(sources, targets), reference[sources, targets])
+
+
+def test_matrix_matches_dijkstra(case):
+    snapshot, index, reference = case
+    rng = np.random.default_rng(4)
+    # 중복 노드가 섞여도 행/열 순서가 입력과 같아야 함
+    sources = rng.integers(snapshot.num_nodes, size=40)
+    targets = np.concatenate([rng.integers(snapshot.num_nodes, size=30), sources[:5]])
+    _assert_same_times(index.matrix(sources, targets), reference[np.ix_(sources, targets)])
+    assert index.matrix([], targets).shape == (0, len(targets))
+
+
+def test_saved_index_round_trips(case, tmp_path):
+    snapshot, index, reference = case
+    path = index.save(str(tmp_path / "eta.npz"))
+    loaded = CHIndex.load(path, snapshot)
+    nodes = np.arange(0, snapshot.num_nodes, 17)
+    _assert_same_times(loaded.matrix(nodes, nodes), reference[np.ix_(nodes, nodes)])
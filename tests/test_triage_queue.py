@@ -0,0 +1,75 @@
+# -------------------------------
+# 응급 대기열 무작위 검증
+# -------------------------------
+# 삽입/일괄 삽입/재분류/이탈/대기 보정 변경을 무작위로 섞어 실행하면서,
+# 힙 순서와 정렬된 보기가 매번 키를 전부 정렬한 기준 결과와 같은지 확인한다.
+import random
+
+import pytest
+
+from emergency.triage_queue import IndexedPriorityQueue, QUEUE_FIFO, QUEUE_LIFO
+
+
+def _fake_clock(step_seconds=7.0):
+    now = [0.0]
+
+    def clock():
+        now[0] += step_seconds
+        return now[0]
+
+    return clock
+
+
+def _expected_order(queue, waiting):
+    return [key[2] for key in sorted(queue._key(pid) for pid in waiting)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_operations_match_sorted_reference(seed):
+    rng = random.Random(seed)
+    queue = IndexedPriorityQueue(aging_rate=rng.choice([0.0, 0.5]), clock=_fake_clock())
+    waiting = set()
+    for _ in range(rng.randint(50, 300)):
+        op = rng.random()
+        if op < 0.3:
+            queue_type = rng.choice([QUEUE_FIFO, QUEUE_LIFO])
+            waiting.add(queue.insert({"이름": "환자"}, rng.choice([1, 3, 5]), queue_type=queue_type))
+        elif op < 0.45:
+            count = rng.randint(0, 30)
+            scores = [rng.choice([1, 3, 5, 10]) for _ in range(count)]
+            waiting.update(queue.insert_many([{}] * count, scores))
+        elif op < 0.6 and waiting:
+            queue.update_priority(rng.choice(sorted(waiting)), rng.choice([1, 20]))
+        elif op < 0.7 and waiting:
+            patient_id = rng.choice(sorted(waiting))
+            queue.remove(patient_id)
+            waiting.discard(patient_id)
+        elif op < 0.75:
+            queue.set_aging_rate(rng.choice([0.0, 0.1, 1.0]))
+        elif op < 0.9 and waiting:
+            patient_id = queue.peek_id()
+            queue.get_highest_priority_patient()
+            waiting.discard(patient_id)
+        else:
+            ids = queue.patient_ids()
+            assert ids == _expected_order(queue, waiting)
+            assert queue.peek_id() == (ids[0] if ids else None)
+
+    expected = _expected_order(queue, waiting)
+    assert queue.patient_ids() == expected
+    assert [row["환자 ID"] for row in queue.get_all_patients_sorted()] == expected
+    popped = []
+    while not queue.is_empty():
+        popped.append(queue.peek_id())
+        queue.get_highest_priority_patient()
+    assert popped == expected
+
+
+def test_same_score_follows_queue_type():
+    queue = IndexedPriorityQueue(clock=_fake_clock())
+    fifo = [queue.insert({}, 5, queue_type=QUEUE_FIFO) for _ in range(3)]
+    assert queue.patient_ids() == fifo
+
+    queue = IndexedPriorityQueue(clock=_fake_clock())
+    lifo = [queue.insert({}, 5, queue_type=QUEUE_LIFO) for _ in range(3)]
+    assert queue.patient_ids() == lifo[::-1]